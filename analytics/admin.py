@@ -0,0 +1,7 @@
+from django.contrib import admin
+
+from analytics.models import BookDailyStats, CoverLoanStats, UserLoanStats
+
+admin.site.register(BookDailyStats)
+admin.site.register(UserLoanStats)
+admin.site.register(CoverLoanStats)
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class AnalyticsServiceConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "analytics"
+
+    def ready(self):
+        import analytics.signals  # noqa: F401
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from analytics.models import BookDailyStats, UserLoanStats
+from analytics.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the analytics rollups from all borrowings, e.g. to "
+        "backfill history or after borrowings were changed by hand."
+    )
+
+    def handle(self, *args, **options):
+        rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {BookDailyStats.objects.count()} daily book rows and "
+            f"{UserLoanStats.objects.count()} patron rows"
+        ))
@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.db import models
+
+from books.models import Book
+
+
+class BookDailyStats(models.Model):
+    """Checkouts, returns and revenue of a book on one day.
+
+    Revenue is what returns that day were billed: the fee, plus the fine
+    when late.
+    """
+    # Unindexed: with an index of its own SQLite walks it for the
+    # per-book grouping instead of range scanning the day window.
+    book = models.ForeignKey(
+        to=Book,
+        on_delete=models.CASCADE,
+        related_name="daily_stats",
+        db_index=False,
+    )
+    day = models.DateField()
+    checkouts = models.PositiveIntegerField(default=0)
+    returns = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"Book {self.book_id} on {self.day}"
+
+    class Meta:
+        constraints = [
+            # Day first: windows are range scans of this index.
+            models.UniqueConstraint(
+                fields=["day", "book"], name="book_daily_stats_unique"
+            ),
+        ]
+
+
+class UserLoanStats(models.Model):
+    """Running loan history of a patron.
+
+    Active loans are the quota counter on the user, see borrowings.quota.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="loan_stats",
+    )
+    checkouts = models.PositiveIntegerField(default=0)
+    returns = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"User {self.user_id}: {self.checkouts} checkouts"
+
+
+class CoverLoanStats(models.Model):
+    """Running loan counters and stock per cover type.
+
+    ``copies`` counts every copy the library owns, whether shelved, on
+    loan or held for a reservation. Only catalogue edits change it, so
+    checkouts and returns never touch it.
+    """
+    cover = models.CharField(
+        max_length=4, choices=Book.CoverChoices.choices, primary_key=True
+    )
+    copies = models.IntegerField(default=0)
+    active_loans = models.IntegerField(default=0)
+    checkouts = models.PositiveIntegerField(default=0)
+    returns = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.cover}: {self.active_loans} active loans"
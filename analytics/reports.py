@@ -0,0 +1,94 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce
+
+from analytics.models import BookDailyStats, CoverLoanStats
+from books.models import Book
+from reservations.models import Reservation
+
+TOTALS = {
+    "checkouts": Sum("checkouts"),
+    "returns": Sum("returns"),
+    "revenue": Sum("revenue"),
+}
+
+
+def window(days: int, today=None):
+    """Daily rows of the last ``days`` days, today included."""
+    today = today or datetime.date.today()
+    since = today - datetime.timedelta(days=days - 1)
+    return BookDailyStats.objects.filter(day__gte=since)
+
+
+def top_books(days: int, limit: int) -> list:
+    """Most borrowed books of the window.
+
+    Titles are fetched for the top rows only, so the grouping never
+    joins the catalogue.
+    """
+    rows = list(
+        window(days).values("book_id").annotate(**TOTALS)
+        .order_by("-checkouts", "book_id")[:limit]
+    )
+    titles = dict(
+        Book.objects.filter(id__in=[row["book_id"] for row in rows])
+        .values_list("id", "title")
+    )
+    for row in rows:
+        row["title"] = titles.get(row["book_id"])
+    return rows
+
+
+def top_users(limit: int) -> list:
+    """Patrons with the most active loans, by their quota counters."""
+    return list(
+        get_user_model().objects.filter(active_loans__gt=0)
+        .order_by("-active_loans", "id")
+        .values(
+            "email",
+            "active_loans",
+            user=F("id"),
+            checkouts=Coalesce("loan_stats__checkouts", 0),
+            returns=Coalesce("loan_stats__returns", 0),
+        )[:limit]
+    )
+
+
+def cover_utilisation() -> list:
+    """Share of the copies of each cover type on loan or held.
+
+    Copies and active loans are running counters; held copies are
+    counted from the open holds alone.
+    """
+    stats = {
+        cover: (copies, active)
+        for cover, copies, active in CoverLoanStats.objects.values_list(
+            "cover", "copies", "active_loans"
+        )
+    }
+    held = dict(
+        Reservation.objects.filter(status=Reservation.StatusChoices.HELD)
+        .order_by().values("book__cover").annotate(held=Count("id"))
+        .values_list("book__cover", "held")
+    )
+    rows = []
+    for cover in Book.CoverChoices.values:
+        copies, active = stats.get(cover, (0, 0))
+        out = active + held.get(cover, 0)
+        rows.append({
+            "cover": cover,
+            "active_loans": active,
+            "held": held.get(cover, 0),
+            "copies": copies,
+            "utilisation": round(out / copies, 4) if copies else 0.0,
+        })
+    return rows
+
+
+def daily_revenue(days: int) -> list:
+    """Checkouts, returns and revenue billed per day of the window."""
+    return list(
+        window(days).values("day").annotate(**TOTALS).order_by("day")
+    )
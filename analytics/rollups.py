@@ -0,0 +1,152 @@
+from collections import Counter
+from decimal import Decimal
+
+from django.db import connections, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Greatest
+
+from analytics.models import BookDailyStats, CoverLoanStats, UserLoanStats
+from books.models import Book
+from borrowings.models import Borrowing
+from payments.billing import MONEY, fee_amount, fine_amount
+from reservations.models import Reservation
+
+ZERO = Value(0)
+NO_MONEY = Value(Decimal(0), MONEY)
+
+
+def upsert(model, rows, keys, counters) -> int:
+    """Add grouped ``rows`` to the counters of ``model`` with INSERT ... SELECT.
+
+    ``rows`` is a values queryset of the ``keys`` then the ``counters``;
+    rows with existing keys add to the stored counters instead.
+    """
+    sql, params = rows.query.sql_with_params()
+    table = model._meta.db_table
+    columns = [model._meta.get_field(name).column for name in keys + counters]
+    conflict = ", ".join(columns[:len(keys)])
+    updates = ", ".join(
+        f"{column} = {table}.{column} + excluded.{column}"
+        for column in columns[len(keys):]
+    )
+
+    with connections[rows.db].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) {sql} "
+            f"ON CONFLICT ({conflict}) DO UPDATE SET {updates}",
+            params,
+        )
+        return cursor.rowcount
+
+
+def grouped(borrowings, keys: dict, counters: dict):
+    names = {f"stat_{name}": value for name, value in keys.items()}
+    totals = {f"stat_{name}": value for name, value in counters.items()}
+    return (
+        borrowings.order_by()
+        .values(**names)
+        .annotate(**totals)
+        .values_list(*names, *totals)
+    )
+
+
+def record(borrowings, day, checkouts, returns, revenue) -> None:
+    """Add to the book, patron and cover rollups in three statements."""
+    upsert(BookDailyStats, grouped(
+        borrowings,
+        {"day": day, "book": F("book_id")},
+        {"checkouts": checkouts, "returns": returns, "revenue": revenue},
+    ), ("day", "book"), ("checkouts", "returns", "revenue"))
+
+    history = {"checkouts": checkouts, "returns": returns}
+    upsert(UserLoanStats, grouped(
+        borrowings, {"user": F("user_id")}, history
+    ), ("user",), tuple(history))
+    # Loans never change the stock; copies is only there for new rows.
+    loans = {"copies": ZERO, "active_loans": checkouts - returns, **history}
+    upsert(CoverLoanStats, grouped(
+        borrowings, {"cover": F("book__cover")}, loans
+    ), ("cover",), tuple(loans))
+
+
+def record_checkouts(borrowings) -> None:
+    """Count new ``borrowings``; run it in the transaction creating them."""
+    record(
+        borrowings, F("borrow_date"), Count("id"), ZERO, NO_MONEY
+    )
+
+
+def record_returns(borrowings) -> None:
+    """Count returned ``borrowings`` and what they were billed.
+
+    Run it in the transaction closing them.
+    """
+    returned_on = F("actual_return_date")
+    revenue = Sum(
+        fee_amount(returned_on)
+        + Greatest(fine_amount(returned_on), NO_MONEY),
+        output_field=MONEY,
+    )
+    record(borrowings, returned_on, ZERO, Count("id"), revenue)
+
+
+def per_cover(queryset, total) -> Counter:
+    return Counter(dict(
+        queryset.order_by().values("cover")
+        .annotate(total=total).values_list("cover", "total")
+    ))
+
+
+def copies_out(books) -> tuple:
+    """Active loans and held copies of ``books``, per cover type."""
+    active = per_cover(
+        books.filter(borrowings__actual_return_date__isnull=True),
+        Count("borrowings"),
+    )
+    held = per_cover(
+        books.filter(reservations__status=Reservation.StatusChoices.HELD),
+        Count("reservations"),
+    )
+    return active, held
+
+
+def adjust_covers(**changes) -> None:
+    """Add ``changes[counter][cover]`` to the counters of each cover type.
+
+    Meant for catalogue edits, which are rare next to checkouts: they
+    create the missing rows, then update the counters in place.
+    """
+    covers = {
+        cover for counts in changes.values()
+        for cover, count in counts.items() if count
+    }
+    CoverLoanStats.objects.bulk_create(
+        [CoverLoanStats(cover=cover) for cover in covers],
+        ignore_conflicts=True,
+    )
+    for cover in covers:
+        updates = {
+            counter: F(counter) + counts[cover]
+            for counter, counts in changes.items() if counts.get(cover)
+        }
+        if updates:
+            CoverLoanStats.objects.filter(cover=cover).update(**updates)
+
+
+def rebuild() -> None:
+    """Recompute every rollup from the borrowings, e.g. to backfill.
+
+    Copies per cover are recounted from the catalogue.
+    """
+    with transaction.atomic():
+        for model in (BookDailyStats, UserLoanStats, CoverLoanStats):
+            model.objects.all().delete()
+        record_checkouts(Borrowing.objects.all())
+        record_returns(
+            Borrowing.objects.filter(actual_return_date__isnull=False)
+        )
+        active, held = copies_out(Book.objects.all())
+        adjust_covers(
+            copies=per_cover(Book.objects.all(), Sum("inventory"))
+            + active + held
+        )
@@ -0,0 +1,32 @@
+from rest_framework import serializers
+
+
+class BookStatsSerializer(serializers.Serializer):
+    book = serializers.IntegerField(source="book_id")
+    title = serializers.CharField()
+    checkouts = serializers.IntegerField()
+    returns = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class UserStatsSerializer(serializers.Serializer):
+    user = serializers.IntegerField()
+    email = serializers.EmailField()
+    active_loans = serializers.IntegerField()
+    checkouts = serializers.IntegerField()
+    returns = serializers.IntegerField()
+
+
+class CoverStatsSerializer(serializers.Serializer):
+    cover = serializers.CharField()
+    active_loans = serializers.IntegerField()
+    held = serializers.IntegerField()
+    copies = serializers.IntegerField()
+    utilisation = serializers.FloatField()
+
+
+class DailyRevenueSerializer(serializers.Serializer):
+    day = serializers.DateField()
+    checkouts = serializers.IntegerField()
+    returns = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
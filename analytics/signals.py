@@ -0,0 +1,57 @@
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from analytics.rollups import adjust_covers, copies_out
+from books.models import Book
+from books.signals import inventory_changed
+
+
+def loans_and_holds(book_id) -> tuple:
+    active, held = copies_out(Book.objects.filter(pk=book_id))
+    return sum(active.values()), sum(held.values())
+
+
+@receiver(pre_save, sender=Book)
+def remember_stock(sender, instance, **kwargs):
+    instance._stock = (
+        Book.objects.filter(pk=instance.pk)
+        .values_list("cover", "inventory").first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Book)
+def count_saved_copies(sender, instance, **kwargs):
+    """Track stock edits; copies on loan or held follow a new cover."""
+    if instance._stock is None:
+        adjust_covers(copies={instance.cover: instance.inventory})
+        return
+
+    cover, inventory = instance._stock
+    if cover == instance.cover:
+        adjust_covers(copies={cover: instance.inventory - inventory})
+        return
+
+    active, held = loans_and_holds(instance.pk)
+    adjust_covers(
+        copies={
+            cover: -(inventory + active + held),
+            instance.cover: instance.inventory + active + held,
+        },
+        active_loans={cover: -active, instance.cover: active},
+    )
+
+
+@receiver(pre_delete, sender=Book)
+def count_deleted_copies(sender, instance, **kwargs):
+    """The book's loans and holds are deleted with it, so are its copies."""
+    active, held = loans_and_holds(instance.pk)
+    adjust_covers(
+        copies={instance.cover: -(instance.inventory + active + held)},
+        active_loans={instance.cover: -active},
+    )
+
+
+@receiver(inventory_changed)
+def count_imported_copies(sender, copies, **kwargs):
+    adjust_covers(copies=copies)
@@ -0,0 +1,254 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from analytics.models import BookDailyStats, CoverLoanStats, UserLoanStats
+from books.imports import CatalogueImporter
+from books.models import Author, Book
+from borrowings.models import Borrowing
+from reservations.waitlist import reserve
+
+BORROWINGS_URL = reverse("borrowings:borrowings-list")
+BULK_RETURN_URL = reverse("borrowings:borrowings-bulk-return-view")
+BOOKS_URL = reverse("analytics:analytics-books")
+USERS_URL = reverse("analytics:analytics-users")
+COVERS_URL = reverse("analytics:analytics-covers")
+REVENUE_URL = reverse("analytics:analytics-revenue")
+TODAY = datetime.date.today()
+EXPECTED_RETURN_DATE = TODAY + datetime.timedelta(days=3)
+
+
+def return_url(borrowing_id):
+    return reverse("borrowings:borrowings-return-view", args=[borrowing_id])
+
+
+def sample_book(**params):
+    author = Author.objects.create(first_name="first", last_name="last")
+    defaults = {
+        "title": "Title",
+        "cover": "hard",
+        "inventory": 5,
+        "daily_fee": 0.50,
+    }
+    defaults.update(params)
+
+    book = Book.objects.create(**defaults)
+    book.author.add(author)
+    return book
+
+
+def snapshot():
+    return (
+        set(BookDailyStats.objects.values_list(
+            "day", "book", "checkouts", "returns", "revenue"
+        )),
+        set(UserLoanStats.objects.values_list(
+            "user", "checkouts", "returns"
+        )),
+        set(CoverLoanStats.objects.values_list(
+            "cover", "copies", "active_loans", "checkouts", "returns"
+        )),
+    )
+
+
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_user(
+            "admin@test.com", "testpass", is_staff=True
+        )
+        self.patrons = [
+            get_user_model().objects.create_user(f"user{i}@test.com", "testpass")
+            for i in range(2)
+        ]
+        self.hard = sample_book(title="Hard")
+        self.soft = sample_book(title="Soft", cover="soft", inventory=3)
+        self.client = APIClient()
+
+    def checkout(self, user, book):
+        self.client.force_authenticate(user)
+        res = self.client.post(BORROWINGS_URL, {
+            "book": book.id, "expected_return_date": EXPECTED_RETURN_DATE,
+        })
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return res.data["id"]
+
+    def give_back(self, user, borrowing_id):
+        self.client.force_authenticate(user)
+        res = self.client.post(return_url(borrowing_id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def get(self, url, params=None):
+        self.client.force_authenticate(self.admin)
+        return self.client.get(url, params)
+
+    def lend(self):
+        first, second = self.patrons
+        returned = self.checkout(first, self.hard)
+        self.checkout(first, self.hard)
+        self.checkout(second, self.hard)
+        self.checkout(second, self.soft)
+        self.give_back(first, returned)
+
+    def test_checkouts_and_returns_update_the_rollups(self):
+        self.lend()
+
+        stats = BookDailyStats.objects.get(day=TODAY, book=self.hard)
+        self.assertEqual((stats.checkouts, stats.returns), (3, 1))
+        self.assertEqual(stats.revenue, Decimal("0.50"))
+        stats = UserLoanStats.objects.get(user=self.patrons[0])
+        self.assertEqual((stats.checkouts, stats.returns), (2, 1))
+        self.assertEqual(
+            dict(CoverLoanStats.objects.values_list("cover", "active_loans")),
+            {"hard": 2, "soft": 1},
+        )
+
+    def test_bulk_return_updates_the_rollups(self):
+        self.checkout(self.patrons[0], self.hard)
+        self.checkout(self.patrons[0], self.soft)
+        ids = list(Borrowing.objects.values_list("id", flat=True))
+
+        self.client.post(BULK_RETURN_URL, {"ids": ids}, format="json")
+
+        stats = UserLoanStats.objects.get(user=self.patrons[0])
+        self.assertEqual((stats.checkouts, stats.returns), (2, 2))
+
+    def test_rebuild_matches_the_live_rollups(self):
+        self.lend()
+        live = snapshot()
+        out = StringIO()
+
+        call_command("rebuild_analytics", stdout=out)
+
+        self.assertEqual(snapshot(), live)
+        self.assertIn("Rebuilt 2 daily book rows", out.getvalue())
+
+    def test_catalogue_edits_keep_copies_in_step_with_a_rebuild(self):
+        self.lend()
+        reserve(self.patrons[0], self.soft)
+        self.hard.refresh_from_db()
+        self.soft.refresh_from_db()
+        self.hard.inventory = 4
+        self.hard.save()
+        self.soft.cover = "hard"
+        self.soft.save()
+        sample_book(title="Paper", cover="soft", inventory=6).delete()
+        CatalogueImporter().run([
+            (1, {"title": "Hard", "cover": "hard", "inventory": 9,
+                 "daily_fee": "0.50"}),
+            (2, {"title": "Pulp", "cover": "soft", "inventory": 2,
+                 "daily_fee": "0.10"}),
+        ])
+        stock = CoverLoanStats.objects.values_list(
+            "cover", "copies", "active_loans"
+        )
+        live = set(stock)
+
+        call_command("rebuild_analytics", stdout=StringIO())
+
+        # Past checkouts are rebuilt under the current cover, so only
+        # the stock is compared.
+        self.assertEqual(set(stock), live)
+        self.assertEqual(live, {("hard", 14, 3), ("soft", 2, 0)})
+
+    def test_held_copies_count_as_in_use(self):
+        self.checkout(self.patrons[0], self.soft)
+        reserve(self.patrons[1], self.soft)
+
+        covers = {row["cover"]: row for row in self.get(COVERS_URL).data}
+
+        self.assertEqual(covers["soft"]["held"], 1)
+        self.assertEqual(covers["soft"]["copies"], 3)
+        self.assertEqual(covers["soft"]["utilisation"], round(2 / 3, 4))
+
+    def test_rebuild_backfills_fines_of_late_returns(self):
+        borrowing = Borrowing.objects.create(
+            book=self.hard,
+            user=self.patrons[0],
+            expected_return_date=TODAY - datetime.timedelta(days=2),
+        )
+        Borrowing.objects.filter(id=borrowing.id).update(
+            borrow_date=TODAY - datetime.timedelta(days=6),
+            actual_return_date=TODAY,
+        )
+
+        call_command("rebuild_analytics", stdout=StringIO())
+
+        # Four days of fee, then two days of fine at the multiplier of 2.
+        self.assertEqual(
+            BookDailyStats.objects.get(day=TODAY).revenue, Decimal("4.00")
+        )
+
+    def test_reports(self):
+        self.lend()
+
+        books = self.get(BOOKS_URL).data
+        self.assertEqual(
+            [(row["title"], row["checkouts"]) for row in books],
+            [("Hard", 3), ("Soft", 1)],
+        )
+        users = self.get(USERS_URL, {"limit": 1}).data
+        self.assertEqual(users[0]["email"], "user1@test.com")
+        self.assertEqual(users[0]["active_loans"], 2)
+        covers = {row["cover"]: row for row in self.get(COVERS_URL).data}
+        self.assertEqual(covers["hard"]["copies"], 5)
+        self.assertEqual(covers["hard"]["utilisation"], 0.4)
+        self.assertEqual(covers["soft"]["utilisation"], round(1 / 3, 4))
+        revenue = self.get(REVENUE_URL, {"days": 1}).data
+        self.assertEqual(revenue, [{
+            "day": TODAY.isoformat(),
+            "checkouts": 4,
+            "returns": 1,
+            "revenue": "0.50",
+        }])
+
+    def test_window_leaves_out_older_days(self):
+        BookDailyStats.objects.create(
+            book=self.hard,
+            day=TODAY - datetime.timedelta(days=7),
+            checkouts=9,
+        )
+        self.checkout(self.patrons[0], self.soft)
+
+        books = self.get(BOOKS_URL, {"days": 7}).data
+
+        self.assertEqual([row["title"] for row in books], ["Soft"])
+
+    def test_invalid_parameters(self):
+        for params in ({"days": 0}, {"days": 367}, {"limit": "all"}):
+            res = self.get(BOOKS_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reports_read_only_the_rollups(self):
+        self.lend()
+
+        for url in (BOOKS_URL, USERS_URL, COVERS_URL, REVENUE_URL):
+            with CaptureQueriesContext(connection) as queries:
+                self.get(url)
+            self.assertFalse(any(
+                Borrowing._meta.db_table in query["sql"]
+                for query in queries.captured_queries
+            ), url)
+
+        # Covers only joins the catalogue to the open holds.
+        with CaptureQueriesContext(connection) as queries:
+            self.get(COVERS_URL)
+        self.assertFalse(any(
+            f'FROM "{Book._meta.db_table}"' in query["sql"]
+            for query in queries.captured_queries
+        ))
+
+    def test_reports_are_for_staff_only(self):
+        self.client.force_authenticate(self.patrons[0])
+
+        for url in (BOOKS_URL, USERS_URL, COVERS_URL, REVENUE_URL):
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,12 @@
+from rest_framework import routers
+
+from analytics.views import AnalyticsViewSet
+
+
+router = routers.DefaultRouter()
+router.register("", AnalyticsViewSet, basename="analytics")
+
+
+urlpatterns = router.urls
+
+app_name = "analytics"
@@ -0,0 +1,87 @@
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from analytics import reports
+from analytics.serializers import (
+    BookStatsSerializer,
+    CoverStatsSerializer,
+    DailyRevenueSerializer,
+    UserStatsSerializer,
+)
+from metrics.timing import TimedViewMixin
+
+DAYS = OpenApiParameter(
+    "days", int, description="Days in the window, today included (1-366)."
+)
+LIMIT = OpenApiParameter("limit", int, description="Rows returned (1-100).")
+
+
+class AnalyticsViewSet(TimedViewMixin, viewsets.ViewSet):
+    """Library statistics for staff, read from the analytics rollups.
+
+    Windowed reports read ``?days=`` days of daily rows and the others
+    read running counters, so no request aggregates the borrowings.
+    """
+    permission_classes = (IsAdminUser,)
+    default_days = 30
+    max_days = 366
+    default_limit = 10
+    max_limit = 100
+
+    def get_int_param(self, name, default, maximum) -> int:
+        value = self.request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except ValueError:
+            value = 0
+        if not 1 <= value <= maximum:
+            raise ValidationError(
+                {name: f"Pass a whole number from 1 to {maximum}"}
+            )
+        return value
+
+    def get_days(self) -> int:
+        return self.get_int_param("days", self.default_days, self.max_days)
+
+    def get_limit(self) -> int:
+        return self.get_int_param(
+            "limit", self.default_limit, self.max_limit
+        )
+
+    @extend_schema(
+        parameters=[DAYS, LIMIT], responses=BookStatsSerializer(many=True)
+    )
+    @action(methods=["GET"], detail=False)
+    def books(self, request):
+        """Most borrowed books of the last ``?days=`` days."""
+        rows = reports.top_books(self.get_days(), self.get_limit())
+        return Response(BookStatsSerializer(rows, many=True).data)
+
+    @extend_schema(
+        parameters=[LIMIT], responses=UserStatsSerializer(many=True)
+    )
+    @action(methods=["GET"], detail=False)
+    def users(self, request):
+        """Patrons with the most active loans."""
+        rows = reports.top_users(self.get_limit())
+        return Response(UserStatsSerializer(rows, many=True).data)
+
+    @extend_schema(responses=CoverStatsSerializer(many=True))
+    @action(methods=["GET"], detail=False)
+    def covers(self, request):
+        """Share of the copies of each cover type on loan or held."""
+        rows = reports.cover_utilisation()
+        return Response(CoverStatsSerializer(rows, many=True).data)
+
+    @extend_schema(
+        parameters=[DAYS], responses=DailyRevenueSerializer(many=True)
+    )
+    @action(methods=["GET"], detail=False)
+    def revenue(self, request):
+        """Revenue billed on returns, per day of the last ``?days=`` days."""
+        rows = reports.daily_revenue(self.get_days())
+        return Response(DailyRevenueSerializer(rows, many=True).data)
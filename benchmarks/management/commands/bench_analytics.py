@@ -0,0 +1,97 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Sum
+
+from analytics import reports
+from analytics.rollups import rebuild
+from benchmarks.seed import seed_borrowings, seed_catalogue, seed_users
+from benchmarks.utils import percentiles, scratch_database
+from borrowings.models import Borrowing
+from borrowings.quota import recount_loans
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the analytics reports read from the rollups against the "
+        "same reports aggregated over the borrowings, at growing history."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=10_000)
+        parser.add_argument(
+            "--borrowings", type=int, nargs="+",
+            default=[10_000, 100_000, 300_000],
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            user_ids = seed_users(1_000)
+            book_ids = seed_catalogue(options["books"], options["books"] // 10)
+            seeded = 0
+
+            for total in options["borrowings"]:
+                seed_borrowings(total - seeded, user_ids, book_ids)
+                seeded = total
+                started = time.perf_counter()
+                rebuild()
+                # The users report reads the quota counters.
+                recount_loans()
+                self.stdout.write(
+                    f"{total} borrowings: rebuild "
+                    f"{(time.perf_counter() - started) * 1000:.0f} ms"
+                )
+                for name, rollup in (
+                    ("books", lambda: reports.top_books(30, 10)),
+                    ("users", lambda: reports.top_users(10)),
+                    ("revenue", lambda: reports.daily_revenue(30)),
+                ):
+                    self.report(f"  {name} rollup", options["repeat"], rollup)
+                    self.report(f"  {name} on the fly", options["repeat"],
+                                getattr(self, f"live_{name}"))
+
+    def report(self, label, repeat, call):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            call()
+            timings.append(time.perf_counter() - started)
+
+        result = percentiles(timings)
+        self.stdout.write(
+            f"{label}: p50 {result['p50'] * 1000:.1f} ms, "
+            f"p95 {result['p95'] * 1000:.1f} ms"
+        )
+
+    # What the reports would run without the rollups.
+
+    def live_books(self):
+        since = datetime.date.today() - datetime.timedelta(days=29)
+        return list(
+            Borrowing.objects.filter(borrow_date__gte=since)
+            .values("book", "book__title")
+            .annotate(checkouts=Count("id"))
+            .order_by("-checkouts", "book")[:10]
+        )
+
+    def live_users(self):
+        return list(
+            Borrowing.objects.filter(actual_return_date__isnull=True)
+            .values("user", "user__email")
+            .annotate(active_loans=Count("id"))
+            .order_by("-active_loans", "user")[:10]
+        )
+
+    def live_revenue(self):
+        since = datetime.date.today() - datetime.timedelta(days=29)
+        return list(
+            Borrowing.objects.filter(actual_return_date__gte=since)
+            .values(day=F("actual_return_date"))
+            .annotate(
+                returns=Count("id"),
+                revenue=Sum("payments__money_to_pay"),
+            )
+            .order_by("day")
+        )
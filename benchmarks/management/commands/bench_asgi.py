@@ -0,0 +1,137 @@
+import asyncio
+import importlib
+import time
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, override_settings
+from django.urls import clear_url_caches, reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from benchmarks.suite import seed
+from benchmarks.utils import load_wsgi, scratch_database
+from books.cache import get_cache
+from borrowings.models import Borrowing
+
+URLCONFS = ("books.urls", "borrowings.urls", settings.ROOT_URLCONF)
+
+
+def reload_urls():
+    for module in URLCONFS:
+        importlib.reload(importlib.import_module(module))
+    clear_url_caches()
+
+
+class Command(BaseCommand):
+    help = (
+        "Load the read endpoints with concurrent clients, once through the "
+        "WSGI handler on a thread pool and once through the ASGI handler "
+        "with the async read views, and compare throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", default="small")
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=64)
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="WSGI worker threads, as in a threaded WSGI server.",
+        )
+        parser.add_argument(
+            "--db-latency",
+            type=float,
+            default=0.002,
+            help="Seconds added to every query, standing in for the network "
+                 "round trip to a database server.",
+        )
+
+    def handle(self, *args, **options):
+        latency = options["db_latency"]
+
+        def delay(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def add_latency(connection, **kwargs):
+            connection.execute_wrappers.append(delay)
+
+        # Measure the views, not the response cache.
+        with scratch_database(), override_settings(CATALOGUE_CACHE_TIMEOUT=0):
+            fixtures = seed(options["scale"])
+            patron = fixtures.users["patron"]
+            borrowing_id = (
+                Borrowing.objects.filter(user=patron)
+                .values_list("id", flat=True).first()
+            )
+            token = f"Bearer {AccessToken.for_user(patron)}"
+            books = fixtures.book_ids
+            urls = [
+                (reverse("books:books-list"), None),
+                (reverse("books:books-list") + "?page=3", None),
+                (reverse("books:books-detail", args=[books[0]]), None),
+                (reverse("borrowings:borrowings-list"), token),
+                (
+                    reverse("borrowings:borrowings-detail",
+                            args=[borrowing_id]),
+                    token,
+                ),
+            ]
+            get_cache().clear()
+
+            if latency:
+                connection_created.connect(add_latency)
+            try:
+                wsgi = load_wsgi(
+                    urls, options["requests"], options["threads"]
+                )
+                with override_settings(
+                    ASYNC_READ_VIEWS=True,
+                    MIDDLEWARE=[
+                        name for name in settings.MIDDLEWARE
+                        if not name.startswith("debug_toolbar")
+                    ],
+                ):
+                    reload_urls()
+                    try:
+                        asgi = asyncio.run(self.run_asgi(urls, options))
+                    finally:
+                        reload_urls()
+            finally:
+                connection_created.disconnect(add_latency)
+
+        self.stdout.write(
+            f"{options['requests']} requests, {options['concurrency']} "
+            f"concurrent, {latency * 1000:.1f} ms per query"
+        )
+        for name, (seconds, statuses) in (("wsgi", wsgi), ("asgi", asgi)):
+            self.stdout.write(
+                f"{name}: {options['requests'] / seconds:8.0f} req/s "
+                f"({seconds:.2f} s, statuses {sorted(set(statuses))})"
+            )
+
+    @staticmethod
+    async def run_asgi(urls, options):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(options["concurrency"])
+
+        async def request(index):
+            url, token = urls[index % len(urls)]
+            headers = {"Authorize": token} if token else {}
+            async with semaphore:
+                # As the ASGI handler does, give every request its own
+                # thread for sync work instead of one shared thread.
+                async with ThreadSensitiveContext():
+                    response = await client.get(url, headers=headers)
+                    await sync_to_async(close_old_connections)()
+                    return response.status_code
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(
+            *(request(index) for index in range(options["requests"]))
+        )
+        return time.perf_counter() - started, statuses
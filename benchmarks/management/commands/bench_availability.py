@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from benchmarks.seed import seed_borrowings, seed_catalogue, seed_users
+from benchmarks.utils import percentiles, scratch_database
+from books.cache import get_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Fetch the availability of a page of books with one batched "
+        "request and with one retrieve per book, as the catalogue UI did."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=10_000)
+        parser.add_argument("--borrowings", type=int, default=50_000)
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--pages", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            book_ids = seed_catalogue(options["books"], options["books"] // 10)
+            seed_borrowings(
+                options["borrowings"], seed_users(1_000), book_ids
+            )
+            size = options["page_size"]
+            pages = [
+                book_ids[start:start + size]
+                for start in range(0, options["pages"] * size, size)
+            ]
+            client = APIClient()
+            url = reverse("books:books-availability")
+
+            self.compare("per book", client, pages, lambda page: [
+                reverse("books:books-detail", args=[book_id])
+                for book_id in page
+            ])
+            self.compare("batched", client, pages, lambda page: [
+                f"{url}?ids={','.join(map(str, page))}"
+            ])
+
+    def compare(self, label, client, pages, urls_for):
+        timings = []
+        for page in pages:
+            urls = urls_for(page)
+            get_cache().clear()
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for url in urls:
+                    client.get(url)
+                timings.append(time.perf_counter() - started)
+
+        result = percentiles(timings)
+        self.stdout.write(
+            f"{label}: {len(urls)} requests, {len(queries)} queries per "
+            f"page; p50 {result['p50'] * 1000:.1f} ms, "
+            f"p95 {result['p95'] * 1000:.1f} ms"
+        )
@@ -0,0 +1,91 @@
+import datetime
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from benchmarks.utils import scratch_database
+from books.models import Book
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare query count and latency of N single checkouts/returns "
+        "with one bulk checkout/return of the same cart."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cart", type=int, default=20,
+                            help="Books per patron cart.")
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            client = APIClient()
+            client.force_authenticate(
+                get_user_model().objects.create_user(
+                    "bench@bench.com", "benchpass"
+                )
+            )
+            books = [
+                Book.objects.create(
+                    title=f"Bench {i}", cover="hard", inventory=10, daily_fee=1
+                )
+                for i in range(options["cart"])
+            ]
+            expected_return_date = (
+                datetime.date.today() + datetime.timedelta(days=7)
+            )
+            items = [
+                {"book": book.id, "expected_return_date": expected_return_date}
+                for book in books
+            ]
+            list_url = reverse("borrowings:borrowings-list")
+
+            def single_checkout():
+                return [
+                    client.post(list_url, item, format="json").data["id"]
+                    for item in items
+                ]
+
+            def bulk_checkout():
+                res = client.post(
+                    reverse("borrowings:borrowings-bulk-create-view"),
+                    {"items": items},
+                    format="json",
+                )
+                return [result["id"] for result in res.data]
+
+            def single_return(ids):
+                for borrowing_id in ids:
+                    client.post(reverse(
+                        "borrowings:borrowings-return-view",
+                        args=[borrowing_id],
+                    ))
+
+            def bulk_return(ids):
+                client.post(
+                    reverse("borrowings:borrowings-bulk-return-view"),
+                    {"ids": ids},
+                    format="json",
+                )
+
+            single_ids = self.measure("single checkout", single_checkout)
+            bulk_ids = self.measure("bulk checkout", bulk_checkout)
+            self.measure("single return", lambda: single_return(single_ids))
+            self.measure("bulk return", lambda: bulk_return(bulk_ids))
+
+    def measure(self, name, call):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            result = call()
+            elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{name:>16}: {len(queries):4d} queries, "
+            f"{elapsed * 1000:8.1f} ms"
+        )
+        return result
@@ -0,0 +1,98 @@
+import datetime
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, transaction
+from rest_framework.exceptions import ValidationError
+
+from benchmarks.utils import run_threads, scratch_database
+from books.models import Book
+from borrowings.models import Borrowing
+from borrowings.serializers import BorrowingCreateSerializer
+
+
+class LegacyBorrowingCreateSerializer(BorrowingCreateSerializer):
+    """The read-modify-write checkout used before the conditional UPDATE."""
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            borrowing = Borrowing.objects.create(**validated_data)
+            borrowing.book.inventory -= 1
+            borrowing.book.save()
+            return borrowing
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent checkout throughput and oversell of the legacy "
+        "read-modify-write path with the conditional UPDATE path."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--checkouts", type=int, default=25,
+                            help="Checkout attempts per thread.")
+        parser.add_argument("--inventory", type=int, default=100)
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            user = get_user_model().objects.create_user(
+                "bench@bench.com", "benchpass"
+            )
+            for name, serializer_class in (
+                ("legacy", LegacyBorrowingCreateSerializer),
+                ("atomic", BorrowingCreateSerializer),
+            ):
+                self.report(name, self.run(serializer_class, user, options))
+
+    def run(self, serializer_class, user, options):
+        inventory = options["inventory"]
+        book = Book.objects.create(
+            title="Bench", cover="hard", inventory=inventory, daily_fee=1
+        )
+        payload = {
+            "book": book.id,
+            "expected_return_date": datetime.date.today()
+            + datetime.timedelta(days=7),
+        }
+
+        def checkout():
+            # Each thread counts its own outcomes; ``+=`` on shared counters
+            # from several threads can lose updates.
+            outcome = Counter()
+            for _ in range(options["checkouts"]):
+                serializer = serializer_class(data=payload)
+                try:
+                    serializer.is_valid(raise_exception=True)
+                    serializer.save(user=user)
+                except ValidationError:
+                    outcome["rejected"] += 1
+                except DatabaseError:
+                    outcome["errors"] += 1
+            return outcome
+
+        elapsed, outcomes, _ = run_threads(
+            checkout, [()] * options["threads"]
+        )
+        outcome = sum(outcomes, Counter())
+        book.refresh_from_db()
+        created = Borrowing.objects.filter(book=book).count()
+
+        return {
+            "elapsed": elapsed,
+            "created": created,
+            "rejected": outcome["rejected"],
+            "errors": outcome["errors"],
+            "oversold": max(0, created - inventory),
+            "lost_updates": book.inventory - (inventory - created),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:>7}: {result['created'] / result['elapsed']:8.1f} "
+            f"checkouts/s, created={result['created']} "
+            f"rejected={result['rejected']} errors={result['errors']} "
+            f"oversold={result['oversold']} "
+            f"lost_updates={result['lost_updates']}"
+        )
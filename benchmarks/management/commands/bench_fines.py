@@ -0,0 +1,72 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+
+from benchmarks.seed import seed_borrowings, seed_catalogue, seed_users
+from benchmarks.utils import scratch_database
+from borrowings.models import Borrowing
+from payments.billing import calculate, compute_outstanding_fines
+from payments.models import Payment
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute fines for many active borrowings in one set-based pass "
+        "and compare with calculating and saving them row by row."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--borrowings", type=int, default=1_000_000)
+        parser.add_argument("--books", type=int, default=10_000)
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument(
+            "--row-sample",
+            type=int,
+            default=5_000,
+            help="Borrowings billed one by one for the per-row comparison.",
+        )
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            seed_borrowings(
+                options["borrowings"],
+                seed_users(options["users"]),
+                seed_catalogue(options["books"], options["books"] // 10),
+                active_ratio=1.0,
+            )
+            today = datetime.date.today()
+
+            for label in ("set-based", "set-based rerun"):
+                started = time.perf_counter()
+                result = compute_outstanding_fines(today)
+                seconds = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label}: {result['updated']} fines in {seconds:.2f} s, "
+                    f"{result['updated'] / seconds:.0f} rows/s "
+                    f"({result['count']} outstanding, {result['total']})"
+                )
+
+            Payment.objects.all().delete()
+            self.per_row(options["row_sample"], today, options["borrowings"])
+
+    def per_row(self, sample, today, total):
+        borrowings = Borrowing.objects.filter(
+            actual_return_date__isnull=True, expected_return_date__lt=today
+        ).select_related("book")[:sample]
+
+        started = time.perf_counter()
+        for borrowing in borrowings:
+            _, fine = calculate(borrowing, borrowing.book.daily_fee, today)
+            Payment.objects.update_or_create(
+                borrowing=borrowing,
+                type=Payment.TypeChoices.FINE,
+                status=Payment.StatusChoices.PENDING,
+                defaults={"money_to_pay": fine, "calculated_on": today},
+            )
+        seconds = time.perf_counter() - started
+        self.stdout.write(
+            f"per-row: {sample} fines in {seconds:.2f} s, "
+            f"{sample / seconds:.0f} rows/s "
+            f"(~{total / sample * seconds:.0f} s extrapolated to {total})"
+        )
@@ -0,0 +1,107 @@
+import os
+import random
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from benchmarks.seed import NAMES, WORDS
+from benchmarks.utils import scratch_database
+from books.imports import CatalogueImporter, read_rows
+from books.models import Author
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a synthetic CSV catalogue with the bulk importer and "
+        "compare with creating books one POST at a time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=1_000_000)
+        parser.add_argument("--authors", type=int, default=50_000)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--api-books",
+            type=int,
+            default=200,
+            help="Books created through POST /api/books/ for comparison.",
+        )
+
+    def handle(self, *args, **options):
+        path = self.write_catalogue(options["books"], options["authors"])
+        try:
+            with scratch_database():
+                with open(path, newline="", encoding="utf-8") as stream:
+                    report = CatalogueImporter(options["batch_size"]).run(
+                        read_rows(stream, "csv")
+                    )
+                self.stdout.write(
+                    f"bulk import: {report['rows']} rows in "
+                    f"{report['seconds']} s, {report['rows_per_second']} rows/s "
+                    f"({report['created']} created, "
+                    f"{report['authors_created']} authors)"
+                )
+                self.api_import(options["api_books"])
+
+                # A second pass only updates inventory and fees.
+                with open(path, newline="", encoding="utf-8") as stream:
+                    report = CatalogueImporter(options["batch_size"]).run(
+                        read_rows(stream, "csv")
+                    )
+                self.stdout.write(
+                    f"bulk upsert: {report['updated']} updated, "
+                    f"{report['rows_per_second']} rows/s"
+                )
+        finally:
+            os.remove(path)
+
+    @staticmethod
+    def write_catalogue(books, authors) -> str:
+        rng = random.Random(0)
+        names = [
+            f"{rng.choice(NAMES)} {rng.choice(WORDS).title()}{index}"
+            for index in range(authors)
+        ]
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", delete=False, encoding="utf-8"
+        ) as catalogue:
+            catalogue.write("title,author,cover,inventory,daily_fee\n")
+            for index in range(books):
+                title = " ".join(rng.choices(WORDS, k=3)).title()
+                catalogue.write(
+                    f"{title} {index},"
+                    f"{'; '.join(rng.sample(names, rng.randint(1, 3)))},"
+                    f"{rng.choice(('hard', 'soft'))},{rng.randint(1, 50)},"
+                    f"{rng.randint(10, 999) / 100:.2f}\n"
+                )
+        return catalogue.name
+
+    def api_import(self, count):
+        if not count:
+            return
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(
+            "import@bench.com", "benchpass", is_staff=True
+        ))
+        author_ids = list(
+            Author.objects.values_list("id", flat=True)[:count]
+        )
+
+        started = time.perf_counter()
+        for index in range(count):
+            client.post(reverse("books:books-list"), {
+                "title": f"Posted {index}",
+                "author": author_ids[index % len(author_ids):][:2],
+                "cover": "hard",
+                "inventory": 1,
+                "daily_fee": "1.00",
+            }, format="json")
+        seconds = time.perf_counter() - started
+        self.stdout.write(
+            f"one POST per book: {count} books in {seconds:.1f} s, "
+            f"{count / seconds:.0f} rows/s"
+        )
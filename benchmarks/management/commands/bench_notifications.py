@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from benchmarks.seed import seed_borrowings, seed_catalogue, seed_users
+from benchmarks.utils import scratch_database
+from borrowings.models import Borrowing
+from notifications.models import Notification
+from notifications.outbox import enqueue, drain
+from notifications.senders import BaseSender
+
+
+class DelayedSender(BaseSender):
+    def __init__(self, latency):
+        self.latency = latency
+        self.sent = 0
+
+    def send(self, message):
+        if self.latency:
+            time.sleep(self.latency)
+        self.sent += 1
+
+
+class Command(BaseCommand):
+    help = "Drain a filled notification outbox and report its throughput."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--notifications", type=int, default=100_000)
+        parser.add_argument("--batch-size", type=int, nargs="*",
+                            default=[10, 100, 1000])
+        parser.add_argument(
+            "--sender-latency",
+            type=float,
+            default=0.0,
+            help="Seconds each send takes, standing in for a remote call.",
+        )
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            seed_borrowings(
+                options["notifications"],
+                seed_users(1000),
+                seed_catalogue(1000, 100),
+            )
+            sender = DelayedSender(options["sender_latency"])
+
+            for batch_size in options["batch_size"]:
+                Notification.objects.all().delete()
+                started = time.perf_counter()
+                queued = enqueue(
+                    Notification.EventChoices.CHECKOUT,
+                    Borrowing.objects.all(),
+                )
+                enqueued = time.perf_counter() - started
+
+                started = time.perf_counter()
+                sent = 0
+                while True:
+                    result = drain(sender, batch_size)
+                    sent += result["sent"]
+                    if result["claimed"] < batch_size:
+                        break
+                seconds = time.perf_counter() - started
+
+                self.stdout.write(
+                    f"batch {batch_size:>5}: queued {queued} in "
+                    f"{enqueued:.2f} s, drained {sent} in {seconds:.2f} s, "
+                    f"{sent / seconds:.0f} msg/s"
+                )
@@ -0,0 +1,121 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from benchmarks.suite import seed
+from benchmarks.utils import load_wsgi, scratch_database
+from books.cache import get_cache
+from borrowings.models import Borrowing
+
+
+class Command(BaseCommand):
+    help = (
+        "Load the read endpoints through the WSGI handler once per settings "
+        "profile, each in its own process, and compare throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles", nargs="+", default=["dev", "prod"],
+            choices=["dev", "test", "prod"],
+        )
+        parser.add_argument("--scale", default="small")
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument(
+            "--connect-latency",
+            type=float,
+            default=0.005,
+            help="Seconds added to opening a connection, standing in for "
+                 "the handshake with a database server.",
+        )
+        parser.add_argument(
+            "--run", action="store_true",
+            help="Measure the current profile and print the result as JSON.",
+        )
+
+    def handle(self, *args, **options):
+        if options["run"]:
+            self.stdout.write(json.dumps(self.measure(options)))
+            return
+
+        results = {}
+        for profile in options["profiles"]:
+            results[profile] = self.run_profile(profile, options)
+            seconds, statuses = results[profile]
+            self.stdout.write(
+                f"{profile}: {options['requests'] / seconds:8.0f} req/s "
+                f"({seconds:.2f} s, statuses {sorted(set(statuses))})"
+            )
+
+        first, *others = options["profiles"]
+        for profile in others:
+            self.stdout.write(
+                f"{profile} vs {first}: "
+                f"x{results[first][0] / results[profile][0]:.2f} throughput"
+            )
+
+    def run_profile(self, profile, options) -> tuple:
+        # Settings are read once per process, so each profile gets one.
+        # The run serves from that one process, so the prod profile's
+        # check for a catalogue cache shared between workers is skipped.
+        command = [
+            sys.executable, str(settings.BASE_DIR / "manage.py"),
+            "bench_profiles", "--run", "--skip-checks",
+            "--scale", options["scale"],
+            "--requests", str(options["requests"]),
+            "--threads", str(options["threads"]),
+            "--connect-latency", str(options["connect_latency"]),
+        ]
+        result = subprocess.run(
+            command,
+            env={**os.environ, "DJANGO_PROFILE": profile},
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"{profile} profile failed:\n{result.stderr}")
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def measure(self, options) -> tuple:
+        def connect(connection, **kwargs):
+            time.sleep(options["connect_latency"])
+
+        # The scratch database turns DEBUG off as the test runner does;
+        # the profile's own value is what is being measured.
+        debug = settings.DEBUG
+        with scratch_database(), override_settings(
+            DEBUG=debug, CATALOGUE_CACHE_TIMEOUT=0
+        ):
+            fixtures = seed(options["scale"])
+            patron = fixtures.users["patron"]
+            borrowing_id = (
+                Borrowing.objects.filter(user=patron)
+                .values_list("id", flat=True).first()
+            )
+            token = f"Bearer {AccessToken.for_user(patron)}"
+            urls = [
+                (reverse("books:books-list"), None),
+                (reverse("books:books-list") + "?page=3", None),
+                (reverse("books:books-detail", args=[fixtures.book_ids[0]]),
+                 None),
+                (reverse("borrowings:borrowings-list"), token),
+                (reverse("borrowings:borrowings-detail", args=[borrowing_id]),
+                 token),
+            ]
+            get_cache().clear()
+
+            connection_created.connect(connect)
+            try:
+                return load_wsgi(urls, options["requests"], options["threads"])
+            finally:
+                connection_created.disconnect(connect)
@@ -0,0 +1,91 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from benchmarks.utils import percentiles, scratch_database
+from books.models import Book, BookListing
+from books.search import LikeSearchBackend, get_backend
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "dor", "len"]
+
+
+def synthetic_words(count, seed=0):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare title__icontains scans with the full-text search backend "
+        "on a synthetic catalogue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=1_000_000)
+        parser.add_argument("--queries", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            words = synthetic_words(5000)
+            self.seed(words, options["books"], options["batch_size"])
+
+            rng = random.Random(1)
+            terms = [rng.choice(words) for _ in range(options["queries"])]
+            queryset = BookListing.objects.all()
+
+            self.measure("icontains", terms, lambda term: queryset.filter(
+                title__icontains=term
+            ))
+            self.measure("like backend", terms, lambda term: (
+                LikeSearchBackend().filter(queryset, term, ("title",))
+            ))
+            self.measure(type(get_backend()).__name__, terms, lambda term: (
+                get_backend().filter(queryset, term[:4], ("title",))
+            ))
+            self.measure("ranked search", terms, lambda term: (
+                get_backend().rank(queryset, term)
+            ))
+
+    def seed(self, words, count, batch_size):
+        rng = random.Random(0)
+        started = time.perf_counter()
+
+        for start in range(0, count, batch_size):
+            with transaction.atomic():
+                books = Book.objects.bulk_create(
+                    Book(
+                        title=" ".join(rng.choices(words, k=3)).title(),
+                        cover="hard",
+                        inventory=rng.randint(0, 10),
+                        daily_fee=1,
+                    )
+                    for _ in range(min(batch_size, count - start))
+                )
+                book_ids = [book.id for book in books]
+                BookListing.refresh(book_ids)
+                get_backend().index_books(book_ids)
+
+        self.stdout.write(
+            f"Seeded {count} books in {time.perf_counter() - started:.1f} s"
+        )
+
+    def measure(self, name, terms, build_queryset):
+        timings = []
+        for term in terms:
+            started = time.perf_counter()
+            queryset = build_queryset(term)
+            queryset.count()
+            list(queryset[:5])
+            timings.append(time.perf_counter() - started)
+
+        result = percentiles(timings)
+        self.stdout.write(
+            f"{name:>22}: p50 {result['p50'] * 1000:8.2f} ms, "
+            f"p95 {result['p95'] * 1000:8.2f} ms"
+        )
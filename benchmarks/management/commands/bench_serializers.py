@@ -0,0 +1,85 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from benchmarks.seed import seed_borrowings, seed_catalogue, seed_users
+from benchmarks.utils import percentiles, scratch_database
+from books.models import BookListing
+from books.serializers import BookListingReadSerializer, BookListingSerializer
+from borrowings.models import Borrowing
+from borrowings.serializers import (
+    BorrowingListReadSerializer,
+    BorrowingListSerializer,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare CPU time per page of the model serializers with the "
+        "values() read serializers for book and borrowing lists."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--pages", type=int, default=50)
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            user_ids = seed_users(100)
+            book_ids = seed_catalogue(options["rows"], options["rows"] // 10)
+            seed_borrowings(options["rows"], user_ids, book_ids)
+
+            size = options["page_size"]
+            listings = BookListing.objects.order_by("title", "book_id")
+            borrowings = Borrowing.objects.order_by("borrow_date", "id")
+
+            self.compare("books", options["pages"], size, (
+                lambda page: BookListingSerializer(
+                    listings[page:page + size], many=True
+                ).data
+            ), (
+                lambda page: BookListingReadSerializer(
+                    BookListingReadSerializer.select(
+                        listings[page:page + size]
+                    ),
+                    many=True,
+                ).data
+            ))
+            self.compare("borrowings", options["pages"], size, (
+                lambda page: BorrowingListSerializer(
+                    borrowings.select_related("book", "user")
+                    .prefetch_related("book__author")[page:page + size],
+                    many=True,
+                ).data
+            ), (
+                lambda page: BorrowingListReadSerializer(
+                    BorrowingListReadSerializer.select(
+                        borrowings[page:page + size]
+                    ),
+                    many=True,
+                ).data
+            ))
+
+    def compare(self, name, pages, size, model_page, values_page):
+        model = self.measure(pages, size, model_page)
+        values = self.measure(pages, size, values_page)
+        for label, result in (("model", model), ("values", values)):
+            self.stdout.write(
+                f"{name:>10} {label:>6}: p50 {result['p50'] * 1000:7.2f} ms, "
+                f"p95 {result['p95'] * 1000:7.2f} ms CPU per page"
+            )
+        self.stdout.write(
+            f"{name:>10}: {1 - values['p50'] / model['p50']:.0%} less CPU"
+        )
+
+    @staticmethod
+    def measure(pages, size, build_page):
+        """CPU time to fetch, serialize and render one page."""
+        timings = []
+        for page in range(pages):
+            started = time.process_time()
+            JSONRenderer().render(build_page(page * size))
+            timings.append(time.process_time() - started)
+        return percentiles(timings)
@@ -0,0 +1,126 @@
+import datetime
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import Client, override_settings
+from django.test.client import ClientHandler
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from benchmarks.utils import percentiles, scratch_database
+from books.models import Book
+
+SCENARIOS = {
+    "unprotected": {"THROTTLE_RATES": {}, "MAX_INFLIGHT_WRITES": 0},
+    "shedding": {"THROTTLE_RATES": {}},
+    "throttled": {},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Flood checkouts from one patron while another checks out, and "
+        "compare the other patron's latency with no protection, with load "
+        "shedding only, and with the checkout throttle and shedding."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--flood-rate", type=float, default=100,
+                            help="Checkouts per second offered by the "
+                                 "flooding patron, across the threads.")
+        parser.add_argument("--checkouts", type=int, default=20,
+                            help="Checkouts sent one by one by the patron.")
+        parser.add_argument("--max-inflight", type=int, default=4)
+        parser.add_argument("--rate", default="30/min")
+
+    def handle(self, *args, **options):
+        with scratch_database(), override_settings(MAX_ACTIVE_LOANS=2**31):
+            book = Book.objects.create(
+                title="Bench", cover="hard", inventory=10**6, daily_fee=1
+            )
+            protected = {
+                "THROTTLE_RATES": {"checkout": options["rate"]},
+                "MAX_INFLIGHT_WRITES": options["max_inflight"],
+            }
+            for index, (name, overrides) in enumerate(SCENARIOS.items()):
+                users = [
+                    get_user_model().objects.create_user(
+                        f"{role}{index}@bench.com", "benchpass"
+                    )
+                    for role in ("flooder", "patron")
+                ]
+                with override_settings(**{**protected, **overrides}):
+                    self.report(name, self.run(book, *users, options))
+
+    def run(self, book, flooder, patron, options):
+        url = reverse("borrowings:borrowings-list")
+        payload = json.dumps({
+            "book": book.id,
+            "expected_return_date": str(
+                datetime.date.today() + datetime.timedelta(days=7)
+            ),
+        })
+        # One handler, as in a server process, so in-flight writes are
+        # counted across the threads.
+        handler = ClientHandler()
+        tokens = {
+            user: f"Bearer {AccessToken.for_user(user)}"
+            for user in (flooder, patron)
+        }
+
+        def checkout(user):
+            client = Client()
+            client.handler = handler
+            try:
+                return client.post(
+                    url, payload, content_type="application/json",
+                    HTTP_AUTHORIZE=tokens[user],
+                ).status_code
+            finally:
+                close_old_connections()
+
+        def flood():
+            # Paced as clients over the network would be; looping flat out
+            # would measure threads fighting over the interpreter instead.
+            statuses = Counter()
+            interval = options["threads"] / options["flood_rate"]
+            while not done.wait(interval):
+                statuses[checkout(flooder)] += 1
+            return statuses
+
+        checkout(patron)
+        done = threading.Event()
+        timings, patron_statuses = [], Counter()
+        with ThreadPoolExecutor(options["threads"]) as pool:
+            floods = [pool.submit(flood) for _ in range(options["threads"])]
+            # The flood runs for as long as the patron checks out.
+            time.sleep(0.5)
+            for _ in range(options["checkouts"]):
+                started = time.perf_counter()
+                patron_statuses[checkout(patron)] += 1
+                timings.append(time.perf_counter() - started)
+            done.set()
+            flood_statuses = sum(
+                (future.result() for future in floods), Counter()
+            )
+
+        return {
+            **percentiles(timings),
+            "patron": patron_statuses,
+            "flood": flood_statuses,
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:>11}: patron p50={result['p50'] * 1000:7.1f} ms "
+            f"p95={result['p95'] * 1000:7.1f} ms "
+            f"statuses={dict(sorted(result['patron'].items()))}; "
+            f"flood statuses={dict(sorted(result['flood'].items()))}"
+        )
@@ -0,0 +1,91 @@
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from benchmarks.suite import SCALES, compare, run_scenario, scenarios, seed
+from benchmarks.utils import scratch_database
+
+BASELINE = Path(__file__).resolve().parents[2] / "baseline.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a scratch database and record query counts, p50/p95 latency "
+        "and peak allocations for every API route; fail on regressions "
+        "against the committed baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=SCALES, default="small")
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--only", nargs="*", default=None,
+                            help="Run only scenarios with these names.")
+        parser.add_argument("--baseline", type=Path, default=BASELINE)
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Store this run as the baseline for the scale.",
+        )
+        parser.add_argument(
+            "--latency-tolerance",
+            type=float,
+            default=None,
+            help="Fail when p95 exceeds baseline p95 times this factor; "
+                 "query counts are always checked.",
+        )
+
+    def handle(self, *args, **options):
+        scale = options["scale"]
+        baseline_file = options["baseline"]
+        baselines = (
+            json.loads(baseline_file.read_text())
+            if baseline_file.exists() else {}
+        )
+
+        # Repeated checkouts would run the patron into the borrowing
+        # quota; the quota check itself still runs on every checkout.
+        with scratch_database(), override_settings(MAX_ACTIVE_LOANS=2**31):
+            started = time.perf_counter()
+            fixtures = seed(scale)
+            self.stdout.write(
+                f"Seeded {scale} scale in {time.perf_counter() - started:.1f} s"
+            )
+
+            results = {}
+            for scenario in scenarios(fixtures):
+                if options["only"] and scenario.name not in options["only"]:
+                    continue
+                results[scenario.name] = run_scenario(
+                    scenario, fixtures, options["repeat"]
+                )
+                self.report(scenario.name, results[scenario.name])
+
+        if options["update_baseline"]:
+            baselines[scale] = results
+            baseline_file.write_text(json.dumps(baselines, indent=2) + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Updated {baseline_file}"))
+            return
+
+        baseline = {
+            name: expected
+            for name, expected in baselines.get(scale, {}).items()
+            if name in results
+        }
+        regressions = compare(
+            results, baseline, options["latency_tolerance"]
+        )
+        if regressions:
+            raise CommandError(
+                "Performance regressions:\n" + "\n".join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS("No regressions against baseline"))
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:>26}: {result['queries']:3d} queries  "
+            f"p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+            f"peak {result['peak_alloc_kb']:8.1f} KB"
+        )
@@ -0,0 +1,115 @@
+import datetime
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from books.models import Author, Book, BookListing
+from books.search import get_backend
+from borrowings.models import Borrowing
+
+BATCH_SIZE = 10_000
+PASSWORD = "benchpass"
+
+WORDS = [
+    "shadow", "river", "garden", "empire", "winter", "silent", "golden",
+    "night", "stone", "ocean", "secret", "forest", "iron", "glass", "storm",
+    "memory", "island", "crown", "letter", "journey", "mirror", "desert",
+    "summer", "harbor", "falcon", "lantern", "orchard", "thunder", "velvet",
+]
+NAMES = [
+    "Anna", "Boris", "Clara", "Dmytro", "Elena", "Fedir", "Hanna", "Ivan",
+    "Kateryna", "Lev", "Maria", "Oleh", "Petro", "Sofia", "Taras", "Yulia",
+]
+
+
+def batches(count, batch_size=BATCH_SIZE):
+    for start in range(0, count, batch_size):
+        yield min(batch_size, count - start)
+
+
+def seed_users(count) -> list:
+    """Create ``count`` users sharing one pre-hashed PASSWORD."""
+    password = make_password(PASSWORD)
+    user_ids = []
+    for size in batches(count):
+        offset = len(user_ids)
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(
+                email=f"user{offset + i}@bench.com", password=password
+            )
+            for i in range(size)
+        )
+        user_ids += [user.id for user in users]
+    return user_ids
+
+
+def seed_catalogue(books, authors, rng=None) -> list:
+    """Create books with 1-3 authors each, plus their listings and index."""
+    rng = rng or random.Random(0)
+    author_ids = [
+        author.id for author in Author.objects.bulk_create(
+            Author(first_name=rng.choice(NAMES), last_name=rng.choice(WORDS))
+            for _ in range(authors)
+        )
+    ]
+    book_ids = []
+    for size in batches(books):
+        with transaction.atomic():
+            created = [
+                book.id for book in Book.objects.bulk_create(
+                    Book(
+                        title=" ".join(rng.choices(WORDS, k=3)).title(),
+                        cover=rng.choice(Book.CoverChoices.values),
+                        inventory=rng.randint(50, 500),
+                        daily_fee=rng.randint(10, 500) / 100,
+                    )
+                    for _ in range(size)
+                )
+            ]
+            Book.author.through.objects.bulk_create(
+                Book.author.through(book_id=book_id, author_id=author_id)
+                for book_id in created
+                for author_id in set(rng.choices(author_ids, k=rng.randint(1, 3)))
+            )
+            BookListing.refresh(created)
+            get_backend().index_books(created)
+        book_ids += created
+
+    for start in range(0, len(author_ids), BATCH_SIZE):
+        get_backend().index_authors(author_ids[start:start + BATCH_SIZE])
+    return book_ids
+
+
+def seed_borrowings(count, user_ids, book_ids, active_ratio=0.2, rng=None):
+    """Create borrowings over the last year; ``active_ratio`` are open."""
+    rng = rng or random.Random(0)
+    today = datetime.date.today()
+    for size in batches(count):
+        with transaction.atomic():
+            rows, borrow_dates = [], []
+            for _ in range(size):
+                borrowed = today - datetime.timedelta(days=rng.randint(0, 365))
+                returned = min(
+                    today, borrowed + datetime.timedelta(days=rng.randint(1, 30))
+                )
+                borrow_dates.append(borrowed)
+                rows.append(Borrowing(
+                    expected_return_date=(
+                        borrowed + datetime.timedelta(days=rng.randint(7, 30))
+                    ),
+                    actual_return_date=(
+                        None if rng.random() < active_ratio else returned
+                    ),
+                    book_id=rng.choice(book_ids),
+                    user_id=rng.choice(user_ids),
+                ))
+            created = Borrowing.objects.bulk_create(rows)
+
+            # borrow_date is auto_now_add, so backdate it afterwards.
+            for borrowing, borrowed in zip(created, borrow_dates):
+                borrowing.borrow_date = borrowed
+            Borrowing.objects.bulk_update(
+                created, ["borrow_date"], batch_size=1000
+            )
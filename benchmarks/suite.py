@@ -0,0 +1,253 @@
+import datetime
+import itertools
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from analytics.rollups import rebuild
+from benchmarks.seed import PASSWORD, seed_borrowings, seed_catalogue, seed_users
+from benchmarks.utils import percentiles
+from books.cache import get_cache
+from books.models import Author
+from borrowings.models import Borrowing
+
+SCALES = {
+    "small": {"books": 10_000, "borrowings": 10_000, "users": 1_000},
+    "medium": {"books": 100_000, "borrowings": 100_000, "users": 10_000},
+    "large": {"books": 1_000_000, "borrowings": 1_000_000, "users": 100_000},
+}
+
+
+@dataclass
+class Scenario:
+    """One request against a route, prepared fresh for every repetition.
+
+    ``prepare`` runs untimed before each request and returns the url
+    (and optionally the payload), e.g. creating a borrowing to return.
+    """
+    name: str
+    method: str
+    prepare: Callable[[], tuple]
+    user: Optional[str] = "patron"
+    format: str = "json"
+    expected_status: tuple = (200, 201)
+    repeat: Optional[int] = None
+
+
+@dataclass
+class Fixtures:
+    users: dict = field(default_factory=dict)
+    book_ids: list = field(default_factory=list)
+    user_ids: list = field(default_factory=list)
+
+
+def seed(scale) -> Fixtures:
+    sizes = SCALES[scale]
+    fixtures = Fixtures()
+    fixtures.user_ids = seed_users(sizes["users"])
+    fixtures.book_ids = seed_catalogue(sizes["books"], max(1, sizes["books"] // 10))
+    seed_borrowings(sizes["borrowings"], fixtures.user_ids, fixtures.book_ids)
+    rebuild()
+
+    fixtures.users = {
+        "patron": get_user_model().objects.get(id=fixtures.user_ids[0]),
+        "admin": get_user_model().objects.create_user(
+            "admin@bench.com", PASSWORD, is_staff=True
+        ),
+    }
+    return fixtures
+
+
+def scenarios(fixtures) -> list:
+    patron = fixtures.users["patron"]
+    book_id = fixtures.book_ids[len(fixtures.book_ids) // 2]
+    author_id = Author.objects.values_list("id", flat=True).first()
+    due = (datetime.date.today() + datetime.timedelta(days=7)).isoformat()
+    books_url = reverse("books:books-list")
+    borrowings_url = reverse("borrowings:borrowings-list")
+    own_borrowing_id = (
+        Borrowing.objects.filter(user=patron).values_list("id", flat=True).first()
+    )
+    # Checkouts rotate through books so repetitions never drain inventory.
+    next_book = itertools.cycle(fixtures.book_ids).__next__
+
+    def active_borrowings(count):
+        return [
+            Borrowing.objects.create(
+                book_id=next_book(), user=patron, expected_return_date=due
+            ).id
+            for _ in range(count)
+        ]
+
+    def refresh_token():
+        return str(RefreshToken.for_user(patron))
+
+    return [
+        Scenario("books list", "get", lambda: (books_url,), user=None),
+        Scenario("books list deep page", "get", lambda: (
+            f"{books_url}?page={len(fixtures.book_ids) // 10}&page_size=5",
+        ), user=None),
+        Scenario("books list keyset", "get", lambda: (
+            f"{books_url}?pagination=keyset&page_size=20",
+        ), user=None),
+        Scenario("books retrieve", "get", lambda: (
+            reverse("books:books-detail", args=[book_id]),
+        ), user=None),
+        Scenario("books availability", "get", lambda: (
+            reverse("books:books-availability") + "?ids="
+            + ",".join(map(str, fixtures.book_ids[:100])),
+        ), user=None),
+        Scenario("books title search", "get", lambda: (
+            f"{books_url}?title=gold",
+        ), user=None),
+        Scenario("books ranked search", "get", lambda: (
+            f"{books_url}?search=golden+river",
+        ), user=None),
+        Scenario("books create", "post", lambda: (books_url, {
+            "title": "Bench", "author": [author_id], "cover": "hard",
+            "inventory": 5, "daily_fee": "1.00",
+        }), user="admin"),
+        Scenario("authors list", "get", lambda: (
+            reverse("books:author-list"),
+        ), user="admin"),
+        Scenario("authors retrieve", "get", lambda: (
+            reverse("books:author-detail", args=[author_id]),
+        ), user="admin"),
+        Scenario("borrowings list", "get", lambda: (borrowings_url,)),
+        Scenario("borrowings list active", "get", lambda: (
+            f"{borrowings_url}?is_active=True",
+        ), user="admin"),
+        Scenario("borrowings list keyset", "get", lambda: (
+            f"{borrowings_url}?pagination=keyset&page_size=20",
+        ), user="admin"),
+        Scenario("borrowings retrieve", "get", lambda: (
+            reverse("borrowings:borrowings-detail", args=[own_borrowing_id]),
+        )),
+        Scenario("borrowings create", "post", lambda: (
+            borrowings_url, {"book": next_book(), "expected_return_date": due},
+        )),
+        Scenario("borrowings return", "post", lambda: (
+            reverse(
+                "borrowings:borrowings-return-view",
+                args=active_borrowings(1),
+            ),
+        )),
+        Scenario("borrowings bulk create", "post", lambda: (
+            reverse("borrowings:borrowings-bulk-create-view"),
+            {"items": [
+                {"book": next_book(), "expected_return_date": due}
+                for _ in range(20)
+            ]},
+        )),
+        Scenario("borrowings bulk return", "post", lambda: (
+            reverse("borrowings:borrowings-bulk-return-view"),
+            {"ids": active_borrowings(20)},
+        )),
+        Scenario("analytics books", "get", lambda: (
+            reverse("analytics:analytics-books"),
+        ), user="admin"),
+        Scenario("analytics revenue", "get", lambda: (
+            reverse("analytics:analytics-revenue") + "?days=366",
+        ), user="admin"),
+        Scenario("users create", "post", lambda: (reverse("users:user-create"), {
+            "email": f"new{time.perf_counter_ns()}@bench.com",
+            "password": PASSWORD,
+        }), user=None, repeat=3),
+        Scenario("users me", "get", lambda: (reverse("users:user-detail"),)),
+        Scenario("users me update", "patch", lambda: (
+            reverse("users:user-detail"), {"first_name": "Bench"},
+        )),
+        Scenario("token obtain", "post", lambda: (reverse("users:token_obtain_pair"), {
+            "email": patron.email, "password": PASSWORD,
+        }), user=None, repeat=3),
+        Scenario("token refresh", "post", lambda: (
+            reverse("users:token_refresh"), {"refresh": refresh_token()},
+        ), user=None),
+        Scenario("token verify", "post", lambda: (
+            reverse("users:token_verify"),
+            {"token": str(RefreshToken.for_user(patron).access_token)},
+        ), user=None),
+    ]
+
+
+def authenticated_client(user) -> APIClient:
+    client = APIClient()
+    if user is not None:
+        token = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZE=f"Bearer {token}")
+    return client
+
+
+def run_scenario(scenario, fixtures, repeat) -> dict:
+    """Time ``repeat`` requests; catalogue caches are cleared before each."""
+    client = authenticated_client(fixtures.users.get(scenario.user))
+    timings = []
+    queries = None
+
+    for _ in range(scenario.repeat or repeat):
+        url, *payload = scenario.prepare()
+        get_cache().clear()
+
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            res = getattr(client, scenario.method)(
+                url, *payload, format=scenario.format
+            )
+            timings.append(time.perf_counter() - started)
+
+        if res.status_code not in scenario.expected_status:
+            raise AssertionError(
+                f"{scenario.name}: unexpected status {res.status_code}"
+            )
+        queries = len(captured)
+
+    url, *payload = scenario.prepare()
+    get_cache().clear()
+    tracemalloc.start()
+    getattr(client, scenario.method)(url, *payload, format=scenario.format)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = percentiles(timings)
+    return {
+        "queries": queries,
+        "p50_ms": round(result["p50"] * 1000, 2),
+        "p95_ms": round(result["p95"] * 1000, 2),
+        "peak_alloc_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, latency_tolerance) -> list:
+    """List regressions of ``results`` against ``baseline``.
+
+    Query counts must not grow; latency may grow by the tolerance factor
+    (``None`` disables latency checks, which depend on the machine).
+    """
+    regressions = []
+    for name, expected in baseline.items():
+        actual = results.get(name)
+        if actual is None:
+            regressions.append(f"{name}: missing from this run")
+            continue
+        if actual["queries"] > expected["queries"]:
+            regressions.append(
+                f"{name}: {actual['queries']} queries "
+                f"(baseline {expected['queries']})"
+            )
+        if (
+            latency_tolerance is not None
+            and actual["p95_ms"] > expected["p95_ms"] * latency_tolerance
+        ):
+            regressions.append(
+                f"{name}: p95 {actual['p95_ms']} ms "
+                f"(baseline {expected['p95_ms']} ms)"
+            )
+    return regressions
@@ -0,0 +1,94 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from benchmarks.suite import compare
+
+BASELINE = {"books list": {"queries": 2, "p50_ms": 2.0, "p95_ms": 4.0}}
+
+
+class CompareTests(SimpleTestCase):
+    def test_query_count_growth_is_a_regression(self):
+        results = {"books list": {"queries": 3, "p50_ms": 2.0, "p95_ms": 4.0}}
+
+        regressions = compare(results, BASELINE, latency_tolerance=None)
+
+        self.assertEqual(regressions, ["books list: 3 queries (baseline 2)"])
+
+    def test_latency_checked_only_with_tolerance(self):
+        results = {"books list": {"queries": 2, "p50_ms": 9.0, "p95_ms": 9.0}}
+
+        self.assertEqual(compare(results, BASELINE, latency_tolerance=None), [])
+        self.assertEqual(len(compare(results, BASELINE, latency_tolerance=2)), 1)
+
+    def test_missing_scenario_is_reported(self):
+        regressions = compare({}, BASELINE, latency_tolerance=None)
+
+        self.assertEqual(regressions, ["books list: missing from this run"])
+
+
+class SettingsProfileTests(SimpleTestCase):
+    def load(self, profile) -> subprocess.CompletedProcess:
+        """Settings of ``profile``, imported in a fresh interpreter."""
+        script = (
+            "import json, django; django.setup(); "
+            "from django.conf import settings as s; "
+            "print(json.dumps({"
+            "'debug': s.DEBUG, "
+            "'apps': s.INSTALLED_APPS, "
+            "'middleware': s.MIDDLEWARE, "
+            "'database': {k: v for k, v in s.DATABASES['default'].items() "
+            "if k in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')}, "
+            "'loaders': s.TEMPLATES[0]['OPTIONS'].get('loaders'), "
+            "'hashers': s.PASSWORD_HASHERS}))"
+        )
+        return subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=settings.BASE_DIR,
+            env={
+                **os.environ,
+                "DJANGO_SETTINGS_MODULE": "config.settings",
+                "DJANGO_PROFILE": profile,
+                "SECRET_KEY": "test-secret",
+            },
+            capture_output=True,
+            text=True,
+        )
+
+    def test_dev_profile_debugs(self):
+        dev = json.loads(self.load("dev").stdout)
+
+        self.assertTrue(dev["debug"])
+        self.assertIn("debug_toolbar", dev["apps"])
+        self.assertEqual(dev["database"]["CONN_MAX_AGE"], 0)
+
+    def test_prod_profile_strips_debugging_and_keeps_connections(self):
+        prod = json.loads(self.load("prod").stdout)
+
+        self.assertFalse(prod["debug"])
+        self.assertNotIn("debug_toolbar", prod["apps"])
+        self.assertFalse(any("debug_toolbar" in m for m in prod["middleware"]))
+        self.assertEqual(
+            prod["database"], {"CONN_MAX_AGE": 60, "CONN_HEALTH_CHECKS": True}
+        )
+        self.assertEqual(
+            prod["loaders"][0][0], "django.template.loaders.cached.Loader"
+        )
+
+    def test_test_profile_hashes_passwords_fast(self):
+        test = json.loads(self.load("test").stdout)
+
+        self.assertFalse(test["debug"])
+        self.assertEqual(
+            test["hashers"], ["django.contrib.auth.hashers.MD5PasswordHasher"]
+        )
+
+    def test_unknown_profile_is_rejected(self):
+        result = self.load("staging")
+
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("DJANGO_PROFILE must be dev, test or prod", result.stderr)
@@ -0,0 +1,103 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    close_old_connections,
+    connection,
+    connections,
+)
+from django.test import Client, override_settings
+from django.test.runner import DiscoverRunner
+
+
+@contextmanager
+def scratch_database():
+    """Run the block against a freshly migrated throwaway database.
+
+    Benchmarks seed large amounts of synthetic data, so they never touch
+    the configured database; the test database settings are reused. As
+    under the test runner, DEBUG is off so timings match production, and
+    load generators are neither rate limited nor shed.
+    """
+    runner = DiscoverRunner(verbosity=0, interactive=False)
+    runner.setup_test_environment()
+    old_config = runner.setup_databases()
+    try:
+        with override_settings(THROTTLE_RATES={}, MAX_INFLIGHT_WRITES=0):
+            yield
+    finally:
+        runner.teardown_databases(old_config)
+        runner.teardown_test_environment()
+
+
+def run_threads(target, args_list):
+    """Start one thread per args tuple and release them all at once.
+
+    Returns the seconds taken, what each thread's ``target`` returned and
+    the exceptions raised.
+    """
+    barrier = threading.Barrier(len(args_list))
+    results, errors = [], []
+
+    def worker(*args):
+        try:
+            barrier.wait()
+            results.append(target(*args))
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=args) for args in args_list]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return time.perf_counter() - started, results, errors
+
+
+def load_wsgi(urls, requests, threads) -> tuple:
+    """GET ``urls`` round robin from ``threads`` threads, as a threaded
+    WSGI server would; each is a ``(url, Authorize header or None)``.
+
+    Connections are closed after each request only as the server would,
+    i.e. as CONN_MAX_AGE says. Returns the seconds taken and statuses.
+    """
+    def worker(index):
+        url, token = urls[index % len(urls)]
+        client = Client()
+        headers = {"HTTP_AUTHORIZE": token} if token else {}
+        try:
+            return client.get(url, **headers).status_code
+        finally:
+            close_old_connections()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        statuses = list(pool.map(worker, range(requests)))
+    return time.perf_counter() - started, statuses
+
+
+def percentiles(timings):
+    ordered = sorted(timings)
+    return {
+        "p50": statistics.median(ordered),
+        "p95": ordered[max(0, round(len(ordered) * 0.95) - 1)],
+    }
+
+
+def explain(sql, params=(), using=DEFAULT_DB_ALIAS) -> str:
+    """Return the query plan of ``sql`` as text."""
+    connection = connections[using]
+    prefix = (
+        "EXPLAIN QUERY PLAN" if connection.vendor == "sqlite" else "EXPLAIN"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"{prefix} {sql}", params)
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.core import checks
+from django.db.models.signals import post_migrate
 
 
 class BooksServiceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "books"
+
+    def ready(self):
+        import books.schema  # noqa: F401
+        import books.signals  # noqa: F401
+        from books.checks import check_catalogue_cache
+        from books.search import sync_search_index
+
+        checks.register(check_catalogue_cache, checks.Tags.caches)
+        post_migrate.connect(sync_search_index, sender=self)
@@ -0,0 +1,324 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.paginator import InvalidPage
+from django.http import HttpResponse
+from django.urls import path
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from books.cache import (
+    CatalogueCacheMixin,
+    ConditionalGetMixin,
+    get_cache,
+    get_validators,
+    not_modified,
+    record,
+    replica_may_lag,
+    set_validators,
+)
+from books.paginations import ProjectedPaginator
+from books.replicas import ReplicaReadMixin, read_from
+from users.authentication import (
+    CachedJWTAuthentication,
+    recall_user,
+    remember_user,
+)
+
+
+def off_loop(func):
+    """Run ``func`` in a worker thread; for cache calls, which may block
+    on the network but, unlike the ORM, need not share a thread."""
+    return sync_to_async(func, thread_sensitive=False)
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """CachedJWTAuthentication that loads users through the async ORM."""
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user = None
+        token_id = self.get_token_id(validated_token)
+        if not api_settings.CHECK_REVOKE_TOKEN:
+            user = await off_loop(recall_user)(
+                self.get_user_id(validated_token), token_id
+            )
+        if user is None:
+            user = await self.aload_user(validated_token)
+            await off_loop(remember_user)(user, token_id)
+        return self.check_privileges(user, validated_token)
+
+    async def aload_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        try:
+            user = await get_user_model().objects.aget(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except get_user_model().DoesNotExist:
+            raise exceptions.AuthenticationFailed(
+                "User not found", code="user_not_found"
+            )
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                "User is inactive", code="user_inactive"
+            )
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise exceptions.AuthenticationFailed(
+                "The user's password has been changed.",
+                code="password_changed",
+            )
+
+        return user
+
+
+class AsyncReadView(View):
+    """Serve ``list`` or ``retrieve`` of ``viewset`` as a native async view.
+
+    Filtering, permissions, pagination and serialization are the
+    viewset's own; only the database calls move to the async ORM, so
+    under ASGI a request no longer holds a thread while it waits. Cache
+    calls, which block on a Redis or file backend, run in a thread.
+    Other methods and anything not implemented here (keyset pagination,
+    the browsable API) are handed to the sync viewset.
+    """
+    viewset = None
+    action = None
+    basename = None
+    sync_view = None
+    # Query params whose filtering runs SQL while building the queryset.
+    blocking_params = ()
+    fallback_params = ("pagination", "format")
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method != "GET" or self.falls_back(request):
+            return await sync_to_async(self.sync_view)(
+                request, *args, **kwargs
+            )
+
+        drf_request = Request(
+            request, authenticators=(AsyncJWTAuthentication(),)
+        )
+        # Only JSON is served here; HTML went to the sync view above.
+        drf_request.accepted_renderer = JSONRenderer()
+        try:
+            return await self.get(drf_request, *args, **kwargs)
+        except exceptions.APIException as error:
+            return self.error_response(drf_request, error)
+
+    def falls_back(self, request) -> bool:
+        accept = request.headers.get("Accept", "")
+        return "text/html" in accept or any(
+            param in request.GET for param in self.fallback_params
+        )
+
+    async def get(self, request, *args, **kwargs):
+        await self.authenticate(request)
+        view = self.viewset(
+            request=request,
+            args=args,
+            kwargs=kwargs,
+            action=self.action,
+            basename=self.basename,
+            format_kwarg=None,
+        )
+        view.check_permissions(request)
+
+        database = None
+        if isinstance(view, ReplicaReadMixin):
+            database = view.get_read_database(request)
+        with read_from(database):
+            return await self.conditional(view, request)
+
+    async def conditional(self, view, request):
+        if not issubclass(self.viewset, ConditionalGetMixin):
+            return await self.respond(view, request)
+
+        validators = await off_loop(get_validators)(
+            request,
+            view.cache_versions,
+            view.vary_on_user,
+            view.is_dated(request),
+        )
+        status = not_modified(request, *validators)
+        if status is not None:
+            response = HttpResponse(status=status)
+        else:
+            response = await self.respond(view, request)
+        if response.status_code == 304 or (
+            response.status_code == 200
+            and not await off_loop(replica_may_lag)(view.cache_versions)
+        ):
+            set_validators(response, *validators)
+        return response
+
+    async def respond(self, view, request):
+        cached = issubclass(self.viewset, CatalogueCacheMixin)
+        if cached:
+            key, data = await off_loop(self.cached_data)(view, request)
+            if data is not None:
+                return self.render(data, {"X-Cache": "HIT"})
+
+        if any(param in request.query_params for param in self.blocking_params):
+            queryset = await sync_to_async(view.get_queryset)()
+        else:
+            queryset = view.get_queryset()
+
+        if self.action == "retrieve":
+            data = await self.retrieve(view, request, queryset)
+        else:
+            data = await self.list(view, request, queryset)
+
+        response = self.render(data, {"X-Cache": "MISS"} if cached else {})
+        if cached:
+            await off_loop(self.cache_data)(
+                view, key, json.loads(response.content)
+            )
+        return response
+
+    @staticmethod
+    def cached_data(view, request) -> tuple:
+        """The cache key of the request and the data cached under it."""
+        key = view.get_cache_key(request)
+        data = get_cache().get(key)
+        record("miss" if data is None else "hit")
+        return key, data
+
+    @staticmethod
+    def cache_data(view, key, data) -> None:
+        if not replica_may_lag(view.get_cache_versions()):
+            get_cache().set(key, data, settings.CATALOGUE_CACHE_TIMEOUT)
+
+    async def authenticate(self, request):
+        authenticator = request.authenticators[0]
+        if hasattr(authenticator, "aauthenticate"):
+            result = await authenticator.aauthenticate(request)
+        else:
+            # DRF's force_authenticate: sync, but without queries.
+            result = authenticator.authenticate(request)
+        # Setting these up front keeps DRF from running the sync
+        # authenticator when permissions inspect the request.
+        request._authenticator = authenticator if result else None
+        request.user, request.auth = result or (AnonymousUser(), None)
+
+    async def retrieve(self, view, request, queryset):
+        try:
+            row = await queryset.aget(pk=view.kwargs["pk"])
+        except queryset.model.DoesNotExist:
+            raise exceptions.NotFound()
+        view.check_object_permissions(request, row)
+        return view.get_serializer_class()(row).data
+
+    async def list(self, view, request, queryset):
+        paginator = view.paginator
+        page_size = paginator.get_page_size(request)
+        serializer_class = view.get_serializer_class()
+
+        pages = ProjectedPaginator(
+            queryset, page_size, projection=serializer_class.select
+        )
+        # Count up front through the async ORM; Paginator caches it.
+        pages.count = await queryset.acount()
+
+        page_number = request.query_params.get(paginator.page_query_param, 1)
+        if page_number in paginator.last_page_strings:
+            page_number = pages.num_pages
+        try:
+            page = pages.page(page_number)
+        except InvalidPage as error:
+            raise exceptions.NotFound(paginator.invalid_page_message.format(
+                page_number=page_number, message=str(error)
+            ))
+
+        rows = [row async for row in page.object_list]
+        paginator.page, paginator.request = page, request
+        return paginator.get_paginated_response(
+            serializer_class(rows, many=True).data
+        ).data
+
+    @staticmethod
+    def render(data, headers=None) -> HttpResponse:
+        response = HttpResponse(
+            JSONRenderer().render(data),
+            content_type="application/json",
+            headers=headers,
+        )
+        # Like a DRF Response, for callers and tests reading ``.data``.
+        response.data = data
+        return response
+
+    def error_response(self, request, error) -> HttpResponse:
+        # As APIView.handle_exception: 401 only with a challenge to send.
+        if isinstance(
+            error, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            header = AsyncJWTAuthentication().authenticate_header(request)
+            if header:
+                error.auth_header = header
+            else:
+                error.status_code = 403
+
+        response = exception_handler(error, {"request": request, "view": self})
+        rendered = HttpResponse(
+            JSONRenderer().render(response.data),
+            content_type="application/json",
+            status=response.status_code,
+        )
+        for name, value in response.items():
+            rendered[name] = value
+        return rendered
+
+
+def async_routes(view_class, basename) -> list:
+    """URL patterns serving the reads of ``view_class.viewset`` async.
+
+    Meant to go in front of the router's patterns: they keep the router
+    names and hand writes on the same paths to the sync viewset.
+    """
+    routes = (
+        ("", "list", {"get": "list", "post": "create"}, False),
+        ("<int:pk>/", "retrieve", {
+            "get": "retrieve",
+            "put": "update",
+            "patch": "partial_update",
+            "delete": "destroy",
+        }, True),
+    )
+    return [
+        path(route, view_class.as_view(
+            action=action,
+            basename=basename,
+            sync_view=view_class.viewset.as_view(
+                actions, basename=basename, detail=detail
+            ),
+        ), name=f"{basename}-{action.replace('retrieve', 'detail')}")
+        for route, action, actions, detail in routes
+    ]
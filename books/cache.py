@@ -0,0 +1,236 @@
+import datetime
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from books.replicas import reading_replica
+
+BOOKS = "books"
+AUTHORS = "authors"
+BORROWINGS = "borrowings"
+USERS = "users"
+
+
+def get_cache():
+    return caches[settings.CATALOGUE_CACHE_ALIAS]
+
+
+def get_version(name) -> int:
+    key = f"catalogue:version:{name}"
+    version = get_cache().get(key)
+    if version is None:
+        # Seed from the clock so a version lost to eviction never restarts
+        # at a value that old entries were stored under.
+        get_cache().add(key, time.time_ns() // 1000, timeout=None)
+        version = get_cache().get(key)
+    return version
+
+
+def get_modified(name) -> float:
+    """When ``name`` last changed; a lost timestamp reads as just now."""
+    key = f"catalogue:modified:{name}"
+    get_cache().add(key, time.time(), timeout=None)
+    return get_cache().get(key)
+
+
+def bump_version(*names) -> None:
+    """Make every cached response depending on ``names`` stale.
+
+    Bumped right away and again after commit: a reader that caches data
+    from before the commit under the new version is invalidated too.
+    """
+    def bump():
+        for name in names:
+            try:
+                get_cache().incr(f"catalogue:version:{name}")
+            except ValueError:
+                get_version(name)
+            get_cache().set(
+                f"catalogue:modified:{name}", time.time(), timeout=None
+            )
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def replica_may_lag(names) -> bool:
+    """Whether this request reads a replica that may miss the latest
+    writes to ``names``.
+
+    Responses built from such reads are not cached nor tagged with
+    validators: either would keep serving them after the replica caught
+    up, under versions that promise the newer data.
+    """
+    return reading_replica() and (
+        time.time() - max(map(get_modified, names), default=0)
+        < settings.REPLICA_PIN_SECONDS
+    )
+
+
+def conditional_response(request, response, max_age) -> Response:
+    """Tag ``response`` with an ETag of its data and let clients keep it
+    for ``max_age`` seconds; a matching ``If-None-Match`` gets a 304.
+    """
+    content = json.dumps(response.data, cls=JSONEncoder, sort_keys=True)
+    etag = f'"{hashlib.md5(content.encode()).hexdigest()}"'
+
+    if get_conditional_response(request._request, etag=etag) is not None:
+        response = Response(status=304)
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+def get_validators(request, names, vary_on_user=False, dated=False) -> tuple:
+    """ETag and Last-Modified of a GET, from the version counters only.
+
+    The ETag covers the route, query params, renderer and the versions
+    of ``names``, plus the user for per-user responses and the date for
+    ``dated`` ones, which change at midnight without any write.
+    Last-Modified has one-second resolution; clients that must see every
+    change send ``If-None-Match``, which takes precedence.
+    """
+    today = datetime.date.today() if dated else None
+    params = json.dumps([
+        request.path,
+        sorted(request.query_params.lists()),
+        [get_version(name) for name in names],
+        getattr(request.accepted_renderer, "format", None),
+        request.user.id if vary_on_user else None,
+        today and today.isoformat(),
+    ])
+    etag = f'"{hashlib.md5(params.encode()).hexdigest()}"'
+    last_modified = int(max(get_modified(name) for name in names))
+    if today:
+        last_modified = max(last_modified, int(time.mktime(today.timetuple())))
+    return etag, last_modified
+
+
+def not_modified(request, etag, last_modified) -> int | None:
+    """Status to answer a conditional GET with, or None to serve it."""
+    response = get_conditional_response(
+        request._request, etag=etag, last_modified=last_modified
+    )
+    return response.status_code if response is not None else None
+
+
+def set_validators(response, etag, last_modified) -> None:
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+
+
+def record(outcome) -> None:
+    key = f"catalogue:stats:{outcome}"
+    if not get_cache().add(key, 1, timeout=None):
+        try:
+            get_cache().incr(key)
+        except ValueError:
+            get_cache().add(key, 1, timeout=None)
+
+
+def get_stats() -> dict:
+    return {
+        outcome: get_cache().get(f"catalogue:stats:{outcome}", 0)
+        for outcome in ("hit", "miss")
+    }
+
+
+class CatalogueCacheMixin:
+    """Cache list and retrieve responses of catalogue viewsets.
+
+    Keys combine the route, the sorted query params and the versions of
+    ``cache_versions``, so writes never have to find and delete entries.
+    """
+    cache_versions = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cache_key(self, request):
+        versions = ":".join(
+            str(get_version(name)) for name in self.get_cache_versions()
+        )
+        params = json.dumps(
+            [request.path, sorted(request.query_params.lists())]
+        )
+        digest = hashlib.md5(params.encode()).hexdigest()
+        return f"catalogue:{self.basename}:{self.action}:{versions}:{digest}"
+
+    def get_cache_versions(self) -> tuple:
+        return self.cache_versions
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_cache_key(request)
+        data = get_cache().get(key)
+
+        if data is not None:
+            record("hit")
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        record("miss")
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200 and not replica_may_lag(
+            self.get_cache_versions()
+        ):
+            get_cache().set(
+                key,
+                json.loads(json.dumps(response.data, cls=JSONEncoder)),
+                settings.CATALOGUE_CACHE_TIMEOUT,
+            )
+        response["X-Cache"] = "MISS"
+        return response
+
+
+class ConditionalGetMixin:
+    """Answer conditional list and retrieve requests with 304.
+
+    Validators come from the ``cache_versions`` counters, so a request
+    that is not modified costs a few cache reads and no query. The
+    counters are shared by every worker only if the catalogue cache is,
+    which the books.E001 check requires under the prod profile.
+    ``vary_on_user`` is for viewsets whose responses depend on who asks,
+    ``dated_params`` for query params filtering on today's date.
+    """
+    cache_versions = ()
+    vary_on_user = False
+    dated_params = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+    def is_dated(self, request) -> bool:
+        return any(name in request.query_params for name in self.dated_params)
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = get_validators(
+            request,
+            self.cache_versions,
+            self.vary_on_user,
+            self.is_dated(request),
+        )
+        status = not_modified(request, etag, last_modified)
+        if status is not None:
+            response = Response(status=status)
+        else:
+            response = handler(request, *args, **kwargs)
+
+        if response.status_code == 304 or (
+            response.status_code == 200
+            and not replica_may_lag(self.cache_versions)
+        ):
+            set_validators(response, etag, last_modified)
+        return response
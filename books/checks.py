@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def check_catalogue_cache(app_configs, **kwargs) -> list:
+    """The catalogue cache must be shared by every worker in production.
+
+    It holds the version counters behind cached responses and ETags. A
+    write bumps them in one cache only, so workers with caches of their
+    own would keep serving stale bodies and 304s until restarted.
+    """
+    cache = caches[settings.CATALOGUE_CACHE_ALIAS]
+    if settings.PROFILE != "prod" or not isinstance(
+        cache, (LocMemCache, DummyCache)
+    ):
+        return []
+    return [checks.Error(
+        f"The catalogue cache uses {type(cache).__name__}, which is not "
+        "shared between worker processes.",
+        hint="Set CATALOGUE_CACHE_BACKEND to a shared backend, e.g. "
+             "django.core.cache.backends.redis.RedisCache.",
+        id="books.E001",
+    )]
@@ -0,0 +1,53 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from books.imports import (
+    FORMATS,
+    IMPORT_BATCH_SIZE,
+    CatalogueImporter,
+    detect_format,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import books from a CSV or JSONL catalogue, creating new titles "
+        "and updating inventory and daily_fee of existing ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Catalogue file, or - for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Defaults to csv for .csv files and jsonl otherwise.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=IMPORT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        format = options["format"] or detect_format(path)
+
+        if path == "-":
+            report = self.run(sys.stdin, format, options["batch_size"])
+        else:
+            with open(path, newline="", encoding="utf-8") as stream:
+                report = self.run(stream, format, options["batch_size"])
+
+        for error in report["errors"]:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['rows']} rows in {report['seconds']} s "
+            f"({report['rows_per_second']} rows/s): "
+            f"{report['created']} created, {report['updated']} updated, "
+            f"{report['authors_created']} new authors, "
+            f"{report['invalid']} invalid, {report['ambiguous']} ambiguous"
+        ))
+
+    @staticmethod
+    def run(stream, format, batch_size):
+        return CatalogueImporter(batch_size).run(read_rows(stream, format))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from books.models import Book, BookListing
+
+
+def book_id_batches(batch_size):
+    last_id = 0
+    while True:
+        batch = list(
+            Book.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]
+
+
+class Command(BaseCommand):
+    help = "Rebuild the BookListing read model, or check it with --check."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report books whose listing is missing or stale.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batches = book_id_batches(options["batch_size"])
+
+        if options["check"]:
+            inconsistent = []
+            for batch in batches:
+                inconsistent += BookListing.find_inconsistent(batch)
+
+            if inconsistent:
+                raise CommandError(
+                    f"{len(inconsistent)} stale book listings, "
+                    f"e.g. books {inconsistent[:20]}"
+                )
+            self.stdout.write(self.style.SUCCESS("Book listings are consistent"))
+            return
+
+        rebuilt = 0
+        with transaction.atomic():
+            for batch in batches:
+                BookListing.refresh(batch)
+                rebuilt += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} book listings"))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from books.search import LikeSearchBackend, get_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Reindex the whole catalogue in the full-text search tables."
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+
+        if isinstance(backend, LikeSearchBackend):
+            self.stdout.write(self.style.WARNING(
+                "Full-text search is not available on this database, "
+                "searches use LIKE scans"
+            ))
+            return
+
+        with transaction.atomic():
+            backend.remove_orphans()
+            indexed = rebuild_index(backend)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} books and authors with "
+            f"{type(backend).__name__}"
+        ))
@@ -1,5 +1,16 @@
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    FilteredRelation,
+    Q,
+    Value,
+    When,
+)
+
+from books.cache import BOOKS, bump_version
 
 
 class Author(models.Model):
@@ -33,5 +44,180 @@ class Book(models.Model):
     def __str__(self):
         return self.title
 
+    @staticmethod
+    def take_copy(book_id) -> bool:
+        """Atomically decrement inventory, only while copies are left.
+
+        The row count of the conditional UPDATE decides success, so
+        concurrent checkouts can never oversell a title.
+        """
+        taken = Book.objects.filter(id=book_id, inventory__gt=0).update(
+            inventory=F("inventory") - 1
+        )
+        if taken:
+            BookListing.objects.filter(book_id=book_id).update(
+                inventory=F("inventory") - 1
+            )
+            bump_version(BOOKS)
+        return bool(taken)
+
+    @staticmethod
+    def return_copy(book_id) -> None:
+        for model in (Book, BookListing):
+            model.objects.filter(pk=book_id).update(
+                inventory=F("inventory") + 1
+            )
+        bump_version(BOOKS)
+
+    @staticmethod
+    def take_copies(counts: dict) -> bool:
+        """Take ``counts[book_id]`` copies of every book in one UPDATE.
+
+        Succeeds only if every book still has enough copies; callers run
+        it inside a transaction and roll back when it returns False.
+        """
+        in_stock = Q()
+        for book_id, count in counts.items():
+            in_stock |= Q(id=book_id, inventory__gte=count)
+
+        updated = Book.objects.filter(in_stock).update(
+            inventory=F("inventory") - Book._per_book(counts)
+        )
+        if updated == len(counts):
+            BookListing.objects.filter(pk__in=counts).update(
+                inventory=F("inventory") - Book._per_book(counts)
+            )
+            bump_version(BOOKS)
+        return updated == len(counts)
+
+    @staticmethod
+    def return_copies(counts: dict) -> None:
+        for model in (Book, BookListing):
+            model.objects.filter(pk__in=counts).update(
+                inventory=F("inventory") + Book._per_book(counts)
+            )
+        bump_version(BOOKS)
+
+    @staticmethod
+    def _per_book(counts: dict) -> Case:
+        return Case(
+            *(When(pk=book_id, then=Value(count))
+              for book_id, count in counts.items()),
+            default=Value(0),
+        )
+
+    @staticmethod
+    def availability(book_ids) -> dict:
+        """Map each existing book id to its inventory and active borrowings.
+
+        One grouped query. The active condition goes into the join, not
+        the aggregate, so the count is a ``borrowing_book_return_idx``
+        range search.
+        """
+        rows = (
+            Book.objects.filter(pk__in=book_ids)
+            .order_by()
+            .annotate(
+                active=FilteredRelation(
+                    "borrowings",
+                    condition=Q(borrowings__actual_return_date__isnull=True),
+                ),
+                active_borrowings=Count("active"),
+            )
+            .values_list("id", "inventory", "active_borrowings")
+        )
+        return {
+            book_id: {"inventory": inventory, "active_borrowings": active}
+            for book_id, inventory, active in rows
+        }
+
     class Meta:
         ordering = ["title"]
+        indexes = [
+            # Catalogue imports match rows to books by title.
+            models.Index(fields=["title"], name="book_title_idx"),
+        ]
+
+
+class BookListing(models.Model):
+    """Denormalized read model of a Book, served by list and retrieve.
+
+    Kept in sync by the signal handlers in ``books.signals`` and by the
+    inventory helpers on ``Book``; ``rebuild_book_listings`` restores it.
+    """
+    book = models.OneToOneField(
+        to=Book,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="listing",
+    )
+    title = models.CharField(max_length=255)
+    authors = models.JSONField(default=list)
+    cover = models.CharField(max_length=4, choices=Book.CoverChoices.choices)
+    inventory = models.IntegerField()
+    daily_fee = models.DecimalField(max_digits=4, decimal_places=2)
+
+    def __str__(self):
+        return self.title
+
+    class Meta:
+        ordering = ["title"]
+        indexes = [
+            # List ordering and keyset pagination order.
+            models.Index(fields=["title", "book"], name="booklisting_title_idx"),
+        ]
+
+    @staticmethod
+    def project(book_ids) -> list:
+        """Build unsaved listings for the given books from the source tables."""
+        authors = {}
+        for book_id, first_name, last_name in (
+            Book.author.through.objects.filter(book_id__in=book_ids)
+            .order_by("id")
+            .values_list("book_id", "author__first_name", "author__last_name")
+        ):
+            authors.setdefault(book_id, []).append(f"{first_name} {last_name}")
+
+        return [
+            BookListing(
+                book_id=book_id,
+                title=title,
+                authors=authors.get(book_id, []),
+                cover=cover,
+                inventory=inventory,
+                daily_fee=daily_fee,
+            )
+            for book_id, title, cover, inventory, daily_fee in (
+                Book.objects.filter(id__in=book_ids).values_list(
+                    "id", "title", "cover", "inventory", "daily_fee"
+                )
+            )
+        ]
+
+    @staticmethod
+    def refresh(book_ids) -> None:
+        BookListing.objects.bulk_create(
+            BookListing.project(book_ids),
+            update_conflicts=True,
+            unique_fields=["book"],
+            update_fields=[
+                "title", "authors", "cover", "inventory", "daily_fee"
+            ],
+        )
+
+    @staticmethod
+    def find_inconsistent(book_ids) -> list:
+        """Return ids of books whose listing is missing or out of date."""
+        stored = BookListing.objects.in_bulk(book_ids)
+        fields = ("title", "authors", "cover", "inventory", "daily_fee")
+
+        return [
+            expected.book_id
+            for expected in BookListing.project(book_ids)
+            if expected.book_id not in stored
+            or any(
+                getattr(expected, field)
+                != getattr(stored[expected.book_id], field)
+                for field in fields
+            )
+        ]
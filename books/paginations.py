@@ -1,7 +1,228 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
 
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-class BookPagination(PageNumberPagination):
+from books.serializers import ValuesSerializer
+
+
+def get_projection(view):
+    """Return the ``values()`` projection of the view's serializer."""
+    if view is None:
+        return None
+    serializer_class = view.get_serializer_class()
+    if issubclass(serializer_class, ValuesSerializer):
+        return serializer_class.select
+    return None
+
+
+class ProjectedPaginator(DjangoPaginator):
+    """Apply ``projection`` to the page slice only.
+
+    A projection over related fields joins them into every query built
+    from it, the COUNT included; projecting the slice keeps the count
+    on the base table.
+    """
+
+    def __init__(self, object_list, per_page, projection=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.projection = projection
+
+    def _get_page(self, object_list, *args, **kwargs):
+        if self.projection is not None:
+            object_list = self.projection(object_list)
+        return super()._get_page(object_list, *args, **kwargs)
+
+
+class ProjectionMixin:
+    """Page-number pagination that honours ValuesSerializer views."""
+    projection = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.projection = get_projection(view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, queryset, page_size):
+        return ProjectedPaginator(
+            queryset, page_size, projection=self.projection
+        )
+
+
+class BookPagination(ProjectionMixin, PageNumberPagination):
+    page_size = 5
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """Seek pagination over a stable composite ordering.
+
+    The opaque cursor holds the ordering values of the first or last row
+    of the current page, so every page is an indexed range scan instead
+    of a deep OFFSET. The total is only counted on request with
+    ``?count=exact``; ``?count=approx`` returns a cheap estimate.
+    """
+    ordering = ("pk",)
     page_size = 5
     page_size_query_param = "page_size"
     max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    approximate_count_limit = 10000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+        self.count = self.get_count(queryset, request)
+        self.pk_name = queryset.model._meta.pk.attname
+
+        ordering = [f"-{field}" if reverse else field for field in self.ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(position, reverse))
+
+        rows = queryset[:self.page_size + 1]
+        projection = get_projection(view)
+        if projection is not None:
+            rows = projection(rows)
+        rows = list(rows)
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_position = self.previous_position = None
+        if rows and (has_more or reverse):
+            self.next_position = self.position_of(rows[-1])
+        if rows and (has_more if reverse else position is not None):
+            self.previous_position = self.position_of(rows[0])
+        return rows
+
+    def after(self, position, reverse) -> Q:
+        """Rows strictly after ``position`` in (possibly reversed) order."""
+        lookup = "lt" if reverse else "gt"
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            step = Q(**{f"{field}__{lookup}": position[index]})
+            for previous, value in zip(self.ordering[:index], position):
+                step &= Q(**{previous: value})
+            condition |= step
+        return condition
+
+    def position_of(self, row):
+        if isinstance(row, dict):
+            return [
+                json_value(row[self.pk_name if field == "pk" else field])
+                for field in self.ordering
+            ]
+        return [json_value(getattr(row, field)) for field in self.ordering]
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position, reverse = cursor["p"], bool(cursor["r"])
+        except (ValueError, TypeError, KeyError):
+            raise NotFound("Invalid cursor")
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound("Invalid cursor")
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        cursor = json.dumps({"p": position, "r": int(reverse)})
+        return base64.urlsafe_b64encode(cursor.encode()).decode()
+
+    def get_link(self, position, reverse):
+        if position is None:
+            return None
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            self.encode_cursor(position, reverse),
+        )
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == "exact":
+            return queryset.count(), False
+        if mode == "approx":
+            return self.estimate_count(queryset), True
+        return None
+
+    def estimate_count(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql":
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                return int(cursor.fetchone()[0][0]["Plan"]["Plan Rows"])
+        # Without planner statistics, count up to a bound.
+        return queryset.order_by()[:self.approximate_count_limit].count()
+
+    def get_paginated_response(self, data):
+        response = {
+            "next": self.get_link(self.next_position, False),
+            "previous": self.get_link(self.previous_position, True),
+        }
+        if self.count is not None:
+            response["count"], response["count_is_approximate"] = self.count
+        response["results"] = data
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {"type": "integer"},
+                "count_is_approximate": {"type": "boolean"},
+                "results": schema,
+            },
+        }
+
+
+def json_value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+class BookKeysetPagination(KeysetPagination):
+    ordering = ("title", "pk")
+
+
+class KeysetPaginationMixin:
+    """Switch a viewset to ``keyset_pagination_class`` on ``?pagination=keyset``.
+
+    Page-number pagination stays the default.
+    """
+    keyset_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if (
+                self.keyset_pagination_class is not None
+                and self.request is not None
+                and self.request.query_params.get("pagination") == "keyset"
+            ):
+                self._paginator = self.keyset_pagination_class()
+            else:
+                return super().paginator
+        return self._paginator
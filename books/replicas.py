@@ -0,0 +1,99 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_COOKIE = "primary_pin"
+
+_read_database = ContextVar("read_database", default=None)
+
+
+def reading_replica() -> bool:
+    """Whether the current request reads from a replica."""
+    return _read_database.get() is not None
+
+
+@contextmanager
+def read_from(alias):
+    """Route the block's reads to ``alias``; None means the primary."""
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+class ReplicaRouter:
+    """Send reads to the replica picked for the current request, if any.
+
+    Everything else, including every write and every read outside
+    ``ReplicaReadMixin`` requests, goes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        # Rows read from a replica are still saved to the primary.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold copies of the primary's rows.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas get the schema through replication.
+        return db not in settings.REPLICA_DATABASES
+
+
+class ReplicaReadMixin:
+    """Serve ``replica_actions`` of a viewset from a read replica.
+
+    A successful write through the viewset sets a signed cookie that
+    keeps the client on the primary for REPLICA_PIN_SECONDS, so patrons
+    read their own checkouts and returns while replicas catch up.
+    """
+    replica_actions = ("list", "retrieve")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.read_token = _read_database.set(self.get_read_database(request))
+
+    def get_read_database(self, request) -> str | None:
+        if (
+            not settings.REPLICA_DATABASES
+            or request.method not in SAFE_METHODS
+            or self.action not in self.replica_actions
+            or request.get_signed_cookie(
+                PIN_COOKIE,
+                default=None,
+                max_age=settings.REPLICA_PIN_SECONDS,
+            )
+        ):
+            return None
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if hasattr(self, "read_token"):
+            _read_database.reset(self.read_token)
+            del self.read_token
+
+        if (
+            settings.REPLICA_DATABASES
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            response.set_signed_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
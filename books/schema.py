@@ -0,0 +1,12 @@
+from drf_spectacular.extensions import OpenApiSerializerExtension
+
+
+class ValuesSerializerExtension(OpenApiSerializerExtension):
+    """Document a ValuesSerializer as the serializer it reproduces."""
+    target_class = "books.serializers.ValuesSerializer"
+    match_subclasses = True
+
+    def map_serializer(self, auto_schema, direction):
+        return auto_schema._map_serializer(
+            self.target.schema_serializer(), direction
+        )
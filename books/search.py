@@ -0,0 +1,361 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from books.models import Author, Book
+
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def tokenize(query) -> list:
+    return TOKEN_RE.findall(query.lower())
+
+
+class SearchBackend:
+    """Full-text index over book titles/author names and author names.
+
+    ``filter`` narrows a queryset to the matches of ``query`` restricted
+    to ``fields`` (all indexed fields when empty); ``rank`` additionally
+    orders every match by relevance, joining the index table so pages
+    and counts come from the database. Every term is matched as a
+    prefix. The tables are created by the ``search_index`` migration.
+    """
+    book_fields = ("title", "authors")
+    author_fields = ("first_name", "last_name", "pseudonym")
+    # Column of the index tables holding the book or author id.
+    id_column = "id"
+
+    def __init__(self, alias=DEFAULT_DB_ALIAS):
+        self.alias = alias
+
+    @property
+    def connection(self):
+        return connections[self.alias]
+
+    def index_books(self, book_ids):
+        pass
+
+    def index_authors(self, author_ids):
+        pass
+
+    def remove_books(self, book_ids):
+        pass
+
+    def remove_authors(self, author_ids):
+        pass
+
+    def match(self, table, query, fields) -> tuple | None:
+        """SQL condition on ``table`` and its params, or None when
+        ``query`` has no terms."""
+        raise NotImplementedError
+
+    def score(self, table, query, fields) -> tuple:
+        """SQL relevance of a matched row, lower first, and its params."""
+        raise NotImplementedError
+
+    def filter(self, queryset, query, fields=()):
+        table = self.index_table(queryset)
+        match = self.match(table, query, fields)
+        if match is None:
+            return queryset.none()
+
+        condition, params = match
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT {self.id_column} FROM {table} WHERE {condition}", params
+        ))
+
+    def rank(self, queryset, query, fields=()):
+        table = self.index_table(queryset)
+        match = self.match(table, query, fields)
+        if match is None:
+            return queryset.none()
+
+        condition, params = match
+        opts = queryset.model._meta
+        return queryset.extra(
+            tables=[table],
+            where=[
+                f"{table}.{self.id_column} = {opts.db_table}.{opts.pk.column}",
+                condition,
+            ],
+            params=params,
+        ).annotate(
+            search_rank=RawSQL(*self.score(table, query, fields))
+        ).order_by("search_rank", "pk")
+
+    def insert_rows(self, sql, row_sql, rows, suffix=""):
+        """Insert ``rows`` with multi-row ``VALUES`` statements.
+
+        Batches follow the backend's parameter limit; a single statement
+        per batch is cheaper than ``executemany`` round trips.
+        """
+        if not rows:
+            return
+        batch_size = self.connection.ops.bulk_batch_size(rows[0], rows)
+        with self.connection.cursor() as cursor:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                cursor.execute(
+                    f"{sql} VALUES {', '.join([row_sql] * len(batch))}{suffix}",
+                    [value for row in batch for value in row],
+                )
+
+    def remove_orphans(self):
+        """Drop entries of books and authors that no longer exist."""
+        with self.connection.cursor() as cursor:
+            for table, source in (
+                ("books_book_search", Book._meta.db_table),
+                ("books_author_search", Author._meta.db_table),
+            ):
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE NOT EXISTS (SELECT 1 FROM "
+                    f"{source} WHERE {source}.id = {table}.{self.id_column})"
+                )
+
+    def is_empty(self) -> bool:
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM books_book_search LIMIT 1")
+            return cursor.fetchone() is None
+
+    @staticmethod
+    def book_documents(book_ids):
+        """Yield ``(book_id, title, author names)`` for the given books."""
+        names = {}
+        for book_id, first_name, last_name, pseudonym in (
+            Book.author.through.objects.filter(book_id__in=book_ids)
+            .values_list(
+                "book_id",
+                "author__first_name",
+                "author__last_name",
+                "author__pseudonym",
+            )
+        ):
+            names.setdefault(book_id, []).extend(
+                name for name in (first_name, last_name, pseudonym) if name
+            )
+
+        for book_id, title in Book.objects.filter(
+            id__in=book_ids
+        ).values_list("id", "title"):
+            yield book_id, title, " ".join(names.get(book_id, []))
+
+    @staticmethod
+    def author_documents(author_ids):
+        for author_id, first_name, last_name, pseudonym in (
+            Author.objects.filter(id__in=author_ids).values_list(
+                "id", "first_name", "last_name", "pseudonym"
+            )
+        ):
+            yield author_id, first_name, last_name, pseudonym or ""
+
+    @staticmethod
+    def index_table(queryset):
+        if queryset.model is Author:
+            return "books_author_search"
+        return "books_book_search"
+
+
+class LikeSearchBackend(SearchBackend):
+    """Fallback for databases without full-text support: LIKE scans."""
+
+    def filter(self, queryset, query, fields=()):
+        fields = fields or (
+            self.author_fields if queryset.model is Author else ("title",)
+        )
+        condition = Q()
+        for term in tokenize(query):
+            term_condition = Q()
+            for field in fields:
+                term_condition |= Q(**{f"{field}__icontains": term})
+            condition &= term_condition
+        return queryset.filter(condition)
+
+    def rank(self, queryset, query, fields=()):
+        return self.filter(queryset, query, fields)
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 virtual tables keyed by the book/author id as rowid."""
+    id_column = "rowid"
+
+    def index_books(self, book_ids):
+        book_ids = list(book_ids)
+        self.remove_books(book_ids)
+        self.insert_rows(
+            "INSERT INTO books_book_search(rowid, title, authors)",
+            "(%s, %s, %s)",
+            list(self.book_documents(book_ids)),
+        )
+
+    def index_authors(self, author_ids):
+        author_ids = list(author_ids)
+        self.remove_authors(author_ids)
+        self.insert_rows(
+            "INSERT INTO books_author_search"
+            "(rowid, first_name, last_name, pseudonym)",
+            "(%s, %s, %s, %s)",
+            list(self.author_documents(author_ids)),
+        )
+
+    def remove_books(self, book_ids):
+        self.remove("books_book_search", book_ids)
+
+    def remove_authors(self, author_ids):
+        self.remove("books_author_search", author_ids)
+
+    def remove(self, table, ids):
+        ids = list(ids)
+        if ids:
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE rowid IN "
+                    f"({', '.join(['%s'] * len(ids))})",
+                    ids,
+                )
+
+    @staticmethod
+    def match_expression(query, fields):
+        terms = [f'"{term}"*' for term in tokenize(query)]
+        if fields:
+            columns = " ".join(fields)
+            terms = [f"{{{columns}}} : {term}" for term in terms]
+        return " AND ".join(terms)
+
+    def match(self, table, query, fields):
+        expression = self.match_expression(query, fields)
+        if not expression:
+            return None
+        return f"{table} MATCH %s", [expression]
+
+    def score(self, table, query, fields):
+        # FTS5's rank is the weighted bm25 score, best matches lowest.
+        return f"{table}.rank", []
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """Weighted tsvector documents with GIN indexes.
+
+    Fields map to weights, so restricting a search to some fields is a
+    weight filter on the prefix terms.
+    """
+    weights = {
+        "title": "A",
+        "authors": "B",
+        "first_name": "A",
+        "last_name": "B",
+        "pseudonym": "C",
+    }
+
+    def upsert(self, table, rows, vector_sql):
+        self.insert_rows(
+            f"INSERT INTO {table} (id, document)",
+            f"(%s, {vector_sql})",
+            rows,
+            " ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document",
+        )
+
+    def index_books(self, book_ids):
+        self.upsert(
+            "books_book_search",
+            list(self.book_documents(book_ids)),
+            "setweight(to_tsvector('simple', %s), 'A') || "
+            "setweight(to_tsvector('simple', %s), 'B')",
+        )
+
+    def index_authors(self, author_ids):
+        self.upsert(
+            "books_author_search",
+            list(self.author_documents(author_ids)),
+            "setweight(to_tsvector('simple', %s), 'A') || "
+            "setweight(to_tsvector('simple', %s), 'B') || "
+            "setweight(to_tsvector('simple', %s), 'C')",
+        )
+
+    def remove_books(self, book_ids):
+        self.remove("books_book_search", book_ids)
+
+    def remove_authors(self, author_ids):
+        self.remove("books_author_search", author_ids)
+
+    def remove(self, table, ids):
+        ids = list(ids)
+        if ids:
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {table} WHERE id = ANY(%s)", [ids])
+
+    def tsquery(self, query, fields):
+        weights = "".join(self.weights[field] for field in fields)
+        return " & ".join(
+            f"{term}:*{weights}" for term in tokenize(query)
+        )
+
+    def match(self, table, query, fields):
+        tsquery = self.tsquery(query, fields)
+        if not tsquery:
+            return None
+        return f"{table}.document @@ to_tsquery('simple', %s)", [tsquery]
+
+    def score(self, table, query, fields):
+        return (
+            f"-ts_rank({table}.document, to_tsquery('simple', %s))",
+            [self.tsquery(query, fields)],
+        )
+
+
+BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgreSQLSearchBackend,
+}
+
+
+def get_backend(alias=DEFAULT_DB_ALIAS) -> SearchBackend:
+    connection = connections[alias]
+    backend_class = BACKENDS.get(connection.vendor, LikeSearchBackend)
+
+    if backend_class is not LikeSearchBackend and not search_tables_exist(
+        connection
+    ):
+        backend_class = LikeSearchBackend
+    return backend_class(alias)
+
+
+def search_tables_exist(connection) -> bool:
+    available = getattr(connection, "_books_search_available", None)
+    if available is None:
+        available = "books_book_search" in connection.introspection.table_names()
+        connection._books_search_available = available
+    return available
+
+
+def sync_search_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """``post_migrate`` hook keeping the index in step with the catalogue.
+
+    ``flush`` empties the catalogue but not the index tables, which are
+    not models, so entries of deleted rows are dropped here. An empty
+    index of a filled catalogue, as right after the tables are created,
+    is rebuilt; ``rebuild_search_index`` does the same on demand.
+    """
+    connection = connections[using]
+    connection._books_search_available = None
+    backend = get_backend(using)
+    if isinstance(backend, LikeSearchBackend):
+        return
+
+    backend.remove_orphans()
+    if backend.is_empty() and Book.objects.using(using).exists():
+        rebuild_index(backend)
+
+
+def rebuild_index(backend, batch_size=1000) -> int:
+    indexed = 0
+    for model, index in (
+        (Book, backend.index_books),
+        (Author, backend.index_authors),
+    ):
+        ids = list(model.objects.order_by("id").values_list("id", flat=True))
+        for start in range(0, len(ids), batch_size):
+            index(ids[start:start + batch_size])
+        indexed += len(ids)
+    return indexed
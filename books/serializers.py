@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from books.models import Book, Author
+from books.models import Book, Author, BookListing
 
 
 class BookSerializer(serializers.ModelSerializer):
@@ -18,6 +18,59 @@ class BookListSerializer(BookSerializer):
     )
 
 
+class BookListingSerializer(serializers.ModelSerializer):
+    """Renders a BookListing exactly like BookListSerializer renders a Book."""
+    id = serializers.IntegerField(source="book_id", read_only=True)
+    author = serializers.ListField(
+        source="authors", child=serializers.CharField(), read_only=True
+    )
+
+    class Meta:
+        model = BookListing
+        fields = (
+            "id", "title", "author", "cover", "inventory", "daily_fee"
+        )
+
+
+class ValuesSerializer(serializers.BaseSerializer):
+    """Read-only serializer over ``values()`` rows.
+
+    Skips the per-field machinery of ModelSerializer: ``select`` fetches
+    just the ``values`` columns and ``to_representation`` assembles the
+    dict directly. ``schema_serializer`` is the serializer whose output
+    it reproduces, used for the API schema and equivalence tests.
+    """
+    values = ()
+    schema_serializer = None
+
+    @classmethod
+    def select(cls, queryset):
+        return queryset.values(*cls.values)
+
+
+def decimal_field(model, field_name):
+    field = model._meta.get_field(field_name)
+    return serializers.DecimalField(
+        max_digits=field.max_digits, decimal_places=field.decimal_places
+    )
+
+
+class BookListingReadSerializer(ValuesSerializer):
+    values = ("book_id", "title", "authors", "cover", "inventory", "daily_fee")
+    schema_serializer = BookListingSerializer
+    daily_fee = decimal_field(BookListing, "daily_fee")
+
+    def to_representation(self, row):
+        return {
+            "id": row["book_id"],
+            "title": row["title"],
+            "author": row["authors"],
+            "cover": row["cover"],
+            "inventory": row["inventory"],
+            "daily_fee": self.daily_fee.to_representation(row["daily_fee"]),
+        }
+
+
 class AuthorSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -0,0 +1,70 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from books.cache import AUTHORS, BOOKS, bump_version
+from books.models import Author, Book, BookListing
+from books.search import get_backend
+
+# Sent by bulk statements that change stock without saving books, with
+# ``copies``: the copies added (or removed, when negative) per cover.
+inventory_changed = Signal()
+
+
+def sync_books(book_ids):
+    """Bring the read model, search index and cache of these books up to date."""
+    book_ids = list(book_ids)
+    BookListing.refresh(book_ids)
+    get_backend().index_books(book_ids)
+    bump_version(BOOKS)
+
+
+@receiver(post_save, sender=Book)
+def refresh_book_listing(sender, instance, **kwargs):
+    sync_books([instance.id])
+
+
+@receiver(post_delete, sender=Book)
+def expire_deleted_book(sender, instance, **kwargs):
+    get_backend().remove_books([instance.id])
+    bump_version(BOOKS)
+
+
+@receiver(m2m_changed, sender=Book.author.through)
+def refresh_listing_authors(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            sync_books([instance.id])
+        return
+
+    # ``author.books`` changed: ``pk_set`` holds book ids, except on clear.
+    if action == "pre_clear":
+        instance._cleared_book_ids = list(
+            instance.books.values_list("id", flat=True)
+        )
+    elif action == "post_clear":
+        sync_books(instance._cleared_book_ids)
+    elif action in ("post_add", "post_remove"):
+        sync_books(pk_set)
+
+
+@receiver(post_save, sender=Author)
+def refresh_author_listings(sender, instance, created, **kwargs):
+    get_backend().index_authors([instance.id])
+    bump_version(AUTHORS)
+
+    if not created:
+        sync_books(instance.books.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=Author)
+def remember_author_books(sender, instance, **kwargs):
+    instance._deleted_book_ids = list(
+        instance.books.values_list("id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Author)
+def refresh_deleted_author_listings(sender, instance, **kwargs):
+    get_backend().remove_authors([instance.id])
+    bump_version(AUTHORS)
+    sync_books(instance._deleted_book_ids)
@@ -1,14 +1,56 @@
+import datetime
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import tracemalloc
+from io import StringIO
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.http import StreamingHttpResponse
+from django.test import (
+    AsyncRequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.asyncio import async_unsafe
 from rest_framework import status
 
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-from books.models import Book, Author
-from books.serializers import BookListSerializer
+from benchmarks.seed import seed_catalogue
+from benchmarks.utils import explain
+from books.async_views import async_routes
+from books.cache import BOOKS, bump_version, get_cache, get_stats
+from books.checks import check_catalogue_cache
+from books.models import Book, Author, BookListing
+from books.replicas import PIN_COOKIE, read_from
+from books.search import LikeSearchBackend, SQLiteSearchBackend, get_backend
+from books.serializers import (
+    BookListSerializer,
+    BookListingReadSerializer,
+    BookListingSerializer,
+)
+from books.views import BookAsyncReadView
+from borrowings.models import Borrowing
 
 BOOK_URL = reverse("books:books-list")
+AVAILABILITY_URL = reverse("books:books-availability")
+BORROWINGS_URL = reverse("borrowings:borrowings-list")
+REPLICA = "replica"
 
 
 def sample_author(**params):
@@ -43,6 +85,7 @@ def book_detail_url(book_id):
 
 class UnauthenticatedBooksApiTests(TestCase):
     def setUp(self):
+        get_cache().clear()
         self.client = APIClient()
 
     def test_list_books(self):
@@ -99,6 +142,7 @@ class UnauthenticatedBooksApiTests(TestCase):
 
 class AuthenticatedBookApiTests(TestCase):
     def setUp(self):
+        get_cache().clear()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             email="test@test.com",
@@ -123,6 +167,7 @@ class AuthenticatedBookApiTests(TestCase):
 
 class AdminBookApiTests(TestCase):
     def setUp(self):
+        get_cache().clear()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             email="admin@admin.com",
@@ -180,3 +225,1026 @@ class AdminBookApiTests(TestCase):
         res = self.client.delete(url)
 
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class BookListingTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+
+    def assert_listing_matches(self, book):
+        book.refresh_from_db()
+        self.assertEqual(
+            BookListingSerializer(book.listing).data,
+            BookListSerializer(book).data,
+        )
+
+    def test_listing_follows_book_and_author_changes(self):
+        book = sample_book(title="Dune")
+        author = sample_author(first_name="Frank", last_name="Herbert")
+        self.assert_listing_matches(book)
+
+        book.author.add(author)
+        self.assert_listing_matches(book)
+
+        author.last_name = "H."
+        author.save()
+        self.assert_listing_matches(book)
+
+        author.books.clear()
+        self.assert_listing_matches(book)
+
+        author.books.add(book)
+        author.delete()
+        self.assert_listing_matches(book)
+
+        book.title = "Dune Messiah"
+        book.save()
+        self.assert_listing_matches(book)
+
+    def test_listing_follows_inventory_changes(self):
+        book = sample_book(inventory=2)
+
+        Book.take_copy(book.id)
+        Book.take_copies({book.id: 1})
+        self.assert_listing_matches(book)
+        self.assertEqual(book.listing.inventory, 0)
+
+        Book.return_copies({book.id: 2})
+        self.assert_listing_matches(book)
+
+    def test_list_and_retrieve_use_single_query_without_prefetch(self):
+        for _ in range(3):
+            sample_book()
+        book = sample_book()
+
+        with self.assertNumQueries(2):
+            self.client.get(BOOK_URL)
+        with self.assertNumQueries(1):
+            self.client.get(book_detail_url(book.id))
+
+    def test_rebuild_command_restores_stale_listings(self):
+        book = sample_book()
+        Book.objects.filter(id=book.id).update(title="Changed")
+        BookListing.objects.filter(book=sample_book()).delete()
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_book_listings", "--check", stdout=StringIO())
+
+        call_command("rebuild_book_listings", stdout=StringIO())
+        call_command("rebuild_book_listings", "--check", stdout=StringIO())
+        self.assertEqual(BookListing.objects.get(book=book).title, "Changed")
+
+
+class BookReadSerializerTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+
+    def test_renders_same_json_as_model_serializer(self):
+        book = sample_book(title="Dune", daily_fee=1.5)
+        book.author.add(
+            sample_author(first_name="Frank", last_name="Herbert"),
+            sample_author(first_name="Brian", last_name="Herbert"),
+        )
+        sample_book(title="No authors", daily_fee=12)
+        listings = BookListing.objects.order_by("book_id")
+
+        fast = BookListingReadSerializer(
+            BookListingReadSerializer.select(listings), many=True
+        )
+        slow = BookListingSerializer(listings, many=True)
+
+        self.assertEqual(
+            JSONRenderer().render(fast.data), JSONRenderer().render(slow.data)
+        )
+
+    def test_list_endpoint_output_unchanged(self):
+        book = sample_book()
+        book.author.add(sample_author())
+
+        res = APIClient().get(BOOK_URL)
+
+        self.assertEqual(
+            res.data["results"], [BookListSerializer(book).data]
+        )
+
+
+class BookExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(
+            "admin@admin.com", "testpass", is_staff=True
+        ))
+
+    def export(self, **params):
+        res = self.client.get(reverse("books:books-export"), params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res, b"".join(res.streaming_content).decode()
+
+    def test_export_ndjson_applies_title_filter(self):
+        book = sample_book(title="Dune")
+        book.author.add(sample_author(first_name="Frank", last_name="Herbert"))
+        sample_book(title="Emma")
+
+        res, content = self.export(title="dune")
+
+        self.assertEqual(
+            res["Content-Type"], "application/x-ndjson; charset=utf-8"
+        )
+        self.assertEqual(
+            [json.loads(line) for line in content.splitlines()],
+            [json.loads(JSONRenderer().render(BookListSerializer(book).data))],
+        )
+
+    def test_export_csv(self):
+        book = sample_book(title="Dune", daily_fee=1.5)
+        book.author.add(
+            sample_author(first_name="Frank", last_name="Herbert"),
+            sample_author(first_name="Brian", last_name="Herbert"),
+        )
+
+        res, content = self.export(format="csv")
+
+        self.assertIn('filename="books.csv"', res["Content-Disposition"])
+        self.assertEqual(content.splitlines(), [
+            "id,title,author,cover,inventory,daily_fee",
+            f"{book.id},Dune,first last; Frank Herbert; Brian Herbert,"
+            f"hard,2,1.50",
+        ])
+
+    def test_export_admin_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "testpass")
+        )
+
+        res = self.client.get(reverse("books:books-export"))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_streams_rows_in_bounded_memory(self):
+        seed_catalogue(20_000, 100)
+
+        tracemalloc.start()
+        try:
+            res = self.client.get(
+                reverse("books:books-export"), {"format": "csv"}
+            )
+            lines = sum(
+                chunk.count(b"\n") for chunk in res.streaming_content
+            )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertIsInstance(res, StreamingHttpResponse)
+        self.assertEqual(lines, 20_001)
+        # About 4 MB with a chunk of rows in flight; loading all 20,000
+        # rows at once peaks above 15 MB.
+        self.assertLess(peak, 8_000_000)
+
+
+class BookImportTests(TestCase):
+    CSV = (
+        "title,author,cover,inventory,daily_fee\n"
+        "Dune,Frank Herbert,hard,3,1.50\n"
+        "Dune Messiah,Frank Herbert; Brian Herbert,soft,2,1.25\n"
+        "Emma,Jane Austen,soft,1,0.75\n"
+    )
+
+    def setUp(self):
+        get_cache().clear()
+
+    def import_file(self, content, suffix=".csv"):
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=suffix, encoding="utf-8", delete=False
+        ) as catalogue:
+            catalogue.write(content)
+        path = catalogue.name
+        self.addCleanup(os.remove, path)
+
+        out, err = StringIO(), StringIO()
+        call_command("import_catalogue", path, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_creates_books_and_dedupes_authors(self):
+        austen = sample_author(first_name="Jane", last_name="Austen")
+
+        out, _ = self.import_file(self.CSV)
+
+        self.assertIn("3 created, 0 updated, 2 new authors", out)
+        self.assertEqual(Author.objects.count(), 3)
+        emma = Book.objects.get(title="Emma")
+        self.assertEqual(list(emma.author.all()), [austen])
+        messiah = BookListing.objects.get(title="Dune Messiah")
+        self.assertEqual(messiah.authors, ["Frank Herbert", "Brian Herbert"])
+        self.assertEqual(
+            get_backend().filter(BookListing.objects.all(), "mess").get(),
+            messiah,
+        )
+
+    def test_import_updates_existing_titles(self):
+        book = sample_book(title="Dune", inventory=10, daily_fee=2)
+        author = book.author.get()
+
+        out, _ = self.import_file(self.CSV)
+
+        self.assertIn("2 created, 1 updated", out)
+        book.refresh_from_db()
+        self.assertEqual((book.inventory, str(book.daily_fee)), (3, "1.50"))
+        self.assertEqual(list(book.author.all()), [author])
+        self.assertEqual(Book.objects.filter(title="Dune").count(), 1)
+        self.assertEqual(BookListing.objects.get(book=book).inventory, 3)
+
+    def test_import_matches_books_without_a_listing(self):
+        book = sample_book(title="Dune", inventory=10)
+        BookListing.objects.filter(book=book).delete()
+
+        out, _ = self.import_file(self.CSV)
+
+        self.assertIn("2 created, 1 updated", out)
+        self.assertEqual(Book.objects.filter(title="Dune").count(), 1)
+        book.refresh_from_db()
+        self.assertEqual(book.inventory, 3)
+
+    def test_import_reports_titles_shared_by_several_books(self):
+        first = sample_book(title="Dune", inventory=10)
+        second = sample_book(title="Dune", inventory=7)
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(
+            "admin@admin.com", "testpass", is_staff=True
+        ))
+        upload = SimpleUploadedFile("books.csv", self.CSV.encode())
+
+        res = client.post(reverse("books:books-import-view"), {"file": upload})
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual((res.data["created"], res.data["updated"]), (2, 0))
+        self.assertEqual(res.data["ambiguous"], 1)
+        self.assertEqual(res.data["errors"], [{
+            "line": 2,
+            "error": f"title matches 2 books ({first.id}, {second.id}), "
+                     f"none updated",
+        }])
+        self.assertEqual(
+            list(Book.objects.filter(title="Dune").values_list(
+                "inventory", flat=True
+            ).order_by("id")),
+            [10, 7],
+        )
+
+    def test_import_jsonl_reports_invalid_rows(self):
+        content = "\n".join([
+            json.dumps({
+                "title": "Cosmos", "cover": "hard", "inventory": 1,
+                "daily_fee": 1,
+                "author": [{"first_name": "Carl", "last_name": "Sagan",
+                            "pseudonym": "Carl"}],
+            }),
+            json.dumps({"title": "Bad", "cover": "leather", "inventory": 1,
+                        "daily_fee": 1}),
+            "{not json",
+        ])
+
+        out, err = self.import_file(content, ".jsonl")
+
+        self.assertIn("1 created", out)
+        self.assertIn("2 invalid", out)
+        self.assertIn("line 2: cover must be one of", err)
+        self.assertIn("line 3: invalid JSON", err)
+        self.assertEqual(Author.objects.get().pseudonym, "Carl")
+
+    def test_import_endpoint_admin_only(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "testpass")
+        )
+        url = reverse("books:books-import-view")
+        upload = SimpleUploadedFile("books.csv", self.CSV.encode())
+
+        res = client.post(url, {"file": upload})
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        client.force_authenticate(get_user_model().objects.create_user(
+            "admin@admin.com", "testpass", is_staff=True
+        ))
+        upload.seek(0)
+        res = client.post(url, {"file": upload})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 3)
+        self.assertEqual(BookListing.objects.count(), 3)
+
+
+class CatalogueCacheTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+
+    def test_repeated_list_is_served_from_cache(self):
+        sample_book()
+
+        first = self.client.get(BOOK_URL, {"page": 1})
+        with self.assertNumQueries(0):
+            second = self.client.get(BOOK_URL, {"page": 1})
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(get_stats(), {"hit": 1, "miss": 1})
+
+    def test_cache_key_depends_on_query_params(self):
+        sample_book(title="Book")
+        sample_book(title="Other")
+
+        self.client.get(BOOK_URL, {"title": "book"})
+        res = self.client.get(BOOK_URL, {"title": "other"})
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_book_and_author_writes_invalidate_cached_responses(self):
+        book = sample_book(title="Old")
+        author = book.author.first()
+        url = book_detail_url(book.id)
+        self.client.get(url)
+
+        book.title = "New"
+        book.save()
+        res = self.client.get(url)
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["title"], "New")
+
+        author.first_name = "Renamed"
+        author.save()
+        res = self.client.get(url)
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["author"], ["Renamed last"])
+
+    def test_inventory_changes_invalidate_cached_responses(self):
+        book = sample_book(inventory=2)
+        url = book_detail_url(book.id)
+        self.client.get(url)
+
+        Book.take_copy(book.id)
+        res = self.client.get(url)
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["inventory"], 1)
+
+    def test_author_list_is_cached_for_admin_only(self):
+        sample_author()
+        admin = get_user_model().objects.create_user(
+            email="admin@admin.com", password="testpass", is_staff=True
+        )
+        author_url = reverse("books:author-list")
+
+        self.assertEqual(
+            self.client.get(author_url).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        self.client.force_authenticate(admin)
+        self.client.get(author_url)
+        res = self.client.get(author_url)
+        self.client.force_authenticate(None)
+
+        self.assertEqual(res["X-Cache"], "HIT")
+        self.assertEqual(
+            self.client.get(author_url).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+
+def catalogue_cache(backend, location="catalogue") -> dict:
+    """CACHES with the catalogue alias on ``backend``."""
+    return {
+        **settings.CACHES,
+        "catalogue": {"BACKEND": backend, "LOCATION": location},
+    }
+
+
+class CatalogueCacheCheckTests(TestCase):
+    @override_settings(PROFILE="prod")
+    def test_prod_rejects_a_cache_of_its_own_per_process(self):
+        errors = check_catalogue_cache(None)
+
+        self.assertEqual([error.id for error in errors], ["books.E001"])
+
+    def test_prod_accepts_a_shared_cache(self):
+        with tempfile.TemporaryDirectory() as location, self.settings(
+            PROFILE="prod",
+            CACHES=catalogue_cache(
+                "django.core.cache.backends.filebased.FileBasedCache",
+                location,
+            ),
+        ):
+            self.assertEqual(check_catalogue_cache(None), [])
+
+    def test_other_profiles_may_cache_per_process(self):
+        self.assertEqual(check_catalogue_cache(None), [])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.book = sample_book(title="Dune")
+
+    def test_unchanged_list_and_detail_answer_304_without_queries(self):
+        for url in (BOOK_URL, book_detail_url(self.book.id)):
+            first = self.client.get(url)
+
+            with self.assertNumQueries(0):
+                res = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+            self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(res["ETag"], first["ETag"])
+
+    def test_if_modified_since(self):
+        first = self.client.get(BOOK_URL)
+
+        res = self.client.get(
+            BOOK_URL, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_validators_depend_on_query_params(self):
+        etag = self.client.get(BOOK_URL)["ETag"]
+
+        res = self.client.get(
+            BOOK_URL, {"title": "dune"}, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_writes_change_validators(self):
+        url = book_detail_url(self.book.id)
+        etag = self.client.get(url)["ETag"]
+
+        self.book.title = "Dune Messiah"
+        self.book.save()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["title"], "Dune Messiah")
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_write_in_another_worker_changes_validators(self):
+        url = book_detail_url(self.book.id)
+        with tempfile.TemporaryDirectory() as location, self.settings(
+            CACHES=catalogue_cache(
+                "django.core.cache.backends.filebased.FileBasedCache",
+                location,
+            ),
+        ):
+            etag = self.client.get(url)["ETag"]
+
+            # Caches are per thread, so the bump goes through another
+            # instance of the shared cache, as in another worker.
+            instances = []
+
+            def other_worker():
+                instances.append(get_cache())
+                try:
+                    bump_version(BOOKS)
+                finally:
+                    connection.close()
+
+            thread = threading.Thread(target=other_worker)
+            thread.start()
+            thread.join()
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+            self.assertIsNot(instances[0], get_cache())
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(res["ETag"], etag)
+
+    def test_author_validators_need_permission(self):
+        admin = get_user_model().objects.create_user(
+            email="admin@admin.com", password="testpass", is_staff=True
+        )
+        author_url = reverse("books:author-list")
+        self.client.force_authenticate(admin)
+        etag = self.client.get(author_url)["ETag"]
+
+        res = self.client.get(author_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        sample_author(first_name="New")
+        res = self.client.get(author_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(None)
+        res = self.client.get(author_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class BookAvailabilityTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="testpass"
+        )
+        self.books = [sample_book(inventory=3) for _ in range(3)]
+
+    def borrow(self, book, returned=None):
+        Borrowing.objects.create(
+            book=book,
+            user=self.user,
+            expected_return_date=datetime.date.today(),
+            actual_return_date=returned,
+        )
+
+    def ids(self, *book_ids):
+        return {"ids": ",".join(str(book_id) for book_id in book_ids)}
+
+    def test_availability_of_many_books_in_one_query(self):
+        first, second, _ = self.books
+        self.borrow(first)
+        self.borrow(first)
+        self.borrow(first, returned=datetime.date.today())
+
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                AVAILABILITY_URL, self.ids(first.id, second.id, 999_999)
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {
+            str(first.id): {"inventory": 3, "active_borrowings": 2},
+            str(second.id): {"inventory": 3, "active_borrowings": 0},
+        })
+
+    def test_active_borrowings_are_counted_from_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(AVAILABILITY_URL, self.ids(self.books[0].id))
+
+        self.assertIn(
+            "borrowing_book_return_idx (book_id=? AND actual_return_date=?)",
+            explain(queries.captured_queries[-1]["sql"]),
+        )
+
+    def test_invalid_or_too_many_ids_are_rejected(self):
+        for params in ({}, {"ids": "1,two"}, self.ids(*range(1, 202))):
+            res = self.client.get(AVAILABILITY_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_etag_and_short_max_age(self):
+        params = self.ids(*(book.id for book in self.books))
+        first = self.client.get(AVAILABILITY_URL, params)
+        second = self.client.get(AVAILABILITY_URL, params)
+
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first["ETag"], second["ETag"])
+        self.assertIn("max-age=5", first["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            res = self.client.get(
+                AVAILABILITY_URL, params, HTTP_IF_NONE_MATCH=first["ETag"]
+            )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], first["ETag"])
+
+    def test_checkout_changes_etag(self):
+        book = self.books[0]
+        params = self.ids(book.id)
+        etag = self.client.get(AVAILABILITY_URL, params)["ETag"]
+
+        Book.take_copy(book.id)
+        self.borrow(book)
+        res = self.client.get(
+            AVAILABILITY_URL, params, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(
+            res.data[str(book.id)], {"inventory": 2, "active_borrowings": 1}
+        )
+
+
+class BookSearchTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.dune = sample_book(title="Dune")
+        self.dune.author.set([
+            sample_author(first_name="Frank", last_name="Herbert")
+        ])
+        self.messiah = sample_book(title="Dune Messiah, the sequel to Dune")
+        self.notebook = sample_book(title="Notebook")
+
+    def search_titles(self, **params):
+        res = self.client.get(BOOK_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [book["title"] for book in res.data["results"]]
+
+    def test_sqlite_uses_fts5_index(self):
+        self.assertIsInstance(get_backend(), SQLiteSearchBackend)
+
+    def test_title_filter_matches_substrings(self):
+        self.assertEqual(
+            self.search_titles(title="du"),
+            ["Dune", "Dune Messiah, the sequel to Dune"],
+        )
+        self.assertEqual(self.search_titles(title="BOOK"), ["Notebook"])
+        self.assertEqual(
+            self.search_titles(title="e sequel"),
+            ["Dune Messiah, the sequel to Dune"],
+        )
+
+    def test_title_filter_ignores_author_names(self):
+        self.assertEqual(self.search_titles(title="herbert"), [])
+
+    def test_search_covers_authors_and_ranks_results(self):
+        sample_book(title="Herbert, a biography")
+
+        self.assertEqual(self.search_titles(search="frank herb"), ["Dune"])
+        self.assertEqual(
+            self.search_titles(search="herbert"),
+            ["Herbert, a biography", "Dune"],
+        )
+
+    def test_search_pages_through_every_match(self):
+        for number in range(8):
+            sample_book(title=f"Dune {'saga ' * number}{number}")
+
+        first = self.client.get(BOOK_URL, {"search": "saga"})
+        second = self.client.get(BOOK_URL, {"search": "saga", "page": 2})
+
+        self.assertEqual(first.data["count"], 7)
+        self.assertEqual(
+            [book["title"] for book in first.data["results"]]
+            + [book["title"] for book in second.data["results"]],
+            [f"Dune {'saga ' * number}{number}" for number in range(7, 0, -1)],
+        )
+        self.assertIsNone(second.data["next"])
+
+    def test_flush_empties_the_index(self):
+        call_command("flush", interactive=False, verbosity=0)
+
+        self.assertTrue(get_backend().is_empty())
+
+    def test_index_tables_come_from_a_migration(self):
+        applied = MigrationRecorder(connection).applied_migrations()
+
+        self.assertIn(("search_index", "create_tables"), applied)
+
+    def test_index_follows_renames_and_deletes(self):
+        author = self.dune.author.get()
+        author.last_name = "Smith"
+        author.save()
+        self.notebook.title = "Sketchbook"
+        self.notebook.save()
+        self.messiah.delete()
+
+        self.assertEqual(self.search_titles(search="smith"), ["Dune"])
+        self.assertEqual(self.search_titles(search="herbert"), [])
+        self.assertEqual(self.search_titles(title="sketch"), ["Sketchbook"])
+        self.assertEqual(self.search_titles(search="messiah"), [])
+
+    def test_author_first_name_filter(self):
+        admin = get_user_model().objects.create_user(
+            email="admin@admin.com", password="testpass", is_staff=True
+        )
+        sample_author(first_name="Francis", pseudonym="Frankie")
+        self.client.force_authenticate(admin)
+
+        res = self.client.get(reverse("books:author-list"), {"first_name": "an"})
+        by_pseudonym = self.client.get(
+            reverse("books:author-list"), {"search": "frankie"}
+        )
+
+        self.assertEqual(
+            sorted(author["first_name"] for author in res.data["results"]),
+            ["Francis", "Frank"],
+        )
+        self.assertEqual(len(by_pseudonym.data["results"]), 1)
+
+    def test_like_backend_fallback(self):
+        queryset = LikeSearchBackend().filter(
+            Book.objects.all(), "dun mess", ("title",)
+        )
+
+        self.assertEqual(list(queryset), [self.messiah])
+
+
+class BookKeysetPaginationTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        for title in ("Beta", "Alpha", "Beta", "Gamma", "Alpha", "Delta", "Beta"):
+            sample_book(title=title)
+
+    def walk(self, url, direction):
+        ids = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            page = [book["id"] for book in res.data["results"]]
+            ids = ids + page if direction == "next" else page + ids
+            url = res.data[direction]
+        return ids, res
+
+    def test_keyset_pages_cover_catalogue_in_stable_order(self):
+        expected = list(
+            Book.objects.order_by("title", "id").values_list("id", flat=True)
+        )
+
+        forward, last_page = self.walk(
+            f"{BOOK_URL}?pagination=keyset&page_size=2", "next"
+        )
+        self.assertEqual(forward, expected)
+        self.assertNotIn("count", last_page.data)
+
+        backward, _ = self.walk(last_page.data["previous"], "previous")
+        self.assertEqual(backward + [b["id"] for b in last_page.data["results"]],
+                         expected)
+
+    def test_keyset_count_modes(self):
+        exact = self.client.get(
+            BOOK_URL, {"pagination": "keyset", "count": "exact", "title": "beta"}
+        )
+        approx = self.client.get(
+            BOOK_URL, {"pagination": "keyset", "count": "approx"}
+        )
+
+        self.assertEqual(exact.data["count"], 3)
+        self.assertFalse(exact.data["count_is_approximate"])
+        self.assertEqual(approx.data["count"], 7)
+        self.assertTrue(approx.data["count_is_approximate"])
+
+    def test_keyset_pagination_skips_count_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(BOOK_URL, {"pagination": "keyset"})
+
+    def test_invalid_cursor_is_rejected(self):
+        res = self.client.get(
+            BOOK_URL, {"pagination": "keyset", "cursor": "not-a-cursor"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_pagination_stays_default(self):
+        res = self.client.get(BOOK_URL)
+
+        self.assertEqual(res.data["count"], 7)
+        self.assertIsNone(res.data["previous"])
+
+
+class BookQueryPlanTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        sample_book(title="Dune")
+
+    def page_query(self, params):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(BOOK_URL, params)
+        return queries.captured_queries[-1]["sql"]
+
+    def test_list_pages_use_title_index_without_distinct(self):
+        for params in ({}, {"pagination": "keyset"}):
+            sql = self.page_query(params)
+
+            self.assertNotIn("DISTINCT", sql)
+            self.assertIn("booklisting_title_idx", explain(sql))
+
+
+@override_settings(REPLICA_DATABASES=[REPLICA])
+class ReplicaRoutingTests(TransactionTestCase):
+    """The test database is the primary; a second SQLite file is its
+    replica, brought up to date only by ``replicate``.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        cls.replica_name = os.path.join(cls.replica_dir.name, "replica.sqlite3")
+        connections.settings[REPLICA] = {
+            **connections["default"].settings_dict, "NAME": cls.replica_name
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        cls.replica_dir.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.patron = get_user_model().objects.create_user(
+            "patron@test.com", "testpass"
+        )
+        self.book = sample_book(title="Replicated")
+        self.replicate()
+
+    def replicate(self):
+        connections[REPLICA].close()
+        connections["default"].ensure_connection()
+        replica = sqlite3.connect(self.replica_name)
+        connections["default"].connection.backup(replica)
+        replica.close()
+
+    def titles(self, client=None):
+        res = (client or self.client).get(BOOK_URL)
+        return [book["title"] for book in res.data["results"]]
+
+    def test_lists_and_retrieves_read_the_replica(self):
+        fresh = sample_book(title="Fresh")
+
+        self.assertEqual(self.titles(), ["Replicated"])
+        self.assertEqual(
+            self.client.get(book_detail_url(fresh.id)).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+        self.replicate()
+        self.assertEqual(self.titles(), ["Fresh", "Replicated"])
+
+    def test_other_actions_read_the_primary(self):
+        fresh = sample_book(inventory=3)
+
+        res = self.client.get(AVAILABILITY_URL, {"ids": fresh.id})
+
+        self.assertEqual(res.data[str(fresh.id)]["inventory"], 3)
+
+    def test_checkout_pins_the_patron_to_the_primary(self):
+        self.client.force_authenticate(self.patron)
+        elsewhere = APIClient()
+        elsewhere.force_authenticate(self.patron)
+
+        res = self.client.post(BORROWINGS_URL, {
+            "book": self.book.id,
+            "expected_return_date": datetime.date.today(),
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIn(PIN_COOKIE, res.cookies)
+        self.assertEqual(self.client.get(BORROWINGS_URL).data["count"], 1)
+        self.assertEqual(elsewhere.get(BORROWINGS_URL).data["count"], 0)
+
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_pin_expires(self):
+        self.client.force_authenticate(self.patron)
+        self.client.post(BORROWINGS_URL, {
+            "book": self.book.id,
+            "expected_return_date": datetime.date.today(),
+        })
+
+        self.assertEqual(self.client.get(BORROWINGS_URL).data["count"], 0)
+
+    def test_lagging_replica_responses_are_not_cached_nor_tagged(self):
+        sample_book(title="Fresh")
+
+        first = self.client.get(BOOK_URL)
+        self.replicate()
+        second = self.client.get(BOOK_URL)
+
+        self.assertNotIn("ETag", first)
+        self.assertEqual(second["X-Cache"], "MISS")
+        self.assertEqual(len(second.data["results"]), 2)
+
+    def test_rows_read_from_the_replica_are_saved_to_the_primary(self):
+        with read_from(REPLICA):
+            book = Book.objects.get(id=self.book.id)
+        book.title = "Renamed"
+        book.save()
+
+        self.assertEqual(Book.objects.get(id=book.id).title, "Renamed")
+        with read_from(REPLICA):
+            self.assertEqual(Book.objects.get(id=book.id).title, "Replicated")
+
+
+class LoopGuardCache(LocMemCache):
+    """Raises when called on the event loop, which it would block."""
+    get = async_unsafe(LocMemCache.get)
+    set = async_unsafe(LocMemCache.set)
+    add = async_unsafe(LocMemCache.add)
+    incr = async_unsafe(LocMemCache.incr)
+
+
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.factory = AsyncRequestFactory()
+        self.list_view, self.detail_view = [
+            route.callback
+            for route in async_routes(BookAsyncReadView, "books")
+        ]
+        self.books = [
+            sample_book(title=f"Golden River {index}") for index in range(3)
+        ] + [sample_book(title="Silent Stone")]
+        self.author_id = self.books[0].author.get().id
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "testpass"
+        )
+
+    def token(self, user):
+        return {"headers": {"Authorize": f"Bearer {AccessToken.for_user(user)}"}}
+
+    async def test_list_matches_sync_endpoint(self):
+        for params in ({}, {"page": 2, "page_size": 2}, {"title": "golden"},
+                       {"search": "silent"}, {"page": "last"}):
+            get_cache().clear()
+            expected = await self.async_client.get(BOOK_URL, params)
+            get_cache().clear()
+            res = await self.list_view(self.factory.get(BOOK_URL, params))
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(json.loads(res.content), expected.json())
+            self.assertEqual(res["X-Cache"], "MISS")
+
+    async def test_retrieve_matches_sync_endpoint(self):
+        url = book_detail_url(self.books[0].id)
+        expected = await self.async_client.get(url)
+        get_cache().clear()
+
+        res = await self.detail_view(
+            self.factory.get(url), pk=self.books[0].id
+        )
+
+        self.assertEqual(json.loads(res.content), expected.json())
+
+    async def test_shares_validators_with_sync_views(self):
+        etag = (await self.async_client.get(BOOK_URL))["ETag"]
+
+        res = await self.list_view(
+            self.factory.get(BOOK_URL, headers={"If-None-Match": etag})
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+    async def test_shares_catalogue_cache_with_sync_views(self):
+        await self.list_view(self.factory.get(BOOK_URL))
+
+        res = await self.async_client.get(BOOK_URL)
+
+        self.assertEqual(res["X-Cache"], "HIT")
+
+    async def test_cache_calls_stay_off_the_event_loop(self):
+        guarded = {
+            alias: {
+                "BACKEND": "books.tests.LoopGuardCache",
+                "LOCATION": f"guarded-{alias}",
+            }
+            for alias in ("catalogue", "auth")
+        }
+        headers = self.token(self.admin)["headers"]
+
+        with self.settings(CACHES={**settings.CACHES, **guarded}):
+            first = await self.list_view(
+                self.factory.get(BOOK_URL, headers=headers)
+            )
+            second = await self.list_view(
+                self.factory.get(BOOK_URL, headers=headers)
+            )
+            revalidated = await self.list_view(self.factory.get(
+                BOOK_URL, headers={**headers, "If-None-Match": first["ETag"]}
+            ))
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(
+            revalidated.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+    async def test_missing_book_and_page_are_not_found(self):
+        res = await self.detail_view(
+            self.factory.get(book_detail_url(0)), pk=0
+        )
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        res = await self.list_view(self.factory.get(BOOK_URL, {"page": 9}))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_writes_go_to_sync_viewset_with_its_permissions(self):
+        payload = json.dumps({
+            "title": "New", "author": [self.author_id], "cover": "hard",
+            "inventory": 1, "daily_fee": "1.00",
+        })
+
+        res = await self.list_view(self.factory.post(
+            BOOK_URL, payload, content_type="application/json"
+        ))
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = await self.list_view(self.factory.post(
+            BOOK_URL, payload, content_type="application/json",
+            **self.token(self.admin),
+        ))
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    async def test_invalid_token_is_rejected(self):
+        res = await self.list_view(self.factory.get(
+            BOOK_URL, headers={"Authorize": "Bearer nonsense"}
+        ))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("Bearer", res["WWW-Authenticate"])
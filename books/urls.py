@@ -1,12 +1,18 @@
+from django.conf import settings
 from rest_framework import routers
 
-from books.views import BookViewSet, AuthorViewSet
+from books.async_views import async_routes
+from books.views import BookViewSet, AuthorViewSet, BookAsyncReadView
 
 router = routers.DefaultRouter()
-router.register("", BookViewSet, basename="books")
+# "authors" goes first, otherwise the books detail route captures it as a pk
 router.register("authors", AuthorViewSet)
+router.register("", BookViewSet, basename="books")
 
 
 urlpatterns = router.urls
 
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = async_routes(BookAsyncReadView, "books") + urlpatterns
+
 app_name = "books"
@@ -1,40 +1,170 @@
-from rest_framework import viewsets
+import io
+
+from django.conf import settings
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 
-from books.models import Book, Author
-from books.paginations import BookPagination
+from books.async_views import AsyncReadView
+from books.cache import (
+    AUTHORS,
+    BOOKS,
+    BORROWINGS,
+    CatalogueCacheMixin,
+    ConditionalGetMixin,
+    conditional_response,
+)
+from books.exports import ExportMixin
+from books.imports import (
+    FORMATS,
+    CatalogueImporter,
+    detect_format,
+    read_rows,
+)
+from books.models import Book, Author, BookListing
+from books.paginations import (
+    BookKeysetPagination,
+    BookPagination,
+    KeysetPaginationMixin,
+)
 from books.permissions import IsAdminOrReadOnly
+from books.replicas import ReplicaReadMixin
+from books.search import get_backend
 from books.serializers import (
     BookSerializer,
-    BookListSerializer,
+    BookListingReadSerializer,
     AuthorSerializer,
 )
+from metrics.timing import TimedViewMixin
 
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(
+    TimedViewMixin,
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CatalogueCacheMixin,
+    KeysetPaginationMixin,
+    ExportMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Book.objects.all().prefetch_related("author")
+    cache_versions = (BOOKS,)
+    export_columns = (
+        "id", "title", "author", "cover", "inventory", "daily_fee"
+    )
     serializer_class = BookSerializer
     pagination_class = BookPagination
+    keyset_pagination_class = BookKeysetPagination
     permission_classes = (IsAdminOrReadOnly,)
+    availability_max_ids = 200
 
     def get_queryset(self):
         queryset = self.queryset
         title = self.request.query_params.get("title")
+        search = self.request.query_params.get("search")
+
+        if self.action in ["list", "retrieve", "export"]:
+            queryset = BookListing.objects.all()
 
         if title:
             queryset = queryset.filter(title__icontains=title)
 
-        return queryset.distinct()
+        if search:
+            queryset = get_backend().rank(queryset, search)
+
+        if self.action == "retrieve":
+            # Lists are projected by the paginator, after counting.
+            queryset = BookListingReadSerializer.select(queryset)
+
+        return queryset
+
+    def get_cache_versions(self):
+        if self.action == "availability":
+            # Counts the copies on loan, which holds and checkouts change.
+            return (BOOKS, BORROWINGS)
+        return self.cache_versions
 
     def get_serializer_class(self):
-        if self.action in ["list", "retrieve"]:
-            return BookListSerializer
+        if self.action in ["list", "retrieve", "export"]:
+            return BookListingReadSerializer
 
         return BookSerializer
 
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="import",
+        permission_classes=[IsAdminUser],
+        parser_classes=[MultiPartParser],
+    )
+    def import_view(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "Upload a CSV or JSONL catalogue"})
+
+        format = request.data.get("format") or detect_format(upload.name)
+        if format not in FORMATS:
+            raise ValidationError({"format": f"Choose one of {FORMATS}"})
+
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+        report = CatalogueImporter().run(read_rows(stream, format))
 
-class AuthorViewSet(viewsets.ModelViewSet):
+        return Response(
+            report,
+            status=(
+                status.HTTP_207_MULTI_STATUS
+                if report["errors"] else status.HTTP_200_OK
+            ),
+        )
+
+    @action(methods=["GET"], detail=False)
+    def availability(self, request):
+        """Inventory and active borrowings of the books in ``?ids=1,2,3``.
+
+        Replaces one retrieve per book on catalogue pages; unknown ids
+        are left out of the result.
+        """
+        ids = request.query_params.get("ids", "")
+        try:
+            book_ids = sorted({int(book_id) for book_id in ids.split(",")})
+        except ValueError:
+            raise ValidationError({"ids": "Pass comma-separated book ids"})
+        if len(book_ids) > self.availability_max_ids:
+            raise ValidationError(
+                {"ids": f"Pass at most {self.availability_max_ids} ids"}
+            )
+
+        def handler(request):
+            # String keys, as in the cached copy, so both hash the same.
+            return Response({
+                str(book_id): counts
+                for book_id, counts in Book.availability(book_ids).items()
+            })
+
+        response = self.cached_response(handler, request)
+        return conditional_response(
+            request, response, settings.AVAILABILITY_MAX_AGE
+        )
+
+
+class BookAsyncReadView(AsyncReadView):
+    viewset = BookViewSet
+    # Searches consult the backend, which may introspect the database.
+    blocking_params = ("search",)
+
+
+class AuthorViewSet(
+    TimedViewMixin,
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CatalogueCacheMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Author.objects.all()
+    cache_versions = (AUTHORS,)
     serializer_class = AuthorSerializer
     pagination_class = BookPagination
     permission_classes = (IsAdminUser,)
@@ -42,8 +172,12 @@ class AuthorViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         queryset = self.queryset
         first_name = self.request.query_params.get("first_name")
+        search = self.request.query_params.get("search")
 
         if first_name:
             queryset = queryset.filter(first_name__icontains=first_name)
 
-        return queryset.distinct()
+        if search:
+            queryset = get_backend().rank(queryset, search)
+
+        return queryset
@@ -0,0 +1,25 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from borrowings.overdue import detect_overdue
+
+
+class Command(BaseCommand):
+    help = (
+        "Flag borrowings that became overdue since the last run. "
+        "Meant to run from cron, e.g. every night after midnight."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=datetime.date.fromisoformat,
+            help="Scan as of this date instead of today (YYYY-MM-DD).",
+        )
+
+    def handle(self, *args, **options):
+        flagged = detect_overdue(options["date"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Flagged {flagged} newly overdue borrowings")
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from borrowings.quota import recount_loans
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every patron's active and overdue loan counters from "
+        "the borrowings, e.g. after deploying the quota or editing "
+        "borrowings by hand."
+    )
+
+    def handle(self, *args, **options):
+        updated = recount_loans()
+        self.stdout.write(
+            self.style.SUCCESS(f"Recounted the loans of {updated} users")
+        )
@@ -1,7 +1,10 @@
 import datetime
 
 from django.conf import settings
-from django.db import models
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
 from rest_framework.exceptions import ValidationError
 
 from books.models import Book
@@ -12,13 +15,24 @@ class Borrowing(models.Model):
     expected_return_date = models.DateField()
     actual_return_date = models.DateField(blank=True, null=True)
     book = models.ForeignKey(
-        to=Book, on_delete=models.CASCADE, related_name="borrowings"
+        to=Book,
+        on_delete=models.CASCADE,
+        related_name="borrowings",
+        # Covered by the (book, actual_return_date) index below.
+        db_index=False,
     )
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="borrowings",
+        # Covered by the (user, actual_return_date) index below.
+        db_index=False,
     )
+    # Set by the overdue scan, see borrowings.overdue. It drives the
+    # overdue notifications and quota, and lags until the scan runs.
+    overdue = models.BooleanField(default=False)
+    # Checked out from a copy a reservation held, not from the shelf.
+    from_hold = False
 
     def __str__(self):
         active = (
@@ -54,7 +68,10 @@ class Borrowing(models.Model):
 
     def clean(self):
         Borrowing.validate_date(ValidationError, self.actual_return_date)
-        Borrowing.validate_book_inventory(self.book.inventory, ValidationError)
+        if not self.from_hold:
+            Borrowing.validate_book_inventory(
+                self.book.inventory, ValidationError
+            )
 
     def save(
         self,
@@ -64,6 +81,71 @@ class Borrowing(models.Model):
         update_fields=None,
     ):
         self.full_clean()
+        # The scan only looks past its watermark, so a due date moved
+        # into the past (or extended) is flagged here.
+        if self.is_active and update_fields is None:
+            self.overdue = self.expected_return_date < datetime.date.today()
+            if not self._state.adding:
+                with transaction.atomic(using=using):
+                    self.flag_overdue(using)
+                    return super(Borrowing, self).save(
+                        force_insert, force_update, using, update_fields
+                    )
         return super(Borrowing, self).save(
             force_insert, force_update, using, update_fields
         )
+
+    def flag_overdue(self, using=None) -> None:
+        """Store a changed ``overdue`` flag and move the patron's counter.
+
+        The conditional UPDATE flips the stored flag, so only a change
+        the counter has not seen yet is counted, see borrowings.quota.
+        """
+        flipped = Borrowing.objects.using(using).filter(
+            id=self.id, actual_return_date__isnull=True
+        ).exclude(overdue=self.overdue).update(overdue=self.overdue)
+
+        if flipped:
+            get_user_model().objects.using(using).filter(
+                id=self.user_id
+            ).update(overdue_loans=(
+                F("overdue_loans") + 1 if self.overdue
+                # Floored, as in borrowings.quota.decrease.
+                else Greatest(F("overdue_loans") - 1, Value(0))
+            ))
+
+    class Meta:
+        indexes = [
+            # Owner lists, optionally filtered by is_active.
+            models.Index(
+                fields=["user", "actual_return_date"],
+                name="borrowing_user_return_idx",
+            ),
+            # Keyset pagination order.
+            models.Index(
+                fields=["borrow_date", "id"],
+                name="borrowing_borrow_date_idx",
+            ),
+            # Active borrowings only, by due date: the overdue scan and
+            # ?overdue= lists.
+            models.Index(
+                fields=["expected_return_date"],
+                name="borrowing_active_due_idx",
+                condition=models.Q(actual_return_date__isnull=True),
+            ),
+            # Active borrowings per book, counted for availability.
+            models.Index(
+                fields=["book", "actual_return_date"],
+                name="borrowing_book_return_idx",
+            ),
+        ]
+
+
+class OverdueScan(models.Model):
+    """High-watermark of the overdue scan, a single row.
+
+    Every active borrowing due on or before ``scanned_through`` has
+    already been flagged, so the next scan starts after it.
+    """
+    scanned_through = models.DateField()
+    finished_at = models.DateTimeField(auto_now=True)
@@ -0,0 +1,45 @@
+import datetime
+
+from django.db import transaction
+
+from books.cache import BORROWINGS, bump_version
+from borrowings.models import Borrowing, OverdueScan
+from borrowings.quota import count_overdue
+from notifications.models import Notification
+from notifications.outbox import enqueue
+
+
+def detect_overdue(today=None) -> int:
+    """Flag active borrowings that became overdue since the last scan.
+
+    A borrowing is overdue once ``expected_return_date`` has passed.
+    Only due dates after the watermark are scanned, through the partial
+    index on active due dates, so each run touches just the newly
+    overdue rows, and queues an overdue notification for each. Returns
+    how many were flagged.
+    """
+    today = today or datetime.date.today()
+    scanned_through = today - datetime.timedelta(days=1)
+
+    with transaction.atomic():
+        scan = OverdueScan.objects.select_for_update().filter(pk=1).first()
+        if scan is not None and scan.scanned_through >= scanned_through:
+            return 0
+
+        due = Borrowing.objects.filter(
+            actual_return_date__isnull=True,
+            expected_return_date__lte=scanned_through,
+            overdue=False,
+        )
+        if scan is not None:
+            due = due.filter(expected_return_date__gt=scan.scanned_through)
+
+        enqueue(Notification.EventChoices.OVERDUE, due)
+        count_overdue(due)
+        flagged = due.update(overdue=True)
+        if flagged:
+            bump_version(BORROWINGS)
+        OverdueScan.objects.update_or_create(
+            pk=1, defaults={"scanned_through": scanned_through}
+        )
+    return flagged
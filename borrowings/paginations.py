@@ -1,7 +1,13 @@
 from rest_framework.pagination import PageNumberPagination
 
+from books.paginations import KeysetPagination, ProjectionMixin
 
-class BorrowingPagination(PageNumberPagination):
+
+class BorrowingPagination(ProjectionMixin, PageNumberPagination):
     page_size = 5
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+class BorrowingKeysetPagination(KeysetPagination):
+    ordering = ("borrow_date", "pk")
@@ -13,9 +13,11 @@ class IsAdminOrIsOwnerGetPost(BasePermission):
         )
 
     def has_object_permission(self, request, view, obj):
+        # Read paths hand over values() rows instead of instances.
+        owner_id = obj["user_id"] if isinstance(obj, dict) else obj.user_id
         return bool(
             request.user
             and request.user.is_staff
-            or (obj.user == request.user
+            or (owner_id == request.user.id
                 and request.method in SAFE_METHODS + ("POST",))
         )
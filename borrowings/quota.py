@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from rest_framework.exceptions import ValidationError
+
+from borrowings.models import Borrowing
+
+
+def quota_errors(active_loans, overdue_loans, count=1):
+    """Why ``count`` more loans break the quota, or None if they fit."""
+    if overdue_loans > settings.MAX_OVERDUE_LOANS:
+        return {"quota": f"Return your {overdue_loans} overdue borrowings "
+                         f"before borrowing more"}
+    if active_loans + count > settings.MAX_ACTIVE_LOANS:
+        return {"quota": f"At most {settings.MAX_ACTIVE_LOANS} borrowings "
+                         f"may be active at a time, you have {active_loans}"}
+    return None
+
+
+def take_loans(user_id, count=1) -> None:
+    """Count ``count`` new loans against the patron's quota.
+
+    The conditional UPDATE is a single-row check, and concurrent
+    checkouts queue on the row's write lock, so the quota can never be
+    exceeded. Meant to run in the transaction creating the borrowings;
+    raises ValidationError, rolling it back, when they do not fit.
+    """
+    users = get_user_model().objects.filter(id=user_id)
+    taken = users.filter(
+        active_loans__lte=settings.MAX_ACTIVE_LOANS - count,
+        overdue_loans__lte=settings.MAX_OVERDUE_LOANS,
+    ).update(active_loans=F("active_loans") + count)
+
+    if not taken:
+        raise ValidationError(quota_errors(
+            *users.values_list("active_loans", "overdue_loans").get(),
+            count=count,
+        ))
+
+
+def per_user(borrowings, **filters):
+    """How many of ``borrowings`` belong to the outer user row."""
+    return Coalesce(Subquery(
+        borrowings.filter(user=OuterRef("pk"), **filters)
+        .order_by().values("user").annotate(count=Count("id"))
+        .values("count")
+    ), Value(0))
+
+
+def decrease(counter, borrowings, **filters):
+    # Floored: borrowings created outside the API were never counted.
+    return Greatest(F(counter) - per_user(borrowings, **filters), Value(0))
+
+
+def users_of(borrowings):
+    return get_user_model().objects.filter(
+        id__in=borrowings.order_by().values("user_id")
+    )
+
+
+def release_loans(borrowings) -> None:
+    """Take returned ``borrowings`` off their patrons' counters."""
+    users_of(borrowings).update(
+        active_loans=decrease("active_loans", borrowings),
+        overdue_loans=decrease("overdue_loans", borrowings, overdue=True),
+    )
+
+
+def count_overdue(borrowings) -> None:
+    """Add ``borrowings``, about to be flagged overdue, to the counters."""
+    users_of(borrowings).update(
+        overdue_loans=F("overdue_loans") + per_user(borrowings)
+    )
+
+
+def recount_loans() -> int:
+    """Recompute every patron's counters from the borrowings.
+
+    For deploying the counters and after borrowings were changed by
+    hand. Returns how many patrons were updated.
+    """
+    active = Borrowing.objects.filter(actual_return_date__isnull=True)
+    return get_user_model().objects.update(
+        active_loans=per_user(active),
+        overdue_loans=per_user(active, overdue=True),
+    )
@@ -1,11 +1,27 @@
 import datetime
+from collections import Counter
 
+from django.contrib.auth import get_user_model
 from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
-from books.serializers import BookListSerializer
+from analytics.rollups import record_checkouts, record_returns
+from books.cache import BORROWINGS, bump_version
+from books.models import Book
+from books.serializers import (
+    BookListSerializer,
+    ValuesSerializer,
+    decimal_field,
+)
 from borrowings.models import Borrowing
+from borrowings.quota import quota_errors, release_loans, take_loans
+from notifications.models import Notification
+from notifications.outbox import enqueue
+from payments.billing import bill_returns
+from reservations.waitlist import claim_hold, held_books, return_copies
+
+BULK_MAX_ITEMS = 100
 
 
 class BorrowingSerializer(serializers.ModelSerializer):
@@ -44,6 +60,51 @@ class BorrowingListSerializer(BorrowingSerializer):
     )
 
 
+class BorrowingListReadSerializer(ValuesSerializer):
+    """Authors come from the book's listing, one join instead of a prefetch."""
+    values = (
+        "id",
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+        "book_id",
+        "book__title",
+        "book__listing__authors",
+        "book__cover",
+        "book__inventory",
+        "book__daily_fee",
+        "user__email",
+        "user_id",
+    )
+    schema_serializer = BorrowingListSerializer
+    date = serializers.DateField()
+    daily_fee = decimal_field(Book, "daily_fee")
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "borrow_date": self.date.to_representation(row["borrow_date"]),
+            "expected_return_date": self.date.to_representation(
+                row["expected_return_date"]
+            ),
+            "actual_return_date": self.date.to_representation(
+                row["actual_return_date"]
+            ),
+            "book": {
+                "id": row["book_id"],
+                "title": row["book__title"],
+                "author": row["book__listing__authors"] or [],
+                "cover": row["book__cover"],
+                "inventory": row["book__inventory"],
+                "daily_fee": self.daily_fee.to_representation(
+                    row["book__daily_fee"]
+                ),
+            },
+            "user": row["user__email"],
+            "is_active": not row["actual_return_date"],
+        }
+
+
 class BorrowingCreateSerializer(BorrowingSerializer):
     def validate(self, attrs):
         data = super(BorrowingSerializer, self).validate(attrs=attrs)
@@ -58,9 +119,21 @@ class BorrowingCreateSerializer(BorrowingSerializer):
 
     def create(self, validated_data):
         with transaction.atomic():
-            borrowing = Borrowing.objects.create(**validated_data)
-            borrowing.book.inventory -= 1
-            borrowing.book.save()
+            # Quota and copy are claimed first: the conditional UPDATEs
+            # take the write lock up front and their row counts decide
+            # the checkout. A copy held for the patron comes before the
+            # shelf.
+            take_loans(validated_data["user"].id)
+            book_id = validated_data["book"].id
+            borrowing = Borrowing(**validated_data)
+            borrowing.from_hold = claim_hold(validated_data["user"], book_id)
+            if not (borrowing.from_hold or Book.take_copy(book_id)):
+                Borrowing.validate_book_inventory(0, ValidationError)
+
+            borrowing.save(force_insert=True)
+            created = Borrowing.objects.filter(id=borrowing.id)
+            record_checkouts(created)
+            enqueue(Notification.EventChoices.CHECKOUT, created)
             return borrowing
 
     class Meta:
@@ -93,13 +166,167 @@ class BorrowingReturnSerializer(BorrowingSerializer):
         )
 
     def perform_return(self, borrowing, book):
-        if not borrowing.is_active:
-            raise ValidationError(
-                {"actual_return_date": f"This borrowing has already been closed"}
-            )
+        today = datetime.date.today()
+
+        with transaction.atomic():
+            closed = Borrowing.objects.filter(
+                id=borrowing.id, actual_return_date__isnull=True
+            ).update(actual_return_date=today)
+
+            if not closed:
+                raise ValidationError(
+                    {"actual_return_date": "This borrowing has already been closed"}
+                )
+
+            return_copies({book.id: 1})
+            bump_version(BORROWINGS)
+            returned = Borrowing.objects.filter(id=borrowing.id)
+            release_loans(returned)
+            bill_returns(returned, today)
+            record_returns(returned)
+            enqueue(Notification.EventChoices.RETURN, returned)
+
+        borrowing.actual_return_date = today
+
+
+class BorrowingBulkItemSerializer(serializers.Serializer):
+    book = serializers.IntegerField()
+    expected_return_date = serializers.DateField()
+
+
+class BorrowingBulkCreateSerializer(serializers.Serializer):
+    items = BorrowingBulkItemSerializer(
+        many=True, allow_empty=False, max_length=BULK_MAX_ITEMS
+    )
+    atomic = serializers.BooleanField(default=True)
+
+    def perform_checkout(self, user):
+        items = self.validated_data["items"]
+        books = Book.objects.in_bulk({item["book"] for item in items})
+        today = datetime.date.today()
+        remaining = {book.id: book.inventory for book in books.values()}
+        active_loans, overdue_loans = get_user_model().objects.filter(
+            id=user.id
+        ).values_list("active_loans", "overdue_loans").get()
+        # A copy held for the patron comes before the shelf, as in create.
+        holds = held_books(user)
+        results, claims = [], []
+
+        for item in items:
+            book_id = item["book"]
+            from_hold = book_id in holds
+            if book_id not in books:
+                errors = {"book": f"Book {book_id} does not exist"}
+            elif item["expected_return_date"] < today:
+                errors = {"expected_return_date": f"Expected return date "
+                                                  f"can't be any sooner "
+                                                  f"than {today}"}
+            elif not from_hold and remaining[book_id] <= 0:
+                errors = {"book_inventory": "Borrowing cannot be created, "
+                                            "because the inventory this "
+                                            "book is 0"}
+            else:
+                errors = quota_errors(active_loans, overdue_loans)
+                if not errors:
+                    if from_hold:
+                        holds.discard(book_id)
+                    else:
+                        remaining[book_id] -= 1
+                    active_loans += 1
+            claims.append(from_hold and not errors)
+            results.append({"id": None, "book": book_id, "errors": errors})
+
+        failed = [result for result in results if result["errors"]]
+        if failed and self.validated_data["atomic"]:
+            raise ValidationError({"items": [
+                result["errors"] or {} for result in results
+            ]})
+
+        accepted = [
+            (item, result, claim)
+            for item, result, claim in zip(items, results, claims)
+            if not result["errors"]
+        ]
+        if accepted:
+            with transaction.atomic():
+                take_loans(user.id, len(accepted))
+                # A hold that expired meanwhile falls back to the shelf.
+                counts = Counter(
+                    item["book"] for item, _, claim in accepted
+                    if not (claim and claim_hold(user, item["book"]))
+                )
+                if counts and not Book.take_copies(counts):
+                    raise ValidationError(
+                        {"book_inventory": "Inventory changed while "
+                                           "checking out, retry the batch"}
+                    )
+                borrowings = Borrowing.objects.bulk_create(
+                    Borrowing(
+                        book=books[item["book"]],
+                        user=user,
+                        expected_return_date=item["expected_return_date"],
+                    )
+                    for item, _, _ in accepted
+                )
+                bump_version(BORROWINGS)
+                created = Borrowing.objects.filter(
+                    id__in=[borrowing.id for borrowing in borrowings]
+                )
+                record_checkouts(created)
+                enqueue(Notification.EventChoices.CHECKOUT, created)
+            for (_, result, _), borrowing in zip(accepted, borrowings):
+                result["id"] = borrowing.id
+
+        return results
+
+
+class BorrowingBulkReturnSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=BULK_MAX_ITEMS,
+    )
+    atomic = serializers.BooleanField(default=True)
+
+    def perform_return(self, queryset):
+        ids = list(dict.fromkeys(self.validated_data["ids"]))
+        active = dict(
+            queryset.filter(id__in=ids, actual_return_date__isnull=True)
+            .values_list("id", "book_id")
+        )
+        results = [
+            {"id": borrowing_id, "errors": None} if borrowing_id in active
+            else {"id": borrowing_id, "errors": {
+                "actual_return_date": "This borrowing does not exist "
+                                      "or has already been closed"
+            }}
+            for borrowing_id in ids
+        ]
+
+        if len(active) < len(ids) and self.validated_data["atomic"]:
+            raise ValidationError({"ids": [
+                result["errors"] or {} for result in results
+            ]})
+
+        if active:
+            today = datetime.date.today()
+            with transaction.atomic():
+                closed = Borrowing.objects.filter(
+                    id__in=active, actual_return_date__isnull=True
+                ).update(actual_return_date=today)
+
+                if closed != len(active):
+                    raise ValidationError(
+                        {"actual_return_date": "Some borrowings were closed "
+                                               "concurrently, retry the batch"}
+                    )
 
-        borrowing.actual_return_date = datetime.date.today()
-        borrowing.save()
+                return_copies(Counter(active.values()))
+                bump_version(BORROWINGS)
+                returned = Borrowing.objects.filter(id__in=active)
+                release_loans(returned)
+                bill_returns(returned, today)
+                record_returns(returned)
+                enqueue(Notification.EventChoices.RETURN, returned)
 
-        book.inventory += 1
-        book.save()
+        return results
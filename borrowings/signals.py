@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from books.cache import BORROWINGS, bump_version
+from borrowings.models import Borrowing
+
+
+@receiver(post_save, sender=Borrowing)
+@receiver(post_delete, sender=Borrowing)
+def expire_borrowing_responses(sender, instance, **kwargs):
+    bump_version(BORROWINGS)
@@ -1,17 +1,42 @@
 import datetime
+import json
+import threading
+from io import StringIO
+from unittest import mock
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import (
+    AsyncRequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
+from benchmarks.utils import explain
+from books.async_views import async_routes
 from books.models import Book, Author
-from borrowings.models import Borrowing
-from borrowings.serializers import BorrowingListSerializer
+from borrowings.models import Borrowing, OverdueScan
+from borrowings.overdue import detect_overdue
+from borrowings.serializers import (
+    BULK_MAX_ITEMS,
+    BorrowingListReadSerializer,
+    BorrowingListSerializer,
+)
+from borrowings.views import BorrowingAsyncReadView
 
 BORROWINGS_URL = reverse("borrowings:borrowings-list")
+BULK_URL = reverse("borrowings:borrowings-bulk-create-view")
+BULK_RETURN_URL = reverse("borrowings:borrowings-bulk-return-view")
 EXPECTED_RETURN_DATE = datetime.date.today() + datetime.timedelta(days=3)
 
 
@@ -197,6 +222,32 @@ class AdminBorrowingApiTests(TestCase):
         )
         self.client.force_authenticate(self.user)
 
+    def test_export_csv_applies_filters(self):
+        borrowing = sample_borrowing(user=self.other_user)
+        sample_borrowing(
+            user=self.other_user, actual_return_date=datetime.date.today()
+        )
+        sample_borrowing(user=self.user)
+
+        res = self.client.get(
+            reverse("borrowings:borrowings-export"),
+            {"user_id": self.other_user.id, "is_active": "True"},
+            HTTP_ACCEPT="text/csv",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], (
+            "id,borrow_date,expected_return_date,actual_return_date,"
+            "book.id,book.title,book.author,book.cover,book.inventory,"
+            "book.daily_fee,user,is_active"
+        ))
+        self.assertEqual(lines[1:], [(
+            f"{borrowing.id},{datetime.date.today()},{EXPECTED_RETURN_DATE},,"
+            f"{borrowing.book_id},Title,first last,hard,2,0.50,"
+            f"other@test.com,True"
+        )])
+
     def test_list_all_borrowings(self):
         sample_borrowing(user=self.user)
         sample_borrowing(user=self.user)
@@ -225,3 +276,711 @@ class AdminBorrowingApiTests(TestCase):
         self.assertIn(serializer1.data, res.data["results"])
         self.assertIn(serializer2.data, res.data["results"])
         self.assertNotIn(serializer3.data, res.data["results"])
+
+    def test_keyset_pagination_orders_by_borrow_date_and_id(self):
+        borrowings = [sample_borrowing(user=self.user) for _ in range(3)]
+        Borrowing.objects.filter(id=borrowings[0].id).update(
+            borrow_date=datetime.date.today() + datetime.timedelta(days=1)
+        )
+
+        first = self.client.get(
+            BORROWINGS_URL, {"pagination": "keyset", "page_size": 2}
+        )
+        second = self.client.get(first.data["next"])
+
+        self.assertEqual(
+            [b["id"] for b in first.data["results"] + second.data["results"]],
+            [borrowings[1].id, borrowings[2].id, borrowings[0].id],
+        )
+        self.assertIsNone(second.data["next"])
+
+
+class BorrowingReadSerializerTests(TestCase):
+    def test_renders_same_json_as_model_serializer(self):
+        user = get_user_model().objects.create_user("test@test.com", "testpass")
+        active = sample_borrowing(user=user)
+        active.book.author.add(
+            Author.objects.create(first_name="Second", last_name="Author")
+        )
+        sample_borrowing(user=user, actual_return_date=datetime.date.today())
+        borrowings = Borrowing.objects.order_by("id")
+
+        fast = BorrowingListReadSerializer(
+            BorrowingListReadSerializer.select(borrowings), many=True
+        )
+        slow = BorrowingListSerializer(borrowings, many=True)
+
+        self.assertEqual(
+            JSONRenderer().render(fast.data), JSONRenderer().render(slow.data)
+        )
+
+
+class OverdueDetectionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.due_soon = sample_borrowing(user=self.user)
+        self.due_later = sample_borrowing(
+            user=self.user,
+            expected_return_date=EXPECTED_RETURN_DATE
+            + datetime.timedelta(days=5),
+        )
+        self.returned = sample_borrowing(
+            user=self.user, actual_return_date=datetime.date.today()
+        )
+
+    def day_after(self, date, days=1):
+        return date + datetime.timedelta(days=days)
+
+    def test_scan_flags_newly_overdue_borrowings_once(self):
+        self.assertEqual(detect_overdue(EXPECTED_RETURN_DATE), 0)
+        self.assertEqual(detect_overdue(self.day_after(EXPECTED_RETURN_DATE)), 1)
+
+        with self.assertNumQueries(3):
+            self.assertEqual(
+                detect_overdue(self.day_after(EXPECTED_RETURN_DATE)), 0
+            )
+
+        later = self.day_after(self.due_later.expected_return_date)
+        self.assertEqual(detect_overdue(later), 1)
+        self.assertEqual(
+            list(Borrowing.objects.filter(overdue=True).order_by("id")),
+            [self.due_soon, self.due_later],
+        )
+        self.assertEqual(
+            OverdueScan.objects.get().scanned_through,
+            self.due_later.expected_return_date,
+        )
+
+    def test_scan_only_reads_past_the_watermark(self):
+        detect_overdue(self.day_after(EXPECTED_RETURN_DATE))
+
+        with CaptureQueriesContext(connection) as queries:
+            detect_overdue(self.day_after(EXPECTED_RETURN_DATE, days=2))
+
+        (update,) = [
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].startswith("UPDATE \"borrowings_borrowing\"")
+        ]
+        self.assertIn(f"> '{EXPECTED_RETURN_DATE}'", update)
+        self.assertIn("borrowing_active_due_idx", explain(update))
+
+    def test_filter_by_overdue_reads_the_due_date(self):
+        # Due yesterday, and no scan has flagged it yet.
+        Borrowing.objects.filter(pk=self.due_soon.pk).update(
+            expected_return_date=self.day_after(datetime.date.today(), -1)
+        )
+
+        overdue = self.client.get(BORROWINGS_URL, {"overdue": "True"})
+        on_time = self.client.get(BORROWINGS_URL, {"overdue": "False"})
+
+        self.assertEqual(
+            [row["id"] for row in overdue.data["results"]],
+            [self.due_soon.id],
+        )
+        self.assertCountEqual(
+            [row["id"] for row in on_time.data["results"]],
+            [self.due_later.id, self.returned.id],
+        )
+        self.assertFalse(Borrowing.objects.filter(overdue=True).exists())
+
+    def test_overdue_lists_are_revalidated_the_next_day(self):
+        first = self.client.get(BORROWINGS_URL, {"overdue": "True"})
+        tomorrow = self.day_after(datetime.date.today())
+
+        with mock.patch("books.cache.datetime") as clock:
+            clock.date.today.return_value = tomorrow
+            res = self.client.get(
+                BORROWINGS_URL,
+                {"overdue": "True"},
+                HTTP_IF_NONE_MATCH=first["ETag"],
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], first["ETag"])
+
+    def test_save_keeps_overdue_state_behind_the_watermark(self):
+        self.due_soon.expected_return_date = datetime.date.today()
+        self.due_soon.save()
+        self.assertFalse(self.due_soon.overdue)
+
+        self.due_soon.expected_return_date = self.day_after(
+            datetime.date.today(), days=-1
+        )
+        self.due_soon.save()
+        self.assertTrue(self.due_soon.overdue)
+
+    def test_command(self):
+        out = StringIO()
+        date = self.day_after(EXPECTED_RETURN_DATE).isoformat()
+
+        call_command("detect_overdue_borrowings", "--date", date, stdout=out)
+
+        self.assertIn("Flagged 1 newly overdue borrowings", out.getvalue())
+
+
+class ConditionalBorrowingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.borrowing = sample_borrowing(user=self.user)
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_borrowings_answer_304_without_queries(self):
+        for url in (BORROWINGS_URL, borrowing_detail_url(self.borrowing.id)):
+            etag = self.client.get(url)["ETag"]
+
+            with self.assertNumQueries(0):
+                res = self.get(url, etag)
+
+            self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_validators_are_per_user(self):
+        etag = self.client.get(BORROWINGS_URL)["ETag"]
+        other = get_user_model().objects.create_user(
+            "other@test.com", "testpass"
+        )
+        self.client.force_authenticate(other)
+
+        res = self.get(BORROWINGS_URL, etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [])
+
+    def test_returns_checkouts_and_overdue_scan_change_validators(self):
+        changes = (
+            lambda: self.client.post(borrowing_return_url(self.borrowing.id)),
+            lambda: self.client.post(BULK_URL, {"items": [{
+                "book": self.borrowing.book_id,
+                "expected_return_date": EXPECTED_RETURN_DATE,
+            }]}, format="json"),
+            lambda: detect_overdue(
+                EXPECTED_RETURN_DATE + datetime.timedelta(days=2)
+            ),
+        )
+        for change in changes:
+            etag = self.client.get(BORROWINGS_URL)["ETag"]
+
+            change()
+
+            res = self.get(BORROWINGS_URL, etag)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_user_email_change_changes_validators(self):
+        etag = self.client.get(BORROWINGS_URL)["ETag"]
+
+        self.user.email = "renamed@test.com"
+        self.user.save()
+        res = self.get(BORROWINGS_URL, etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["user"], "renamed@test.com")
+
+
+class BorrowingQueryPlanTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.admin = get_user_model().objects.create_user(
+            "admin@admin.com", "testpass", is_staff=True
+        )
+
+    def list_query_plans(self, user, params):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(BORROWINGS_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return [
+            explain(query["sql"])
+            for query in queries.captured_queries
+            if "FROM \"borrowings_borrowing\"" in query["sql"]
+        ]
+
+    def test_owner_lists_use_user_return_index(self):
+        sample_borrowing(user=self.user)
+
+        for params in ({}, {"is_active": "True"}, {"is_active": "False"}):
+            for plan in self.list_query_plans(self.user, params):
+                self.assertIn("borrowing_user_return_idx", plan)
+
+    def test_active_borrowings_use_partial_index(self):
+        sample_borrowing(user=self.user)
+
+        count_plan, page_plan = self.list_query_plans(
+            self.admin, {"is_active": "True"}
+        )
+
+        self.assertNotIn("SCAN borrowings_borrowing\n", page_plan + "\n")
+        self.assertIn("borrowing_active_due_idx", page_plan)
+
+    def test_keyset_pages_use_borrow_date_index(self):
+        sample_borrowing(user=self.user)
+
+        (plan,) = self.list_query_plans(self.admin, {"pagination": "keyset"})
+
+        self.assertIn("borrowing_borrow_date_idx", plan)
+
+    def test_endpoint_query_counts_do_not_grow_with_rows(self):
+        self.client.force_authenticate(self.user)
+        borrowing = sample_borrowing(user=self.user)
+        expected = {
+            "list": 2,
+            "retrieve": 1,
+            # Both consult the reservation waitlist, move the quota
+            # counters and add to the three analytics rollups.
+            "create": 14,
+            "return": 14,
+        }
+
+        for rows in (1, 5):
+            while Borrowing.objects.count() < rows:
+                sample_borrowing(user=self.user)
+
+            with self.assertNumQueries(expected["list"]):
+                self.client.get(BORROWINGS_URL)
+            with self.assertNumQueries(expected["retrieve"]):
+                self.client.get(borrowing_detail_url(borrowing.id))
+
+        book = sample_book()
+        with self.assertNumQueries(expected["create"]):
+            res = self.client.post(BORROWINGS_URL, {
+                "expected_return_date": EXPECTED_RETURN_DATE,
+                "book": book.id,
+            })
+        with self.assertNumQueries(expected["return"]):
+            self.client.post(borrowing_return_url(res.data["id"]))
+
+
+class BulkBorrowingApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.other_user = get_user_model().objects.create_user(
+            "other@test.com",
+            "otherpass",
+        )
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+    def bulk_checkout(self, books, **params):
+        payload = {
+            "items": [
+                {"book": book.id, "expected_return_date": EXPECTED_RETURN_DATE}
+                for book in books
+            ],
+        }
+        payload.update(params)
+        return self.client.post(BULK_URL, payload, format="json")
+
+    def test_bulk_checkout_creates_borrowings_and_decreases_inventory(self):
+        book1 = sample_book(inventory=2)
+        book2 = sample_book(inventory=1)
+
+        res = self.bulk_checkout([book1, book1, book2])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 3)
+        book1.refresh_from_db()
+        book2.refresh_from_db()
+        self.assertEqual(book1.inventory, 0)
+        self.assertEqual(book2.inventory, 0)
+        borrowings = Borrowing.objects.filter(
+            id__in=[result["id"] for result in res.data]
+        )
+        self.assertEqual(borrowings.filter(user=self.user).count(), 3)
+
+    def test_atomic_bulk_checkout_rejects_whole_batch(self):
+        book1 = sample_book(inventory=2)
+        book2 = sample_book(inventory=1)
+
+        res = self.bulk_checkout([book1, book2, book2])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        book1.refresh_from_db()
+        self.assertEqual(book1.inventory, 2)
+        self.assertFalse(Borrowing.objects.exists())
+
+    def test_partial_bulk_checkout_reports_per_item_results(self):
+        book1 = sample_book(inventory=2)
+        book2 = sample_book(inventory=1)
+
+        res = self.bulk_checkout([book1, book2, book2], atomic=False)
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertIsNotNone(res.data[1]["id"])
+        self.assertIsNone(res.data[2]["id"])
+        self.assertIn("book_inventory", res.data[2]["errors"])
+        book2.refresh_from_db()
+        self.assertEqual(book2.inventory, 0)
+        self.assertEqual(Borrowing.objects.count(), 2)
+
+    @override_settings(MAX_ACTIVE_LOANS=BULK_MAX_ITEMS)
+    def test_bulk_checkout_query_count_does_not_grow_with_batch(self):
+        small_batch = [sample_book() for _ in range(2)]
+        large_batch = [sample_book() for _ in range(20)]
+
+        with CaptureQueriesContext(connection) as small_queries:
+            self.bulk_checkout(small_batch)
+        with CaptureQueriesContext(connection) as large_queries:
+            self.bulk_checkout(large_batch)
+
+        self.assertEqual(len(small_queries), len(large_queries))
+
+    def test_bulk_return_closes_borrowings_and_increases_inventory(self):
+        book = sample_book(inventory=2)
+        borrowing1 = sample_borrowing(user=self.user, book=book)
+        borrowing2 = sample_borrowing(user=self.user, book=book)
+
+        res = self.client.post(
+            BULK_RETURN_URL,
+            {"ids": [borrowing1.id, borrowing2.id]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        book.refresh_from_db()
+        self.assertEqual(book.inventory, 4)
+        self.assertFalse(
+            Borrowing.objects.filter(actual_return_date__isnull=True).exists()
+        )
+
+    def test_bulk_return_of_other_user_borrowing_is_rejected(self):
+        own = sample_borrowing(user=self.user)
+        foreign = sample_borrowing(user=self.other_user)
+
+        res = self.client.post(
+            BULK_RETURN_URL, {"ids": [own.id, foreign.id]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        own.refresh_from_db()
+        self.assertTrue(own.is_active)
+
+    def test_partial_bulk_return_skips_closed_borrowings(self):
+        active = sample_borrowing(user=self.user)
+        closed = sample_borrowing(
+            user=self.user, actual_return_date=datetime.date.today()
+        )
+
+        res = self.client.post(
+            BULK_RETURN_URL,
+            {"ids": [active.id, closed.id], "atomic": False},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertIsNone(res.data[0]["errors"])
+        self.assertIsNotNone(res.data[1]["errors"])
+        active.refresh_from_db()
+        self.assertFalse(active.is_active)
+
+
+@override_settings(MAX_ACTIVE_LOANS=2, MAX_OVERDUE_LOANS=0)
+class BorrowingQuotaTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def checkout(self, book=None):
+        return self.client.post(BORROWINGS_URL, {
+            "expected_return_date": EXPECTED_RETURN_DATE,
+            "book": (book or sample_book()).id,
+        })
+
+    def counters(self):
+        self.user.refresh_from_db()
+        return self.user.active_loans, self.user.overdue_loans
+
+    def test_checkout_beyond_quota_is_rejected_until_a_return(self):
+        first = self.checkout()
+        self.checkout()
+
+        book = sample_book()
+        res = self.checkout(book)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("At most 2 borrowings", str(res.data["quota"]))
+        book.refresh_from_db()
+        self.assertEqual(book.inventory, 2)
+        self.assertEqual(self.counters(), (2, 0))
+
+        self.client.post(borrowing_return_url(first.data["id"]))
+        self.assertEqual(self.checkout().status_code, status.HTTP_201_CREATED)
+
+    def test_overdue_loans_block_checkouts(self):
+        borrowing = Borrowing.objects.get(id=self.checkout().data["id"])
+        detect_overdue(EXPECTED_RETURN_DATE + datetime.timedelta(days=1))
+        self.assertEqual(self.counters(), (1, 1))
+
+        res = self.checkout()
+        self.assertIn("overdue", str(res.data["quota"]))
+
+        self.client.post(borrowing_return_url(borrowing.id))
+        self.assertEqual(self.counters(), (0, 0))
+        self.assertEqual(self.checkout().status_code, status.HTTP_201_CREATED)
+
+    def test_extending_an_overdue_loan_lets_the_patron_borrow_again(self):
+        borrowing = Borrowing.objects.get(id=self.checkout().data["id"])
+        detect_overdue(EXPECTED_RETURN_DATE + datetime.timedelta(days=1))
+
+        borrowing.refresh_from_db()
+        borrowing.expected_return_date = EXPECTED_RETURN_DATE
+        borrowing.save()
+
+        self.assertEqual(self.counters(), (1, 0))
+        self.assertEqual(self.checkout().status_code, status.HTTP_201_CREATED)
+
+    def test_due_date_moved_into_the_past_counts_as_overdue(self):
+        borrowing = Borrowing.objects.get(id=self.checkout().data["id"])
+
+        borrowing.expected_return_date = (
+            datetime.date.today() - datetime.timedelta(days=1)
+        )
+        borrowing.save()
+        self.assertEqual(self.counters(), (1, 1))
+        self.assertIn("overdue", str(self.checkout().data["quota"]))
+
+        self.client.post(borrowing_return_url(borrowing.id))
+        self.assertEqual(self.counters(), (0, 0))
+
+    def test_partial_bulk_checkout_reports_items_beyond_quota(self):
+        self.checkout()
+
+        res = self.client.post(BULK_URL, {"atomic": False, "items": [
+            {"book": sample_book().id, "expected_return_date": EXPECTED_RETURN_DATE}
+            for _ in range(2)
+        ]}, format="json")
+
+        self.assertIsNotNone(res.data[0]["id"])
+        self.assertIn("quota", res.data[1]["errors"])
+        self.assertEqual(self.counters(), (2, 0))
+
+    def test_bulk_return_releases_loans_of_each_patron(self):
+        admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "testpass"
+        )
+        ids = [self.checkout().data["id"]]
+        self.client.force_authenticate(admin)
+        ids.append(self.checkout().data["id"])
+
+        self.client.post(BULK_RETURN_URL, {"ids": ids}, format="json")
+
+        self.assertEqual(self.counters(), (0, 0))
+        admin.refresh_from_db()
+        self.assertEqual(admin.active_loans, 0)
+
+    def test_quota_check_is_one_single_row_update(self):
+        for _ in range(2):
+            sample_borrowing(user=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.checkout()
+
+        user_table = get_user_model()._meta.db_table
+        (quota_sql,) = [
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].startswith(f'UPDATE "{user_table}"')
+        ]
+        self.assertIn('"id" = ', quota_sql)
+        self.assertNotIn(Borrowing._meta.db_table, quota_sql)
+
+    def test_profile_update_keeps_counters(self):
+        stale = get_user_model().objects.get(id=self.user.id)
+        self.checkout()
+
+        stale.first_name = "Changed"
+        stale.save()
+
+        self.assertEqual(self.counters(), (1, 0))
+
+    def test_recount_command(self):
+        sample_borrowing(user=self.user)
+        sample_borrowing(
+            user=self.user,
+            expected_return_date=datetime.date.today() - datetime.timedelta(days=1),
+        )
+        out = StringIO()
+
+        call_command("recount_loans", stdout=out)
+
+        self.assertEqual(self.counters(), (2, 1))
+        self.assertIn("Recounted the loans of 1 users", out.getvalue())
+
+
+class CheckoutConcurrencyTests(TransactionTestCase):
+    def setUp(self):
+        self.users = [
+            get_user_model().objects.create_user(f"user{i}@test.com", "testpass")
+            for i in range(12)
+        ]
+
+    def checkout_concurrently(self, checkouts):
+        """POST each ``(user, book)`` checkout from its own thread at once."""
+        statuses = []
+        barrier = threading.Barrier(len(checkouts))
+
+        def checkout(user, book):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                barrier.wait()
+                res = client.post(
+                    BORROWINGS_URL,
+                    {"expected_return_date": EXPECTED_RETURN_DATE, "book": book.id},
+                )
+                statuses.append(res.status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=checkout, args=pair) for pair in checkouts
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return statuses
+
+    def test_concurrent_checkouts_never_oversell(self):
+        book = sample_book(inventory=5)
+
+        statuses = self.checkout_concurrently(
+            [(user, book) for user in self.users]
+        )
+
+        book.refresh_from_db()
+        self.assertEqual(statuses.count(status.HTTP_201_CREATED), 5)
+        self.assertEqual(
+            statuses.count(status.HTTP_400_BAD_REQUEST), len(self.users) - 5
+        )
+        self.assertEqual(book.inventory, 0)
+        self.assertEqual(Borrowing.objects.filter(book=book).count(), 5)
+
+    @override_settings(MAX_ACTIVE_LOANS=3)
+    def test_concurrent_checkouts_never_exceed_quota(self):
+        user = self.users[0]
+        books = [sample_book(inventory=1) for _ in self.users]
+
+        statuses = self.checkout_concurrently([(user, book) for book in books])
+
+        user.refresh_from_db()
+        self.assertEqual(statuses.count(status.HTTP_201_CREATED), 3)
+        self.assertEqual(user.active_loans, 3)
+        self.assertEqual(Borrowing.objects.count(), 3)
+        self.assertEqual(Book.objects.filter(inventory=0).count(), 3)
+
+    def test_concurrent_returns_increase_inventory_once(self):
+        book = sample_book(inventory=1)
+        borrowing = sample_borrowing(user=self.users[0], book=book)
+        Book.objects.filter(id=book.id).update(inventory=0)
+        url = borrowing_return_url(borrowing.id)
+        statuses = []
+
+        def return_borrowing():
+            client = APIClient()
+            client.force_authenticate(self.users[0])
+            try:
+                statuses.append(client.post(url).status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=return_borrowing) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        book.refresh_from_db()
+        self.assertEqual(statuses.count(status.HTTP_200_OK), 1)
+        self.assertEqual(book.inventory, 1)
+
+
+class AsyncBorrowingReadTests(TestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.list_view, self.detail_view = [
+            route.callback
+            for route in async_routes(BorrowingAsyncReadView, "borrowings")
+        ]
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.other = get_user_model().objects.create_user(
+            "other@test.com", "testpass"
+        )
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "testpass"
+        )
+        self.own = sample_borrowing(user=self.user)
+        self.foreign = sample_borrowing(user=self.other)
+
+    def get(self, view, url, user=None, **kwargs):
+        headers = (
+            {"Authorize": f"Bearer {AccessToken.for_user(user)}"}
+            if user else {}
+        )
+        return view(self.factory.get(url, headers=headers), **kwargs)
+
+    async def test_anonymous_is_challenged(self):
+        res = await self.get(self.list_view, BORROWINGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("Bearer", res["WWW-Authenticate"])
+
+    async def test_list_is_scoped_to_owner_and_matches_sync(self):
+        res = await self.get(self.list_view, BORROWINGS_URL, self.user)
+        expected = await sync_to_async(APIClient().get)(
+            BORROWINGS_URL,
+            HTTP_AUTHORIZE=f"Bearer {AccessToken.for_user(self.user)}",
+        )
+
+        self.assertEqual(json.loads(res.content), expected.json())
+        self.assertEqual(
+            [row["id"] for row in json.loads(res.content)["results"]],
+            [self.own.id],
+        )
+
+    async def test_retrieve_hides_other_users_borrowings(self):
+        res = await self.get(
+            self.detail_view, borrowing_detail_url(self.foreign.id),
+            self.user, pk=self.foreign.id,
+        )
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        res = await self.get(
+            self.detail_view, borrowing_detail_url(self.foreign.id),
+            self.admin, pk=self.foreign.id,
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(res.content)["user"], "other@test.com")
+
+    async def test_admin_filters_apply(self):
+        res = await self.list_view(self.factory.get(
+            BORROWINGS_URL,
+            {"user_id": self.other.id, "is_active": "True"},
+            headers={
+                "Authorize": f"Bearer {AccessToken.for_user(self.admin)}"
+            },
+        ))
+
+        self.assertEqual(
+            [row["id"] for row in json.loads(res.content)["results"]],
+            [self.foreign.id],
+        )
@@ -1,6 +1,8 @@
+from django.conf import settings
 from rest_framework import routers
 
-from borrowings.views import BorrowingViewSet
+from books.async_views import async_routes
+from borrowings.views import BorrowingViewSet, BorrowingAsyncReadView
 
 
 router = routers.DefaultRouter()
@@ -9,4 +11,9 @@ router.register("", BorrowingViewSet, basename="borrowings")
 
 urlpatterns = router.urls
 
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = (
+        async_routes(BorrowingAsyncReadView, "borrowings") + urlpatterns
+    )
+
 app_name = "borrowings"
@@ -1,30 +1,70 @@
-from django.db import transaction
+import datetime
+
+from django.db.models import Q
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from books.models import Book
+from books.async_views import AsyncReadView
+from books.cache import BOOKS, BORROWINGS, USERS, ConditionalGetMixin
+from books.exports import ExportMixin
+from books.paginations import KeysetPaginationMixin
+from books.replicas import ReplicaReadMixin
 from borrowings.models import Borrowing
-from borrowings.paginations import BorrowingPagination
+from borrowings.paginations import (
+    BorrowingKeysetPagination,
+    BorrowingPagination,
+)
 from borrowings.permissions import IsAdminOrIsOwnerGetPost
 from borrowings.serializers import (
     BorrowingSerializer,
-    BorrowingListSerializer,
+    BorrowingListReadSerializer,
     BorrowingCreateSerializer,
     BorrowingReturnSerializer,
+    BorrowingBulkCreateSerializer,
+    BorrowingBulkReturnSerializer,
 )
-
-
-class BorrowingViewSet(viewsets.ModelViewSet):
+from metrics.timing import TimedViewMixin
+from throttling.throttles import CheckoutIPRateThrottle, CheckoutRateThrottle
+
+
+class BorrowingViewSet(
+    TimedViewMixin,
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    KeysetPaginationMixin,
+    ExportMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Borrowing.objects.all().select_related("book", "user")
+    # Rows embed the book and the user's email.
+    cache_versions = (BORROWINGS, BOOKS, USERS)
+    vary_on_user = True
+    dated_params = ("overdue",)
     serializer_class = BorrowingSerializer
     permission_classes = (IsAdminOrIsOwnerGetPost,)
     pagination_class = BorrowingPagination
+    keyset_pagination_class = BorrowingKeysetPagination
+    export_columns = (
+        "id",
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+        "book.id",
+        "book.title",
+        "book.author",
+        "book.cover",
+        "book.inventory",
+        "book.daily_fee",
+        "user",
+        "is_active",
+    )
 
     def get_queryset(self):
         queryset = self.queryset
         user_id = self.request.query_params.get("user_id")
         is_active = self.request.query_params.get("is_active")
+        overdue = self.request.query_params.get("overdue")
 
         if is_active:
             if is_active == "True":
@@ -32,18 +72,32 @@ class BorrowingViewSet(viewsets.ModelViewSet):
             elif is_active == "False":
                 queryset = queryset.exclude(actual_return_date__isnull=True)
 
+        # From the due date, not the flag the overdue scan stores, so a
+        # late or missed scan never hides overdue loans.
+        late = Q(
+            actual_return_date__isnull=True,
+            expected_return_date__lt=datetime.date.today(),
+        )
+        if overdue == "True":
+            queryset = queryset.filter(late)
+        elif overdue == "False":
+            queryset = queryset.exclude(late)
+
         if user_id:
             queryset = queryset.filter(user_id=user_id)
 
-        queryset = queryset.distinct()
-
         if not self.request.user.is_staff:
-            return queryset.filter(user=self.request.user.id)
+            queryset = queryset.filter(user=self.request.user.id)
+
+        if self.action == "retrieve":
+            # Lists are projected by the paginator, after counting.
+            queryset = BorrowingListReadSerializer.select(queryset)
+
         return queryset
 
     def get_serializer_class(self):
-        if self.action in ["list", "retrieve"]:
-            return BorrowingListSerializer
+        if self.action in ["list", "retrieve", "export"]:
+            return BorrowingListReadSerializer
 
         if self.action == "create":
             return BorrowingCreateSerializer
@@ -51,12 +105,23 @@ class BorrowingViewSet(viewsets.ModelViewSet):
         if self.action == "return_view":
             return BorrowingReturnSerializer
 
+        if self.action == "bulk_create_view":
+            return BorrowingBulkCreateSerializer
+
+        if self.action == "bulk_return_view":
+            return BorrowingBulkReturnSerializer
+
         return BorrowingSerializer
 
+    def get_throttles(self):
+        # Checkouts take the database write lock; reads are not limited.
+        if self.action in ("create", "bulk_create_view"):
+            return [CheckoutRateThrottle(), CheckoutIPRateThrottle()]
+        return super().get_throttles()
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-    @transaction.atomic()
     @action(
         methods=["POST"],
         detail=True,
@@ -66,8 +131,47 @@ class BorrowingViewSet(viewsets.ModelViewSet):
     def return_view(self, request, pk=None):
         borrowing = self.get_object()
         serializer = self.get_serializer(borrowing)
-        book = Book.objects.get(pk=borrowing.book.id)
 
-        serializer.perform_return(borrowing, book)
+        serializer.perform_return(borrowing, borrowing.book)
 
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk",
+        permission_classes=[IsAdminOrIsOwnerGetPost],
+    )
+    def bulk_create_view(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = serializer.perform_checkout(request.user)
+
+        return Response(
+            results, status=self.bulk_status(results, status.HTTP_201_CREATED)
+        )
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk-return",
+        permission_classes=[IsAdminOrIsOwnerGetPost],
+    )
+    def bulk_return_view(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = serializer.perform_return(self.get_queryset())
+
+        return Response(results, status=self.bulk_status(results))
+
+    @staticmethod
+    def bulk_status(results, success_status=status.HTTP_200_OK):
+        if any(result["errors"] for result in results):
+            return status.HTTP_207_MULTI_STATUS
+        return success_status
+
+
+class BorrowingAsyncReadView(AsyncReadView):
+    viewset = BorrowingViewSet
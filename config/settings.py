@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 import os
+import sys
+from decimal import Decimal
 from datetime import timedelta
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -22,13 +25,27 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 load_dotenv()
 
+# Settings profile: dev (the default), test (the default under
+# ``manage.py test``) or prod. Only dev runs in debug mode, which keeps
+# every query in memory, and with the debug toolbar.
+PROFILE = os.getenv("DJANGO_PROFILE") or (
+    "test" if sys.argv[1:2] == ["test"] else "dev"
+)
+if PROFILE not in ("dev", "test", "prod"):
+    raise ImproperlyConfigured(
+        f"DJANGO_PROFILE must be dev, test or prod, not {PROFILE!r}"
+    )
+
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv("SECRET_KEY")
 
+if PROFILE == "prod" and not SECRET_KEY:
+    raise ImproperlyConfigured("Set SECRET_KEY for the prod profile")
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = PROFILE == "dev"
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = list(filter(None, os.getenv("ALLOWED_HOSTS", "").split(",")))
 
 INTERNAL_IPS = ["127.0.0.1"]
 
@@ -44,15 +61,23 @@ INSTALLED_APPS = [
     "rest_framework",
     "rest_framework_simplejwt",
     "drf_spectacular",
-    "debug_toolbar",
     "books",
+    "search_index",
     "users",
     "borrowings",
+    "payments",
+    "notifications",
+    "reservations",
+    "analytics",
+    "benchmarks",
+    "metrics",
+    "throttling",
 ]
 
 MIDDLEWARE = [
+    "metrics.middleware.ServerTimingMiddleware",
+    "throttling.middleware.LoadSheddingMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -61,6 +86,18 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Serve book and borrowing reads from async views; config.asgi turns it on.
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "False") == "True"
+
+# The toolbar middleware is sync-only and would put every async request
+# back on a thread.
+if DEBUG and not ASYNC_READ_VIEWS:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+        "debug_toolbar.middleware.DebugToolbarMiddleware",
+    )
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -79,19 +116,174 @@ TEMPLATES = [
     },
 ]
 
+if PROFILE == "prod":
+    # Parse each template once per process.
+    TEMPLATES[0]["APP_DIRS"] = False
+    TEMPLATES[0]["OPTIONS"]["loaders"] = [(
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    )]
+
 WSGI_APPLICATION = "config.wsgi.application"
 
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+DATABASE_ENGINE = os.getenv("DATABASE_ENGINE", "sqlite")
+
+if DATABASE_ENGINE == "postgresql":
+    # Needs psycopg (3) installed.
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("POSTGRES_DB", "library"),
+            "USER": os.getenv("POSTGRES_USER", "library"),
+            "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
+            "HOST": os.getenv("POSTGRES_HOST", "localhost"),
+            "PORT": os.getenv("POSTGRES_PORT", "5432"),
+            # Exports stream through server-side cursors; turn them off
+            # behind a transaction-pooling PgBouncer.
+            "DISABLE_SERVER_SIDE_CURSORS": os.getenv(
+                "DISABLE_SERVER_SIDE_CURSORS", "False"
+            ) == "True",
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+            # A file-backed test database lets concurrent tests wait on
+            # SQLite's busy timeout instead of failing on shared-cache
+            # table locks.
+            "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+        }
     }
+
+if PROFILE == "prod":
+    # Reuse connections across requests, checking them before reuse.
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("CONN_MAX_AGE", 60))
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# Read replicas: PostgreSQL hosts, or e.g.
+# DATABASE_REPLICAS=replica1.sqlite3,replica2.sqlite3 with SQLite files
+# standing in for replicated servers. Tests that list a replica in
+# ``databases`` read it as a mirror of the test database.
+for index, name in enumerate(
+    filter(None, os.getenv("DATABASE_REPLICAS", "").split(",")), start=1
+):
+    DATABASES[f"replica{index}"] = {
+        **DATABASES["default"],
+        **(
+            {"HOST": name} if DATABASE_ENGINE == "postgresql"
+            else {"NAME": BASE_DIR / name}
+        ),
+        "TEST": {"MIRROR": "default"},
+    }
+
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != "default"]
+
+DATABASE_ROUTERS = ["books.replicas.ReplicaRouter"]
+
+# Seconds a client reads from the primary after its own write; keep it
+# above the replicas' lag.
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The catalogue cache is local memory by default; point it at a shared
+# backend (e.g. django.core.cache.backends.redis.RedisCache) in production.
+# Its version counters must be seen by every worker, so the prod profile
+# fails the books.E001 system check with a per-process backend.
+# FileBasedCache with a local directory is a stand-in shared across processes.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "catalogue": {
+        "BACKEND": os.getenv(
+            "CATALOGUE_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.getenv("CATALOGUE_CACHE_LOCATION", "catalogue"),
+    },
+    "auth": {
+        "BACKEND": os.getenv(
+            "AUTH_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.getenv("AUTH_CACHE_LOCATION", "auth"),
+    },
+    "throttle": {
+        "BACKEND": os.getenv(
+            "THROTTLE_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.getenv("THROTTLE_CACHE_LOCATION", "throttle"),
+    },
 }
 
+CATALOGUE_CACHE_ALIAS = "catalogue"
+
+CATALOGUE_CACHE_TIMEOUT = int(os.getenv("CATALOGUE_CACHE_TIMEOUT", 300))
+
+# Seconds clients may reuse a batched availability response.
+AVAILABILITY_MAX_AGE = int(os.getenv("AVAILABILITY_MAX_AGE", 5))
+
+AUTH_CACHE_ALIAS = "auth"
+
+# With a per-process cache, changes that bypass model signals reach other
+# workers only after this many seconds.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", 60))
+
+FINE_MULTIPLIER = Decimal(os.getenv("FINE_MULTIPLIER", "2"))
+
+# Borrowing quota: active loans a patron may hold, and overdue loans
+# they may have and still borrow.
+MAX_ACTIVE_LOANS = int(os.getenv("MAX_ACTIVE_LOANS", 10))
+MAX_OVERDUE_LOANS = int(os.getenv("MAX_OVERDUE_LOANS", 0))
+
+# How long a returned copy is held for the patron first in line.
+RESERVATION_HOLD_HOURS = int(os.getenv("RESERVATION_HOLD_HOURS", 48))
+
+NOTIFICATION_SENDER = os.getenv(
+    "NOTIFICATION_SENDER", "notifications.senders.ConsoleSender"
+)
+
+NOTIFICATION_FILE = os.getenv("NOTIFICATION_FILE", BASE_DIR / "notifications.log")
+
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", 5))
+
+NOTIFICATION_RETRY_DELAY = int(os.getenv("NOTIFICATION_RETRY_DELAY", 30))
+
+METRICS_ALLOWED_IPS = os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",")
+
+# Token buckets per scope, "<requests>/<sec|min|hour|day>": the bucket
+# holds that many requests and refills at that rate. With a per-process
+# cache every worker keeps its own buckets.
+THROTTLE_CACHE_ALIAS = "throttle"
+
+THROTTLE_RATES = {
+    # Logins and sign-ups per client IP; each one hashes a password.
+    "auth": os.getenv("THROTTLE_AUTH_RATE", "20/min"),
+    # Checkouts per patron and per client IP, which several patrons may
+    # share; each one takes the database write lock.
+    "checkout": os.getenv("THROTTLE_CHECKOUT_RATE", "30/min"),
+    "checkout_ip": os.getenv("THROTTLE_CHECKOUT_IP_RATE", "120/min"),
+}
+
+# Write requests one process handles at once; beyond it they are refused
+# with a 503 before reaching the database. 0 turns shedding off.
+MAX_INFLIGHT_WRITES = int(os.getenv("MAX_INFLIGHT_WRITES", 32))
+
+# Seconds a shed client is asked to wait before retrying.
+LOAD_SHED_RETRY_AFTER = int(os.getenv("LOAD_SHED_RETRY_AFTER", 1))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -111,6 +303,12 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+if PROFILE == "test":
+    # Tests create many users; hashing their passwords for real is slow.
+    PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+    # Buckets would carry over between tests; throttling tests set rates.
+    THROTTLE_RATES = {}
+
 AUTH_USER_MODEL = "users.User"
 
 # Internationalization
@@ -139,7 +337,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ),
 }
 
@@ -154,6 +352,11 @@ SPECTACULAR_SETTINGS = {
         "defaultModelsExpandDepth": 2,
         "defaultModelExpandDepth": 2,
     },
+    # Reservations and payments both have a "status" field.
+    "ENUM_NAME_OVERRIDES": {
+        "ReservationStatusEnum": "reservations.models.Reservation.StatusChoices",
+        "PaymentStatusEnum": "payments.models.Payment.StatusChoices",
+    },
 }
 
 SIMPLE_JWT = {
@@ -162,4 +365,5 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": False,
     "AUTH_HEADER_TYPES": ("Bearer",),
     "AUTH_HEADER_NAME": "HTTP_AUTHORIZE",
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.TokenObtainPairSerializer",
 }
@@ -0,0 +1,78 @@
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.db import connections
+
+from metrics.timing import RequestTimer
+
+
+class ServerTimingMiddleware:
+    """Time every request, add a ``Server-Timing`` header and record
+    the totals in the histograms served by the metrics endpoint.
+
+    Keep it first in MIDDLEWARE so the other middleware is timed too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timer = request.timer = RequestTimer()
+        with ExitStack() as stack:
+            self.wrap_connections(stack, timer)
+            response = self.get_response(request)
+
+        return self.finish(request, response, timer)
+
+    async def __acall__(self, request):
+        timer = request.timer = RequestTimer()
+        stack = ExitStack()
+        # The async ORM runs queries on the request's sync thread, so
+        # the wrappers go on that thread's connections.
+        await sync_to_async(self.wrap_connections)(stack, timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+
+        return self.finish(request, response, timer)
+
+    @staticmethod
+    def wrap_connections(stack, timer):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer))
+
+    @staticmethod
+    def finish(request, response, timer):
+        total = time.perf_counter() - timer.started
+        response["Server-Timing"] = timer.server_timing(total)
+        timer.record(request.method, response.status_code, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        initkwargs = getattr(view_func, "view_initkwargs", {})
+        view_class = (
+            getattr(view_func, "cls", None)
+            or getattr(view_func, "view_class", None)
+        )
+        # Async read views report the viewset they stand in for.
+        view_class = getattr(view_class, "viewset", None) or view_class
+        request.timer.view = (
+            view_class.__name__ if view_class else view_func.__name__
+        )
+        actions = getattr(view_func, "actions", None) or {}
+        request.timer.action = actions.get(request.method.lower()) or (
+            initkwargs.get("action") if request.method == "GET" else None
+        )
@@ -0,0 +1,132 @@
+import bisect
+import threading
+from collections import defaultdict
+
+DURATION_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label tuple."""
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.series = defaultdict(
+            lambda: {"counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+        )
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series[label_values]
+            if index < len(self.buckets):
+                series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+    def expose(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self.lock:
+            series = {
+                labels: {**values, "counts": list(values["counts"])}
+                for labels, values in self.series.items()
+            }
+
+        for label_values, values in sorted(series.items()):
+            labels = ",".join(
+                f'{name}="{escape(value)}"'
+                for name, value in zip(self.labels, label_values)
+            )
+            cumulative = 0
+            for bound, count in zip(self.buckets, values["counts"]):
+                cumulative += count
+                yield (
+                    f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            yield f'{self.name}_bucket{{{labels},le="+Inf"}} {values["count"]}'
+            yield f"{self.name}_sum{{{labels}}} {values['sum']}"
+            yield f"{self.name}_count{{{labels}}} {values['count']}"
+
+
+class Counter:
+    """Monotonic count with one series per label tuple."""
+
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.series = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.series[label_values] += amount
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+    def expose(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self.lock:
+            series = dict(self.series)
+
+        for label_values, count in sorted(series.items()):
+            labels = ",".join(
+                f'{name}="{escape(value)}"'
+                for name, value in zip(self.labels, label_values)
+            )
+            yield f"{self.name}{{{labels}}} {count}"
+
+
+def escape(value) -> str:
+    return (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    )
+
+
+REQUEST_DURATION = Histogram(
+    "library_request_duration_seconds",
+    "Total time spent handling a request.",
+    ("view", "action", "method", "status"),
+    DURATION_BUCKETS,
+)
+PHASE_DURATION = Histogram(
+    "library_request_phase_duration_seconds",
+    "Time spent in each phase of a request.",
+    ("view", "action", "phase"),
+    DURATION_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "library_request_queries",
+    "Number of SQL queries run by a request.",
+    ("view", "action"),
+    QUERY_BUCKETS,
+)
+THROTTLED_REQUESTS = Counter(
+    "library_throttled_requests_total",
+    "Requests refused by a rate limit or by load shedding.",
+    ("scope", "reason"),
+)
+METRICS = (
+    REQUEST_DURATION, PHASE_DURATION, REQUEST_QUERIES, THROTTLED_REQUESTS
+)
+
+
+def expose() -> str:
+    """Render every metric in the Prometheus text exposition format."""
+    return "\n".join(
+        line for metric in METRICS for line in metric.expose()
+    ) + "\n"
@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.cache import get_cache
+from books.models import Book
+from metrics.registry import METRICS, Histogram
+
+BOOK_URL = reverse("books:books-list")
+METRICS_URL = reverse("metrics:metrics")
+
+
+def phases(response) -> dict:
+    return {
+        entry.split(";")[0]: entry
+        for entry in response["Server-Timing"].split(", ")
+    }
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+        for metric in METRICS:
+            metric.clear()
+
+    def test_header_splits_request_into_phases(self):
+        Book.objects.create(
+            title="Test", cover="hard", inventory=1, daily_fee=1
+        )
+        res = self.client.get(BOOK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(phases(res)),
+            {"auth", "permissions", "throttle", "serialize", "render",
+             "db", "total"},
+        )
+        self.assertIn('desc="2 queries"', phases(res)["db"])
+
+    def test_non_drf_views_get_totals(self):
+        res = self.client.get(reverse("schema"))
+
+        self.assertIn("total", phases(res))
+        self.assertNotIn("auth", phases(res))
+
+    def test_metrics_are_labelled_by_view_and_action(self):
+        user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(user)
+        self.client.get(BOOK_URL)
+        self.client.get(reverse("users:user-detail"))
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["Content-Type"].startswith("text/plain"))
+        body = res.content.decode()
+        self.assertIn(
+            'library_request_duration_seconds_count{view="BookViewSet",'
+            'action="list",method="GET",status="200"} 1',
+            body,
+        )
+        self.assertIn(
+            'library_request_queries_count{view="UserUpdateView",'
+            'action="get"} 1',
+            body,
+        )
+        self.assertIn(
+            'library_request_phase_duration_seconds_count{view="BookViewSet",'
+            'action="list",phase="serialize"} 1',
+            body,
+        )
+
+    async def test_async_requests_count_queries(self):
+        await Book.objects.acreate(
+            title="Test", cover="hard", inventory=1, daily_fee=1
+        )
+        res = await self.async_client.get(BOOK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('desc="2 queries"', phases(res)["db"])
+
+    @override_settings(METRICS_ALLOWED_IPS=["10.0.0.1"])
+    def test_metrics_limited_to_allowed_ips(self):
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class HistogramTests(SimpleTestCase):
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram("test_seconds", "Test.", ("view",), (0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value, "BookViewSet")
+
+        lines = list(histogram.expose())
+
+        self.assertIn('test_seconds_bucket{view="BookViewSet",le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{view="BookViewSet",le="1.0"} 3', lines)
+        self.assertIn('test_seconds_bucket{view="BookViewSet",le="+Inf"} 4', lines)
+        self.assertIn('test_seconds_count{view="BookViewSet"} 4', lines)
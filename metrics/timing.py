@@ -0,0 +1,117 @@
+import time
+from contextlib import contextmanager
+
+from metrics.registry import PHASE_DURATION, REQUEST_DURATION, REQUEST_QUERIES
+
+
+class RequestTimer:
+    """Phase durations, query count and SQL time of one request.
+
+    Installed on every connection as an execute wrapper, so it sees all
+    queries of the request without the per-query bookkeeping of
+    ``CursorDebugWrapper``.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.queries = 0
+        self.db_time = 0.0
+        self.view = None
+        self.action = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def server_timing(self, total) -> str:
+        entries = [
+            f"{phase};dur={seconds * 1000:.2f}"
+            for phase, seconds in self.phases.items()
+        ]
+        entries.append(
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"'
+        )
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+    def record(self, method, status, total):
+        view, action = self.view or "unmatched", self.action or method.lower()
+        REQUEST_DURATION.observe(total, view, action, method, str(status))
+        REQUEST_QUERIES.observe(self.queries, view, action)
+        PHASE_DURATION.observe(self.db_time, view, action, "db")
+        for phase, seconds in self.phases.items():
+            PHASE_DURATION.observe(seconds, view, action, phase)
+
+
+@contextmanager
+def timed(request, phase):
+    timer = getattr(request, "timer", None)
+    if timer is None:
+        yield
+    else:
+        with timer.phase(phase):
+            yield
+
+
+class TimedViewMixin:
+    """Split the request time of a DRF view into phases.
+
+    ``auth``, ``permissions`` and ``throttle`` time the checks run by
+    ``initial``; ``serialize`` is the handler time not spent in SQL
+    (model instantiation and serialization); ``render`` is the time
+    spent rendering the response body.
+    """
+
+    def perform_authentication(self, request):
+        with timed(request, "auth"):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with timed(request, "permissions"):
+            super().check_permissions(request)
+
+    def check_throttles(self, request):
+        with timed(request, "throttle"):
+            super().check_throttles(request)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        timer = getattr(request, "timer", None)
+        if timer is not None:
+            self.handler_started = time.perf_counter(), timer.db_time
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        timer = getattr(request, "timer", None)
+        if timer is None or not hasattr(self, "handler_started"):
+            return response
+
+        started, db_time = self.handler_started
+        finished = time.perf_counter()
+        timer.add(
+            "serialize",
+            max(0.0, finished - started - (timer.db_time - db_time)),
+        )
+        if hasattr(response, "add_post_render_callback"):
+            response.add_post_render_callback(lambda rendered: timer.add(
+                "render", time.perf_counter() - finished
+            ))
+        return response
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from metrics.registry import expose
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, limited to METRICS_ALLOWED_IPS."""
+    if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        expose(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import NOTIFICATION_BATCH_SIZE, drain
+from notifications.senders import get_sender
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued borrowing notifications. Runs as a worker process "
+        "polling the outbox until interrupted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=NOTIFICATION_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the outbox is drained.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once nothing is due instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        sender = get_sender()
+        totals = {"sent": 0, "failed": 0}
+        try:
+            while True:
+                result = drain(sender, options["batch_size"])
+                totals["sent"] += result["sent"]
+                totals["failed"] += result["failed"]
+                if result["claimed"] < options["batch_size"]:
+                    if options["once"]:
+                        break
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {totals['sent']} notifications, {totals['failed']} failed"
+        ))
@@ -0,0 +1,49 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Notification(models.Model):
+    """Outbox row for a borrowing event, delivered by drain_notifications."""
+    class EventChoices(models.TextChoices):
+        CHECKOUT = "checkout"
+        RETURN = "return"
+        OVERDUE = "overdue"
+
+    class StatusChoices(models.TextChoices):
+        PENDING = "pending"
+        SENT = "sent"
+        FAILED = "failed"
+
+    event = models.CharField(max_length=8, choices=EventChoices.choices)
+    status = models.CharField(
+        max_length=7,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING,
+    )
+    borrowing = models.ForeignKey(
+        to="borrowings.Borrowing",
+        on_delete=models.CASCADE,
+        related_name="notifications",
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Next time a worker may pick the row up: pushed forward while a
+    # worker holds it and by the retry backoff after a failure.
+    available_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return (
+            f"{self.event} for borrowing {self.borrowing_id} ({self.status})"
+        )
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [
+            models.Index(
+                fields=["available_at", "id"],
+                condition=models.Q(status="pending"),
+                name="notification_pending_idx",
+            ),
+        ]
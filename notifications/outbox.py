@@ -0,0 +1,134 @@
+import datetime
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import DateTimeField, F, Value
+from django.utils import timezone
+
+from notifications.models import Notification
+from notifications.senders import get_sender
+
+NOTIFICATION_BATCH_SIZE = 100
+# How long a worker owns a claimed batch before others may retry it.
+LEASE = datetime.timedelta(minutes=5)
+
+
+def enqueue(event, borrowings) -> int:
+    """Queue ``event`` for every borrowing in the queryset.
+
+    A single INSERT ... SELECT, meant to run inside the transaction that
+    changes the borrowings: the rows commit or roll back with it and
+    nothing is sent while the request is in flight.
+    """
+    now = Value(timezone.now(), DateTimeField())
+    rows = borrowings.order_by().annotate(
+        notification_event=Value(event),
+        notification_status=Value(Notification.StatusChoices.PENDING.value),
+        notification_attempts=Value(0),
+        notification_available_at=now,
+        notification_created_at=now,
+        notification_error=Value(""),
+    ).values_list(
+        "id",
+        "notification_event",
+        "notification_status",
+        "notification_attempts",
+        "notification_available_at",
+        "notification_created_at",
+        "notification_error",
+    )
+    sql, params = rows.query.sql_with_params()
+    columns = ", ".join(
+        Notification._meta.get_field(name).column
+        for name in ("borrowing", "event", "status", "attempts",
+                     "available_at", "created_at", "last_error")
+    )
+
+    with connections[rows.db].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {Notification._meta.db_table} ({columns}) {sql}",
+            params,
+        )
+        return cursor.rowcount
+
+
+def retry_delay(attempts) -> datetime.timedelta:
+    """Exponential backoff: NOTIFICATION_RETRY_DELAY doubled per attempt."""
+    return datetime.timedelta(
+        seconds=settings.NOTIFICATION_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def message(notification) -> dict:
+    borrowing = notification.borrowing
+    return {
+        "id": notification.id,
+        "event": notification.event,
+        "borrowing": borrowing.id,
+        "book": borrowing.book.title,
+        "user": borrowing.user.email,
+        "expected_return_date": borrowing.expected_return_date.isoformat(),
+    }
+
+
+def claim(batch_size, now) -> list:
+    """Lease up to ``batch_size`` due notifications to this worker.
+
+    Workers skip rows locked by another claim (where the database can)
+    and rows whose lease has not run out, so several may drain at once.
+    """
+    with transaction.atomic():
+        ids = list(
+            Notification.objects.filter(
+                status=Notification.StatusChoices.PENDING,
+                available_at__lte=now,
+            )
+            .order_by("available_at", "id")
+            .select_for_update(skip_locked=True)
+            .values_list("id", flat=True)[:batch_size]
+        )
+        Notification.objects.filter(id__in=ids).update(
+            available_at=now + LEASE
+        )
+    return ids
+
+
+def drain(sender=None, batch_size=NOTIFICATION_BATCH_SIZE) -> dict:
+    """Send one batch from the outbox and record the outcome.
+
+    Sent rows are marked in one UPDATE; failed ones are rescheduled with
+    backoff, or marked failed after NOTIFICATION_MAX_ATTEMPTS.
+    """
+    sender = sender or get_sender()
+    now = timezone.now()
+    ids = claim(batch_size, now)
+    batch = Notification.objects.filter(id__in=ids).select_related(
+        "borrowing__book", "borrowing__user"
+    ).order_by("id")
+
+    sent, failed = [], []
+    for notification in batch:
+        try:
+            sender.send(message(notification))
+        except Exception as error:
+            notification.attempts += 1
+            notification.last_error = repr(error)
+            if notification.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+                notification.status = Notification.StatusChoices.FAILED
+            else:
+                notification.available_at = (
+                    timezone.now() + retry_delay(notification.attempts)
+                )
+            failed.append(notification)
+        else:
+            sent.append(notification.id)
+
+    Notification.objects.filter(id__in=sent).update(
+        status=Notification.StatusChoices.SENT,
+        sent_at=timezone.now(),
+        attempts=F("attempts") + 1,
+    )
+    Notification.objects.bulk_update(
+        failed, ["attempts", "last_error", "status", "available_at"]
+    )
+    return {"claimed": len(ids), "sent": len(sent), "failed": len(failed)}
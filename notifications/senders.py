@@ -0,0 +1,44 @@
+import json
+import sys
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Messages delivered by MemorySender, like django.core.mail.outbox.
+outbox = []
+
+
+def get_sender():
+    return import_string(settings.NOTIFICATION_SENDER)()
+
+
+class BaseSender:
+    """Delivers one message; raising marks it for a retry."""
+
+    def send(self, message: dict) -> None:
+        raise NotImplementedError
+
+
+class ConsoleSender(BaseSender):
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, message):
+        self.stream.write(json.dumps(message) + "\n")
+        self.stream.flush()
+
+
+class FileSender(BaseSender):
+    """Appends messages as JSON lines to NOTIFICATION_FILE."""
+
+    def __init__(self, path=None):
+        self.path = path or settings.NOTIFICATION_FILE
+
+    def send(self, message):
+        with open(self.path, "a", encoding="utf-8") as stream:
+            stream.write(json.dumps(message) + "\n")
+
+
+class MemorySender(BaseSender):
+    def send(self, message):
+        outbox.append(message)
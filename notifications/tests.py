@@ -0,0 +1,208 @@
+import datetime
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from books.models import Author, Book
+from borrowings.models import Borrowing
+from borrowings.overdue import detect_overdue
+from notifications import senders
+from notifications.models import Notification
+from notifications.outbox import drain, enqueue
+
+BORROWINGS_URL = reverse("borrowings:borrowings-list")
+EXPECTED_RETURN_DATE = datetime.date.today() + datetime.timedelta(days=3)
+
+
+def sample_book(**params):
+    author = Author.objects.create(first_name="first", last_name="last")
+    defaults = {
+        "title": "Title",
+        "cover": "hard",
+        "inventory": 100,
+        "daily_fee": 0.50,
+    }
+    defaults.update(params)
+
+    book = Book.objects.create(**defaults)
+    book.author.add(author)
+
+    return book
+
+
+class FlakySender(senders.BaseSender):
+    def __init__(self, failures):
+        self.failures = failures
+
+    def send(self, message):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("smtp down")
+        senders.outbox.append(message)
+
+
+class SlowSender(senders.BaseSender):
+    def send(self, message):
+        time.sleep(0.5)
+
+
+@override_settings(
+    NOTIFICATION_SENDER="notifications.senders.MemorySender",
+    NOTIFICATION_MAX_ATTEMPTS=3,
+    NOTIFICATION_RETRY_DELAY=60,
+)
+class NotificationOutboxTests(TestCase):
+    def setUp(self):
+        senders.outbox.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.book = sample_book()
+
+    def checkout(self):
+        return self.client.post(BORROWINGS_URL, {
+            "book": self.book.id,
+            "expected_return_date": EXPECTED_RETURN_DATE,
+        })
+
+    def test_checkout_and_return_queue_without_sending(self):
+        borrowing_id = self.checkout().data["id"]
+        self.client.post(reverse(
+            "borrowings:borrowings-return-view", args=[borrowing_id]
+        ))
+
+        self.assertEqual(
+            list(Notification.objects.order_by("id").values_list(
+                "event", "status", "borrowing"
+            )),
+            [("checkout", "pending", borrowing_id),
+             ("return", "pending", borrowing_id)],
+        )
+        self.assertEqual(senders.outbox, [])
+
+    @override_settings(NOTIFICATION_SENDER="notifications.tests.SlowSender")
+    def test_slow_sender_does_not_delay_requests(self):
+        started = time.perf_counter()
+        self.checkout()
+
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+    def test_failed_checkout_queues_nothing(self):
+        self.book.inventory = 0
+        self.book.save()
+
+        self.checkout()
+
+        self.assertFalse(Notification.objects.exists())
+
+    def test_bulk_checkout_and_overdue_scan_queue_one_per_borrowing(self):
+        self.client.post(
+            reverse("borrowings:borrowings-bulk-create-view"),
+            {"items": [{
+                "book": self.book.id,
+                "expected_return_date": EXPECTED_RETURN_DATE,
+            }] * 3},
+            format="json",
+        )
+        detect_overdue(EXPECTED_RETURN_DATE + datetime.timedelta(days=1))
+
+        self.assertEqual(
+            Notification.objects.filter(event="checkout").count(), 3
+        )
+        self.assertEqual(
+            Notification.objects.filter(event="overdue").count(), 3
+        )
+
+    def test_drain_sends_and_marks_batch(self):
+        borrowing_id = self.checkout().data["id"]
+
+        result = drain()
+
+        self.assertEqual(result, {"claimed": 1, "sent": 1, "failed": 0})
+        self.assertEqual(senders.outbox, [{
+            "id": Notification.objects.get().id,
+            "event": "checkout",
+            "borrowing": borrowing_id,
+            "book": "Title",
+            "user": "test@test.com",
+            "expected_return_date": EXPECTED_RETURN_DATE.isoformat(),
+        }])
+        notification = Notification.objects.get()
+        self.assertEqual(notification.status, "sent")
+        self.assertEqual(notification.attempts, 1)
+        self.assertEqual(drain()["claimed"], 0)
+
+    def test_failures_back_off_then_give_up(self):
+        self.checkout()
+        sender = FlakySender(failures=3)
+
+        self.assertEqual(drain(sender)["failed"], 1)
+        notification = Notification.objects.get()
+        self.assertEqual(notification.attempts, 1)
+        self.assertIn("smtp down", notification.last_error)
+        self.assertGreater(
+            notification.available_at,
+            timezone.now() + datetime.timedelta(seconds=50),
+        )
+        # Not due yet.
+        self.assertEqual(drain(sender)["claimed"], 0)
+
+        for attempts in (2, 3):
+            Notification.objects.update(available_at=timezone.now())
+            drain(sender)
+            notification.refresh_from_db()
+            self.assertEqual(notification.attempts, attempts)
+
+        self.assertEqual(notification.status, "failed")
+        self.assertEqual(drain(sender)["claimed"], 0)
+
+    def test_retry_succeeds_after_backoff(self):
+        self.checkout()
+        sender = FlakySender(failures=1)
+        drain(sender)
+        Notification.objects.update(available_at=timezone.now())
+
+        self.assertEqual(drain(sender)["sent"], 1)
+        self.assertEqual(Notification.objects.get().attempts, 2)
+
+    def test_drain_queries_do_not_grow_with_batch(self):
+        borrowings = Borrowing.objects.bulk_create(
+            Borrowing(
+                book=self.book,
+                user=self.user,
+                expected_return_date=EXPECTED_RETURN_DATE,
+            )
+            for _ in range(250)
+        )
+        enqueue("checkout", Borrowing.objects.filter(
+            id__in=[borrowing.id for borrowing in borrowings]
+        ))
+
+        with self.assertNumQueries(6):
+            self.assertEqual(drain(batch_size=100)["sent"], 100)
+        with self.assertNumQueries(6):
+            self.assertEqual(drain(batch_size=200)["sent"], 150)
+        self.assertEqual(len(senders.outbox), 250)
+        self.assertEqual(
+            len({message["id"] for message in senders.outbox}), 250
+        )
+
+    def test_drain_command_empties_outbox(self):
+        for _ in range(5):
+            self.checkout()
+        out = StringIO()
+        call_command("drain_notifications", "--once", "--batch-size", "2",
+                     stdout=out)
+
+        self.assertIn("Sent 5 notifications, 0 failed", out.getvalue())
+        self.assertFalse(
+            Notification.objects.filter(status="pending").exists()
+        )
@@ -0,0 +1,156 @@
+import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import (
+    Count,
+    DateField,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Func,
+    IntegerField,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Greatest, Least, Round
+
+from borrowings.models import Borrowing
+from payments.models import Payment
+
+MONEY = DecimalField(max_digits=8, decimal_places=2)
+
+
+class DaysBetween(Func):
+    """Whole days from the ``start`` date to the ``end`` date."""
+    output_field = IntegerField()
+    arity = 2
+    template = "(%(expressions)s)"
+    arg_joiner = " - "
+
+    def __init__(self, start, end, **extra):
+        # Rendered as ``end - start``.
+        super().__init__(end, start, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="CAST(julianday(%(expressions)s) AS INTEGER)",
+            arg_joiner=") - julianday(",
+            **extra_context,
+        )
+
+
+def as_date(on_date):
+    """``on_date`` as an expression: a date or a date column, e.g. F()."""
+    if hasattr(on_date, "resolve_expression"):
+        return on_date
+    return Value(on_date, DateField())
+
+
+def amount(days, multiplier=1):
+    return Round(
+        ExpressionWrapper(
+            days * F("book__daily_fee") * Value(Decimal(multiplier)),
+            output_field=MONEY,
+        ),
+        2,
+        output_field=MONEY,
+    )
+
+
+def fee_amount(on_date):
+    """Daily fee for the days borrowed up to the due date, at least one."""
+    end = Least(as_date(on_date), F("expected_return_date"))
+    return amount(Greatest(DaysBetween(F("borrow_date"), end), Value(1)))
+
+
+def fine_amount(on_date):
+    """Daily fee times FINE_MULTIPLIER for every day past the due date."""
+    days = DaysBetween(F("expected_return_date"), as_date(on_date))
+    return amount(days, settings.FINE_MULTIPLIER)
+
+
+def calculate(borrowing, daily_fee, on_date) -> tuple:
+    """Python twin of fee_amount and fine_amount for one borrowing."""
+    end = min(on_date, borrowing.expected_return_date)
+    fee = max((end - borrowing.borrow_date).days, 1) * daily_fee
+    late = max((on_date - borrowing.expected_return_date).days, 0)
+    fine = late * daily_fee * Decimal(settings.FINE_MULTIPLIER)
+    return fee.quantize(Decimal("0.01")), fine.quantize(Decimal("0.01"))
+
+
+def upsert_payments(borrowings, payment_type, money, on_date) -> int:
+    """Write one pending payment per borrowing with INSERT ... SELECT.
+
+    An existing pending payment of the type is updated in place, so
+    re-running a calculation never duplicates rows.
+    """
+    rows = borrowings.order_by().annotate(
+        payment_type=Value(payment_type),
+        payment_status=Value(Payment.StatusChoices.PENDING.value),
+        payment_money=money,
+        payment_date=Value(on_date, DateField()),
+    ).values_list(
+        "id", "payment_type", "payment_status", "payment_money", "payment_date"
+    )
+    sql, params = rows.query.sql_with_params()
+    columns = ", ".join(
+        Payment._meta.get_field(name).column
+        for name in ("borrowing", "type", "status", "money_to_pay",
+                     "calculated_on")
+    )
+
+    with connections[rows.db].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {Payment._meta.db_table} ({columns}) {sql} "
+            f"ON CONFLICT (borrowing_id, type) WHERE status = 'pending' "
+            f"DO UPDATE SET money_to_pay = excluded.money_to_pay, "
+            f"calculated_on = excluded.calculated_on",
+            params,
+        )
+        return cursor.rowcount
+
+
+def bill_returns(borrowings, returned_on) -> None:
+    """Bill returned ``borrowings``: the fee, plus a fine when late."""
+    upsert_payments(
+        borrowings,
+        Payment.TypeChoices.PAYMENT.value,
+        fee_amount(returned_on),
+        returned_on,
+    )
+    upsert_payments(
+        borrowings.filter(expected_return_date__lt=returned_on),
+        Payment.TypeChoices.FINE.value,
+        fine_amount(returned_on),
+        returned_on,
+    )
+
+
+def compute_outstanding_fines(today=None) -> dict:
+    """Refresh the pending fine of every active overdue borrowing.
+
+    One INSERT ... SELECT computes all fines in the database, then one
+    aggregate totals what is outstanding.
+    """
+    today = today or datetime.date.today()
+    with transaction.atomic():
+        updated = upsert_payments(
+            Borrowing.objects.filter(
+                actual_return_date__isnull=True,
+                expected_return_date__lt=today,
+            ),
+            Payment.TypeChoices.FINE.value,
+            fine_amount(today),
+            today,
+        )
+
+    totals = Payment.objects.filter(
+        type=Payment.TypeChoices.FINE,
+        status=Payment.StatusChoices.PENDING,
+        borrowing__actual_return_date__isnull=True,
+    ).aggregate(count=Count("id"), total=Sum("money_to_pay"))
+    return {"updated": updated, **totals}
@@ -0,0 +1,26 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from payments.billing import compute_outstanding_fines
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalculate the pending fine of every active overdue borrowing. "
+        "Meant to run from cron once a day."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=datetime.date.fromisoformat,
+            help="Calculate as of this date instead of today (YYYY-MM-DD).",
+        )
+
+    def handle(self, *args, **options):
+        result = compute_outstanding_fines(options["date"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {result['updated']} fines; {result['count']} "
+            f"outstanding, {result['total'] or 0} in total"
+        ))
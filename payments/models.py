@@ -0,0 +1,43 @@
+from django.db import models
+
+
+class Payment(models.Model):
+    class StatusChoices(models.TextChoices):
+        PENDING = "pending"
+        PAID = "paid"
+
+    class TypeChoices(models.TextChoices):
+        PAYMENT = "payment"
+        FINE = "fine"
+
+    status = models.CharField(
+        max_length=7,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING,
+    )
+    type = models.CharField(max_length=7, choices=TypeChoices.choices)
+    borrowing = models.ForeignKey(
+        to="borrowings.Borrowing",
+        on_delete=models.CASCADE,
+        related_name="payments",
+    )
+    money_to_pay = models.DecimalField(max_digits=8, decimal_places=2)
+    calculated_on = models.DateField()
+
+    def __str__(self):
+        return (
+            f"{self.type} for borrowing {self.borrowing_id}: "
+            f"{self.money_to_pay} ({self.status})"
+        )
+
+    class Meta:
+        ordering = ["-id"]
+        constraints = [
+            # One open payment and one open fine per borrowing; billing
+            # upserts against it.
+            models.UniqueConstraint(
+                fields=["borrowing", "type"],
+                condition=models.Q(status="pending"),
+                name="payment_pending_unique",
+            ),
+        ]
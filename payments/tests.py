@@ -0,0 +1,211 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Author, Book
+from borrowings.models import Borrowing
+from payments.billing import calculate, compute_outstanding_fines
+from payments.models import Payment
+
+PAYMENTS_URL = reverse("payments:payments-list")
+TODAY = datetime.date.today()
+
+
+def days_ago(days):
+    return TODAY - datetime.timedelta(days=days)
+
+
+def sample_borrowing(user, borrowed, due, daily_fee="0.75"):
+    author = Author.objects.create(first_name="first", last_name="last")
+    book = Book.objects.create(
+        title="Title", cover="hard", inventory=2, daily_fee=daily_fee
+    )
+    book.author.add(author)
+
+    borrowing = Borrowing.objects.create(
+        book=book, user=user, expected_return_date=TODAY
+    )
+    # Dates in the past fail model validation, so backdate afterwards.
+    Borrowing.objects.filter(id=borrowing.id).update(
+        borrow_date=borrowed, expected_return_date=due
+    )
+    borrowing.refresh_from_db()
+    return borrowing
+
+
+def return_url(borrowing):
+    return reverse("borrowings:borrowings-return-view", args=[borrowing.id])
+
+
+class BillingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_return_on_time_bills_the_fee_only(self):
+        borrowing = sample_borrowing(self.user, days_ago(4), TODAY)
+
+        self.client.post(return_url(borrowing))
+
+        payment = Payment.objects.get(borrowing=borrowing)
+        self.assertEqual(payment.type, Payment.TypeChoices.PAYMENT)
+        self.assertEqual(payment.status, Payment.StatusChoices.PENDING)
+        self.assertEqual(payment.money_to_pay, Decimal("3.00"))
+        self.assertEqual(payment.calculated_on, TODAY)
+
+    def test_same_day_return_bills_one_day(self):
+        borrowing = sample_borrowing(self.user, TODAY, TODAY)
+
+        self.client.post(return_url(borrowing))
+
+        self.assertEqual(
+            Payment.objects.get(borrowing=borrowing).money_to_pay,
+            Decimal("0.75"),
+        )
+
+    def test_late_return_bills_fee_and_fine(self):
+        borrowing = sample_borrowing(self.user, days_ago(10), days_ago(3))
+
+        self.client.post(return_url(borrowing))
+
+        amounts = dict(
+            Payment.objects.filter(borrowing=borrowing)
+            .values_list("type", "money_to_pay")
+        )
+        self.assertEqual(amounts, {
+            Payment.TypeChoices.PAYMENT: Decimal("5.25"),
+            Payment.TypeChoices.FINE: Decimal("4.50"),
+        })
+
+    def test_bulk_return_bills_every_borrowing(self):
+        late = sample_borrowing(self.user, days_ago(10), days_ago(3))
+        on_time = sample_borrowing(self.user, days_ago(2), TODAY)
+
+        self.client.post(
+            reverse("borrowings:borrowings-bulk-return-view"),
+            {"ids": [late.id, on_time.id]},
+            format="json",
+        )
+
+        self.assertEqual(
+            Payment.objects.filter(borrowing=late).count(), 2
+        )
+        self.assertEqual(
+            Payment.objects.filter(borrowing=on_time).count(), 1
+        )
+
+    def test_database_amounts_match_python_formula(self):
+        cases = [
+            (days_ago(30), days_ago(1), "4.99"),
+            (days_ago(9), days_ago(2), "0.10"),
+            (days_ago(3), TODAY, "1.37"),
+        ]
+        for borrowed, due, fee in cases:
+            borrowing = sample_borrowing(self.user, borrowed, due, fee)
+            self.client.post(return_url(borrowing))
+
+            expected = calculate(borrowing, Decimal(fee), TODAY)
+            amounts = dict(
+                Payment.objects.filter(borrowing=borrowing)
+                .values_list("type", "money_to_pay")
+            )
+            self.assertEqual(
+                (amounts[Payment.TypeChoices.PAYMENT],
+                 amounts.get(Payment.TypeChoices.FINE, Decimal("0.00"))),
+                expected,
+            )
+
+    def test_outstanding_fines_are_upserted_in_one_pass(self):
+        first = sample_borrowing(self.user, days_ago(10), days_ago(3))
+        second = sample_borrowing(self.user, days_ago(10), days_ago(1))
+        sample_borrowing(self.user, days_ago(1), TODAY)
+        returned = sample_borrowing(self.user, days_ago(10), days_ago(3))
+        self.client.post(return_url(returned))
+
+        with self.assertNumQueries(4):
+            result = compute_outstanding_fines(days_ago(1))
+        self.assertEqual(result["updated"], 1)
+
+        result = compute_outstanding_fines()
+        self.assertEqual(result, {
+            "updated": 2, "count": 2, "total": Decimal("6.00"),
+        })
+        self.assertEqual(
+            Payment.objects.filter(type=Payment.TypeChoices.FINE).count(), 3
+        )
+        self.assertEqual(
+            Payment.objects.get(borrowing=first).money_to_pay, Decimal("4.50")
+        )
+        self.assertEqual(
+            Payment.objects.get(borrowing=second).calculated_on, TODAY
+        )
+
+    def test_paid_fine_is_not_overwritten(self):
+        borrowing = sample_borrowing(self.user, days_ago(10), days_ago(3))
+        compute_outstanding_fines(days_ago(1))
+        Payment.objects.update(status=Payment.StatusChoices.PAID)
+
+        compute_outstanding_fines()
+
+        self.assertEqual(
+            sorted(
+                Payment.objects.filter(borrowing=borrowing)
+                .values_list("status", "money_to_pay")
+            ),
+            [(Payment.StatusChoices.PAID, Decimal("3.00")),
+             (Payment.StatusChoices.PENDING, Decimal("4.50"))],
+        )
+
+
+class PaymentApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.other = get_user_model().objects.create_user(
+            "other@test.com", "testpass"
+        )
+        own = sample_borrowing(self.user, days_ago(10), days_ago(3))
+        sample_borrowing(self.other, days_ago(10), days_ago(3))
+        compute_outstanding_fines()
+        self.client.force_authenticate(self.user)
+        self.client.post(return_url(own))
+
+    def test_auth_required(self):
+        self.client.force_authenticate(None)
+        res = self.client.get(PAYMENTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_sees_own_payments_only(self):
+        res = self.client.get(PAYMENTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 2)
+        self.assertEqual(
+            {row["type"] for row in res.data["results"]},
+            {"payment", "fine"},
+        )
+
+    def test_filter_by_type(self):
+        res = self.client.get(PAYMENTS_URL, {"type": "fine"})
+
+        self.assertEqual(res.data["count"], 1)
+        self.assertEqual(res.data["results"][0]["money_to_pay"], "4.50")
+
+    def test_admin_sees_all_payments(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser("admin@test.com", "pass")
+        )
+        res = self.client.get(PAYMENTS_URL, {"status": "pending"})
+
+        self.assertEqual(res.data["count"], 3)
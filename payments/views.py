@@ -0,0 +1,29 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+
+from metrics.timing import TimedViewMixin
+from payments.models import Payment
+from payments.paginations import PaymentPagination
+from payments.serializers import PaymentSerializer
+
+
+class PaymentViewSet(TimedViewMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Payment.objects.all()
+    serializer_class = PaymentSerializer
+    pagination_class = PaymentPagination
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        queryset = self.queryset
+        payment_status = self.request.query_params.get("status")
+        payment_type = self.request.query_params.get("type")
+
+        if payment_status:
+            queryset = queryset.filter(status=payment_status)
+
+        if payment_type:
+            queryset = queryset.filter(type=payment_type)
+
+        if not self.request.user.is_staff:
+            return queryset.filter(borrowing__user=self.request.user.id)
+        return queryset
@@ -0,0 +1,5 @@
+from django.contrib import admin
+
+from reservations.models import Reservation
+
+admin.site.register(Reservation)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from reservations.waitlist import expire_holds
+
+
+class Command(BaseCommand):
+    help = (
+        "Expire reservation holds that were not picked up in time and "
+        "pass the copies to the next patrons in line. Meant to run from "
+        "cron, e.g. every few minutes."
+    )
+
+    def handle(self, *args, **options):
+        expired = expire_holds()
+        self.stdout.write(
+            self.style.SUCCESS(f"Expired {expired} reservation holds")
+        )
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Reservation(models.Model):
+    """A patron's place in the waitlist of a book.
+
+    Waiting reservations are served first come, first served, in id
+    order. A returned copy is set aside for the head of the queue as a
+    hold until ``held_until``; checking the book out fulfils it.
+    """
+    class StatusChoices(models.TextChoices):
+        WAITING = "waiting"
+        HELD = "held"
+        FULFILLED = "fulfilled"
+        CANCELLED = "cancelled"
+        EXPIRED = "expired"
+
+    book = models.ForeignKey(
+        to="books.Book",
+        on_delete=models.CASCADE,
+        related_name="reservations",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="reservations",
+    )
+    status = models.CharField(
+        max_length=9,
+        choices=StatusChoices.choices,
+        default=StatusChoices.WAITING,
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    held_until = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return (
+            f"Reservation of book {self.book_id} by user {self.user_id} "
+            f"({self.status})"
+        )
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [
+            # Next in line and queue positions.
+            models.Index(
+                fields=["book", "id"],
+                condition=models.Q(status="waiting"),
+                name="reservation_waiting_idx",
+            ),
+            # Expired holds.
+            models.Index(
+                fields=["held_until"],
+                condition=models.Q(status="held"),
+                name="reservation_held_idx",
+            ),
+        ]
+        constraints = [
+            # One open reservation per patron and book.
+            models.UniqueConstraint(
+                fields=["user", "book"],
+                condition=models.Q(status__in=["waiting", "held"]),
+                name="reservation_open_unique",
+            ),
+        ]
@@ -0,0 +1,36 @@
+from django.db import IntegrityError
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from reservations.models import Reservation
+from reservations.waitlist import reserve
+
+
+class ReservationSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Reservation
+        fields = ("id", "book", "status", "created_at", "held_until")
+        read_only_fields = ("status", "created_at", "held_until")
+
+    def create(self, validated_data):
+        try:
+            return reserve(validated_data["user"], validated_data["book"])
+        except IntegrityError:
+            raise ValidationError(
+                {"book": "You are already waiting for this book"}
+            )
+
+
+class ReservationPositionSerializer(serializers.ModelSerializer):
+    position = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Reservation
+        fields = ("id", "book", "status", "position", "held_until")
+
+    def get_position(self, reservation) -> int | None:
+        """1 for the head of the queue; None once out of it."""
+        if reservation.status != Reservation.StatusChoices.WAITING:
+            return None
+        return reservation.ahead + 1
@@ -0,0 +1,340 @@
+import datetime
+import threading
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from benchmarks.utils import explain
+from books.models import Author, Book
+from borrowings.models import Borrowing
+from reservations.models import Reservation
+from reservations.waitlist import expire_holds
+
+RESERVATIONS_URL = reverse("reservations:reservations-list")
+BORROWINGS_URL = reverse("borrowings:borrowings-list")
+BULK_URL = reverse("borrowings:borrowings-bulk-create-view")
+BULK_RETURN_URL = reverse("borrowings:borrowings-bulk-return-view")
+EXPECTED_RETURN_DATE = datetime.date.today() + datetime.timedelta(days=3)
+
+
+def position_url(reservation_id):
+    return reverse("reservations:reservations-position", args=[reservation_id])
+
+
+def cancel_url(reservation_id):
+    return reverse("reservations:reservations-cancel", args=[reservation_id])
+
+
+def return_url(borrowing_id):
+    return reverse("borrowings:borrowings-return-view", args=[borrowing_id])
+
+
+def create_users(count, prefix="user"):
+    return [
+        get_user_model().objects.create_user(f"{prefix}{i}@test.com", "testpass")
+        for i in range(count)
+    ]
+
+
+def lent_out_book(borrowers):
+    """A book whose every copy is out with one of ``borrowers``."""
+    author = Author.objects.create(first_name="first", last_name="last")
+    book = Book.objects.create(
+        title="Title", cover="hard", inventory=len(borrowers), daily_fee=0.5
+    )
+    book.author.add(author)
+    borrowings = [
+        Borrowing.objects.create(
+            book=book, user=user, expected_return_date=EXPECTED_RETURN_DATE
+        )
+        for user in borrowers
+    ]
+    Book.take_copies({book.id: len(borrowers)})
+    return book, borrowings
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+class ReservationApiTests(TestCase):
+    def setUp(self):
+        self.borrower, *self.patrons = create_users(4)
+        self.book, (self.borrowing,) = lent_out_book([self.borrower])
+
+    def reserve(self, user, book=None):
+        res = client_for(user).post(
+            RESERVATIONS_URL, {"book": (book or self.book).id}
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return Reservation.objects.get(id=res.data["id"])
+
+    def position(self, reservation):
+        return client_for(reservation.user).get(position_url(reservation.id))
+
+    def test_out_of_stock_book_queues_in_order(self):
+        reservations = [self.reserve(patron) for patron in self.patrons]
+
+        for expected, reservation in enumerate(reservations, start=1):
+            res = self.position(reservation)
+            self.assertEqual(res.data["status"], "waiting")
+            self.assertEqual(res.data["position"], expected)
+
+    def test_book_on_the_shelf_is_held_right_away(self):
+        client_for(self.borrower).post(return_url(self.borrowing.id))
+
+        reservation = self.reserve(self.patrons[0])
+
+        self.book.refresh_from_db()
+        self.assertEqual(reservation.status, Reservation.StatusChoices.HELD)
+        self.assertEqual(self.book.inventory, 0)
+
+    def test_one_open_reservation_per_patron_and_book(self):
+        self.reserve(self.patrons[0])
+
+        res = client_for(self.patrons[0]).post(
+            RESERVATIONS_URL, {"book": self.book.id}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_patrons_see_only_their_own_reservations(self):
+        mine = self.reserve(self.patrons[0])
+        theirs = self.reserve(self.patrons[1])
+        client = client_for(self.patrons[0])
+
+        res = client.get(RESERVATIONS_URL)
+
+        self.assertEqual([row["id"] for row in res.data["results"]], [mine.id])
+        self.assertEqual(
+            client.get(position_url(theirs.id)).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    def test_position_is_one_indexed_query(self):
+        for patron in self.patrons:
+            last = self.reserve(patron)
+
+        client = client_for(last.user)
+        with CaptureQueriesContext(connection) as queries:
+            res = client.get(position_url(last.id))
+
+        self.assertEqual(res.data["position"], 3)
+        self.assertEqual(len(queries), 1)
+        self.assertIn(
+            "reservation_waiting_idx", explain(queries[0]["sql"])
+        )
+
+    def test_return_holds_copy_for_head_of_queue(self):
+        first, second, _ = [self.reserve(patron) for patron in self.patrons]
+
+        client_for(self.borrower).post(return_url(self.borrowing.id))
+
+        first.refresh_from_db()
+        self.book.refresh_from_db()
+        self.assertEqual(first.status, Reservation.StatusChoices.HELD)
+        self.assertAlmostEqual(
+            first.held_until,
+            timezone.now() + datetime.timedelta(hours=48),
+            delta=datetime.timedelta(minutes=1),
+        )
+        self.assertEqual(self.book.inventory, 0)
+        self.assertEqual(self.position(second).data["position"], 1)
+
+    def test_only_the_holder_can_check_out_the_held_copy(self):
+        first = self.reserve(self.patrons[0])
+        client_for(self.borrower).post(return_url(self.borrowing.id))
+        payload = {
+            "book": self.book.id, "expected_return_date": EXPECTED_RETURN_DATE
+        }
+
+        res = client_for(self.patrons[1]).post(BORROWINGS_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = client_for(self.patrons[0]).post(BORROWINGS_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        first.refresh_from_db()
+        self.book.refresh_from_db()
+        self.assertEqual(first.status, Reservation.StatusChoices.FULFILLED)
+        self.assertEqual(self.book.inventory, 0)
+
+    def test_bulk_checkout_collects_the_held_copy(self):
+        first = self.reserve(self.patrons[0])
+        client_for(self.borrower).post(return_url(self.borrowing.id))
+        shelf_book, _ = lent_out_book([])
+        Book.return_copies({shelf_book.id: 1})
+
+        res = client_for(self.patrons[0]).post(BULK_URL, {"items": [
+            {"book": book.id, "expected_return_date": EXPECTED_RETURN_DATE}
+            for book in (self.book, shelf_book)
+        ]}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        first.refresh_from_db()
+        self.book.refresh_from_db()
+        shelf_book.refresh_from_db()
+        self.assertEqual(first.status, Reservation.StatusChoices.FULFILLED)
+        self.assertEqual(self.book.inventory, 0)
+        self.assertEqual(shelf_book.inventory, 0)
+
+    def test_bulk_return_serves_queue_then_shelf(self):
+        users = create_users(3, prefix="borrower")
+        book, borrowings = lent_out_book(users)
+        first, second = [self.reserve(patron, book) for patron in self.patrons[:2]]
+
+        for user, borrowing in zip(users, borrowings):
+            client_for(user).post(
+                BULK_RETURN_URL, {"ids": [borrowing.id]}, format="json"
+            )
+
+        book.refresh_from_db()
+        self.assertEqual(
+            Reservation.objects.filter(
+                status=Reservation.StatusChoices.HELD
+            ).count(),
+            2,
+        )
+        self.assertEqual(book.inventory, 1)
+
+    def test_cancelling_a_hold_passes_it_on(self):
+        first, second, _ = [self.reserve(patron) for patron in self.patrons]
+        client_for(self.borrower).post(return_url(self.borrowing.id))
+        client = client_for(first.user)
+
+        res = client.post(cancel_url(first.id))
+        self.assertEqual(res.data["status"], "cancelled")
+        second.refresh_from_db()
+        self.assertEqual(second.status, Reservation.StatusChoices.HELD)
+
+        res = client.post(cancel_url(first.id))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_expired_holds_pass_to_next_or_back_to_shelf(self):
+        first, second = [self.reserve(patron) for patron in self.patrons[:2]]
+        client_for(self.borrower).post(return_url(self.borrowing.id))
+        later = timezone.now() + datetime.timedelta(hours=49)
+
+        self.assertEqual(expire_holds(later), 1)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, Reservation.StatusChoices.EXPIRED)
+        self.assertEqual(second.status, Reservation.StatusChoices.HELD)
+
+        self.assertEqual(expire_holds(later + datetime.timedelta(hours=49)), 1)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 1)
+
+    @override_settings(RESERVATION_HOLD_HOURS=0)
+    def test_expire_command(self):
+        self.reserve(self.patrons[0])
+        client_for(self.borrower).post(return_url(self.borrowing.id))
+        out = StringIO()
+
+        call_command("expire_reservation_holds", stdout=out)
+
+        self.assertIn("Expired 1 reservation holds", out.getvalue())
+
+
+class ReservationConcurrencyTests(TransactionTestCase):
+    def run_concurrently(self, *calls):
+        barrier = threading.Barrier(len(calls))
+        results = [None] * len(calls)
+
+        def run(index, call):
+            try:
+                barrier.wait()
+                results[index] = call()
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=run, args=(index, call))
+            for index, call in enumerate(calls)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def returner(self, user, borrowing):
+        return lambda: client_for(user).post(
+            return_url(borrowing.id)
+        ).status_code
+
+    def reserver(self, user, book):
+        return lambda: client_for(user).post(
+            RESERVATIONS_URL, {"book": book.id}
+        ).status_code
+
+    def test_simultaneous_returns_hold_each_head_once(self):
+        borrowers = create_users(5, prefix="borrower")
+        book, borrowings = lent_out_book(borrowers)
+        for patron in create_users(3):
+            Reservation.objects.create(book=book, user=patron)
+
+        statuses = self.run_concurrently(*(
+            self.returner(user, borrowing)
+            for user, borrowing in zip(borrowers, borrowings)
+        ))
+
+        book.refresh_from_db()
+        self.assertEqual(statuses, [status.HTTP_200_OK] * 5)
+        self.assertEqual(
+            Reservation.objects.filter(
+                status=Reservation.StatusChoices.HELD
+            ).count(),
+            3,
+        )
+        self.assertEqual(book.inventory, 2)
+
+    def test_simultaneous_reservations_queue_in_distinct_places(self):
+        patrons = create_users(8)
+        book, _ = lent_out_book(create_users(1, prefix="borrower"))
+
+        statuses = self.run_concurrently(
+            *(self.reserver(patron, book) for patron in patrons),
+            self.reserver(patrons[0], book),
+        )
+
+        self.assertEqual(statuses.count(status.HTTP_201_CREATED), 8)
+        self.assertEqual(statuses.count(status.HTTP_400_BAD_REQUEST), 1)
+        positions = [
+            client_for(reservation.user)
+            .get(position_url(reservation.id)).data["position"]
+            for reservation in Reservation.objects.all()
+        ]
+        self.assertEqual(sorted(positions), list(range(1, 9)))
+
+    def test_returns_racing_reservations_never_strand_a_copy(self):
+        borrowers = create_users(4, prefix="borrower")
+        book, borrowings = lent_out_book(borrowers)
+        patrons = create_users(6)
+
+        self.run_concurrently(
+            *(self.returner(user, borrowing)
+              for user, borrowing in zip(borrowers, borrowings)),
+            *(self.reserver(patron, book) for patron in patrons),
+        )
+
+        book.refresh_from_db()
+        held = Reservation.objects.filter(
+            status=Reservation.StatusChoices.HELD
+        ).count()
+        waiting = Reservation.objects.filter(
+            status=Reservation.StatusChoices.WAITING
+        ).count()
+        self.assertEqual(held + book.inventory, 4)
+        self.assertEqual(held + waiting, 6)
+        self.assertTrue(book.inventory == 0 or waiting == 0)
@@ -0,0 +1,12 @@
+from rest_framework import routers
+
+from reservations.views import ReservationViewSet
+
+
+router = routers.DefaultRouter()
+router.register("", ReservationViewSet, basename="reservations")
+
+
+urlpatterns = router.urls
+
+app_name = "reservations"
@@ -0,0 +1,79 @@
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from rest_framework import mixins, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from metrics.timing import TimedViewMixin
+from reservations.models import Reservation
+from reservations.paginations import ReservationPagination
+from reservations.serializers import (
+    ReservationPositionSerializer,
+    ReservationSerializer,
+)
+from reservations import waitlist
+
+
+class ReservationViewSet(
+    TimedViewMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = Reservation.objects.all()
+    serializer_class = ReservationSerializer
+    pagination_class = ReservationPagination
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        queryset = self.queryset
+        reservation_status = self.request.query_params.get("status")
+
+        if reservation_status:
+            queryset = queryset.filter(status=reservation_status)
+
+        if self.action == "position":
+            # Counted in the same query, from the waiting index.
+            ahead = (
+                Reservation.objects.filter(
+                    book=OuterRef("book"),
+                    status=Reservation.StatusChoices.WAITING,
+                    id__lt=OuterRef("id"),
+                )
+                .order_by()
+                .values("book")
+                .annotate(count=Count("id"))
+                .values("count")
+            )
+            queryset = queryset.annotate(ahead=Coalesce(Subquery(ahead), 0))
+
+        if not self.request.user.is_staff:
+            return queryset.filter(user=self.request.user.id)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == "position":
+            return ReservationPositionSerializer
+
+        return ReservationSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @action(methods=["GET"], detail=True)
+    def position(self, request, pk=None):
+        return Response(self.get_serializer(self.get_object()).data)
+
+    @action(methods=["POST"], detail=True)
+    def cancel(self, request, pk=None):
+        reservation = self.get_object()
+        if not waitlist.cancel(reservation):
+            raise ValidationError(
+                {"status": "This reservation is no longer open"}
+            )
+
+        reservation.refresh_from_db()
+        return Response(self.get_serializer(reservation).data)
@@ -0,0 +1,134 @@
+import datetime
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from books.models import Book
+from reservations.models import Reservation
+
+
+def hold_expiry(now) -> datetime.datetime:
+    return now + datetime.timedelta(hours=settings.RESERVATION_HOLD_HOURS)
+
+
+def reserve(user, book, now=None) -> Reservation:
+    """Join the book's queue, or hold a copy right away if one is left.
+
+    Taking the copy and joining the queue happen in one transaction, so
+    nobody ends up waiting while a copy sits on the shelf.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        if Book.take_copy(book.id):
+            return Reservation.objects.create(
+                book=book,
+                user=user,
+                status=Reservation.StatusChoices.HELD,
+                created_at=now,
+                held_until=hold_expiry(now),
+            )
+        return Reservation.objects.create(book=book, user=user, created_at=now)
+
+
+def hold_next(counts: dict, now=None) -> Counter:
+    """Set ``counts[book_id]`` copies aside for the heads of the queues.
+
+    Heads are locked with SKIP LOCKED where the database can, so
+    concurrent returns of one book hold different reservations. Meant
+    to run inside the transaction that frees the copies. Returns how
+    many copies of each book went to holds.
+    """
+    now = now or timezone.now()
+    queued = set(
+        Reservation.objects.filter(
+            book_id__in=counts, status=Reservation.StatusChoices.WAITING
+        ).order_by().values_list("book_id", flat=True).distinct()
+    )
+    held = Counter()
+
+    for book_id in queued:
+        heads = list(
+            Reservation.objects.select_for_update(skip_locked=True)
+            .filter(book_id=book_id, status=Reservation.StatusChoices.WAITING)
+            .order_by("id")
+            .values_list("id", flat=True)[:counts[book_id]]
+        )
+        held[book_id] = Reservation.objects.filter(
+            id__in=heads, status=Reservation.StatusChoices.WAITING
+        ).update(
+            status=Reservation.StatusChoices.HELD,
+            held_until=hold_expiry(now),
+        )
+
+    return held
+
+
+def return_copies(counts: dict, now=None) -> Counter:
+    """Give returned copies to waiting patrons, shelve the rest."""
+    held = hold_next(counts, now)
+    shelved = Counter(counts) - held
+    if shelved:
+        Book.return_copies(shelved)
+    return held
+
+
+def claim_hold(user, book_id, now=None) -> bool:
+    """Fulfil ``user``'s unexpired hold on the book, if there is one.
+
+    The row count of the conditional UPDATE decides, so a hold is never
+    used twice nor after it expired.
+    """
+    return bool(Reservation.objects.filter(
+        user=user,
+        book_id=book_id,
+        status=Reservation.StatusChoices.HELD,
+        held_until__gte=now or timezone.now(),
+    ).update(status=Reservation.StatusChoices.FULFILLED))
+
+
+def held_books(user, now=None) -> set:
+    """Ids of the books holding a copy for ``user``, see claim_hold."""
+    return set(Reservation.objects.filter(
+        user=user,
+        status=Reservation.StatusChoices.HELD,
+        held_until__gte=now or timezone.now(),
+    ).values_list("book_id", flat=True))
+
+
+def cancel(reservation) -> bool:
+    """Leave the queue; a held copy passes to the next in line."""
+    with transaction.atomic():
+        released = Reservation.objects.filter(
+            id=reservation.id, status=Reservation.StatusChoices.HELD
+        ).update(status=Reservation.StatusChoices.CANCELLED)
+        if released:
+            return_copies({reservation.book_id: 1})
+            return True
+
+        return bool(Reservation.objects.filter(
+            id=reservation.id, status=Reservation.StatusChoices.WAITING
+        ).update(status=Reservation.StatusChoices.CANCELLED))
+
+
+def expire_holds(now=None) -> int:
+    """Expire holds nobody picked up and pass their copies on.
+
+    Returns how many holds expired.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        expired = list(
+            Reservation.objects.select_for_update(skip_locked=True)
+            .filter(status=Reservation.StatusChoices.HELD, held_until__lt=now)
+            .values_list("id", "book_id")
+        )
+        if not expired:
+            return 0
+
+        Reservation.objects.filter(
+            id__in=[reservation_id for reservation_id, _ in expired]
+        ).update(status=Reservation.StatusChoices.EXPIRED)
+        return_copies(Counter(book_id for _, book_id in expired), now)
+    return len(expired)
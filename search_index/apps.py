@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class SearchIndexConfig(AppConfig):
+    """The full-text index tables behind ``books.search``.
+
+    They are not models, so their migration is written by hand and kept
+    apart from the generated migrations of ``books``.
+    """
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "search_index"
@@ -0,0 +1,71 @@
+from django.db import DatabaseError, migrations, router, transaction
+
+SCHEMA = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS books_book_search "
+        "USING fts5(title, authors, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS books_author_search "
+        "USING fts5(first_name, last_name, pseudonym, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        # Title hits outrank author hits, names outrank pseudonyms.
+        "INSERT INTO books_book_search(books_book_search, rank) "
+        "VALUES ('rank', 'bm25(10.0, 1.0)')",
+        "INSERT INTO books_author_search(books_author_search, rank) "
+        "VALUES ('rank', 'bm25(5.0, 5.0, 1.0)')",
+    ],
+    "postgresql": [
+        "CREATE TABLE IF NOT EXISTS books_book_search "
+        "(id bigint PRIMARY KEY, document tsvector NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS books_book_search_document "
+        "ON books_book_search USING GIN (document)",
+        "CREATE TABLE IF NOT EXISTS books_author_search "
+        "(id bigint PRIMARY KEY, document tsvector NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS books_author_search_document "
+        "ON books_author_search USING GIN (document)",
+    ],
+}
+
+DROP = [
+    "DROP TABLE IF EXISTS books_book_search",
+    "DROP TABLE IF EXISTS books_author_search",
+]
+
+
+class RunSQLForVendor(migrations.RunSQL):
+    """RunSQL with the statements listed for the database's vendor.
+
+    Other databases get no tables. Nor does one that fails to create
+    them, e.g. SQLite built without FTS5; searches use LIKE scans there.
+    """
+
+    def database_forwards(self, app_label, schema_editor, *states):
+        self.run(app_label, schema_editor, self.sql)
+
+    def database_backwards(self, app_label, schema_editor, *states):
+        self.run(app_label, schema_editor, self.reverse_sql)
+
+    def run(self, app_label, schema_editor, sqls):
+        connection = schema_editor.connection
+        if connection.vendor not in SCHEMA or not router.allow_migrate(
+            connection.alias, app_label, **self.hints
+        ):
+            return
+        if isinstance(sqls, dict):
+            sqls = sqls[connection.vendor]
+        if schema_editor.collect_sql:
+            self._run_sql(schema_editor, sqls)
+            return
+        try:
+            with transaction.atomic(using=connection.alias):
+                self._run_sql(schema_editor, sqls)
+        except DatabaseError:
+            pass
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [RunSQLForVendor(SCHEMA, DROP)]
@@ -0,0 +1,71 @@
+import threading
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+
+from metrics.registry import THROTTLED_REQUESTS
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class LoadSheddingMiddleware:
+    """Refuse write requests past MAX_INFLIGHT_WRITES with a 503.
+
+    Writes are counted per process and refused before authentication, so
+    a flood of checkouts or logins is turned away instead of queueing on
+    the database writer. Reads are never shed.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.in_flight = 0
+        self.lock = threading.Lock()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if request.method in SAFE_METHODS:
+            return self.get_response(request)
+        if not self.enter():
+            return self.shed()
+        try:
+            return self.get_response(request)
+        finally:
+            self.leave()
+
+    async def __acall__(self, request):
+        if request.method in SAFE_METHODS:
+            return await self.get_response(request)
+        if not self.enter():
+            return self.shed()
+        try:
+            return await self.get_response(request)
+        finally:
+            self.leave()
+
+    def enter(self) -> bool:
+        limit = settings.MAX_INFLIGHT_WRITES
+        with self.lock:
+            if limit and self.in_flight >= limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    @staticmethod
+    def shed():
+        THROTTLED_REQUESTS.inc("writes", "overload")
+        response = JsonResponse(
+            {"detail": "The server is busy, retry later."}, status=503
+        )
+        response["Retry-After"] = str(settings.LOAD_SHED_RETRY_AFTER)
+        return response
@@ -0,0 +1,251 @@
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book
+from metrics.registry import THROTTLED_REQUESTS
+from throttling.middleware import LoadSheddingMiddleware
+from throttling.throttles import TokenBucketThrottle, get_cache, take_token
+
+TOKEN_URL = reverse("users:token_obtain_pair")
+BORROWINGS_URL = reverse("borrowings:borrowings-list")
+
+
+class LockstepCache(LocMemCache):
+    """Holds each thread after its first incr until all threads made one."""
+    barrier = None
+
+    def incr(self, key, delta=1, version=None):
+        value = super().incr(key, delta, version)
+        if self.barrier and not getattr(self, "waited", False):
+            self.waited = True
+            self.barrier.wait(timeout=5)
+        return value
+
+
+@override_settings(THROTTLE_RATES={"auth": "3/min", "checkout": "2/min"})
+class TokenBucketThrottleTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        THROTTLED_REQUESTS.clear()
+        self.client = APIClient()
+
+    def checkout(self, user, book):
+        self.client.force_authenticate(user)
+        return self.client.post(BORROWINGS_URL, {
+            "book": book.id,
+            "expected_return_date": datetime.date.today()
+            + datetime.timedelta(days=3),
+        })
+
+    def test_token_endpoint_is_limited_per_ip(self):
+        credentials = {"email": "test@test.com", "password": "wrong"}
+        for _ in range(3):
+            res = self.client.post(TOKEN_URL, credentials)
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = self.client.post(TOKEN_URL, credentials)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["Retry-After"], "20")
+
+        res = self.client.post(
+            TOKEN_URL, credentials, REMOTE_ADDR="10.0.0.2"
+        )
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_checkouts_are_limited_per_patron(self):
+        book = Book.objects.create(
+            title="Test", cover="hard", inventory=10, daily_fee=1
+        )
+        first, second = [
+            get_user_model().objects.create_user(f"{name}@test.com", "pass")
+            for name in ("first", "second")
+        ]
+
+        statuses = [self.checkout(first, book).status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [201, 201, 429])
+        self.assertEqual(self.checkout(second, book).status_code, 201)
+        self.client.force_authenticate(first)
+        self.assertEqual(
+            self.client.get(BORROWINGS_URL).status_code, status.HTTP_200_OK
+        )
+        self.assertIn(
+            'library_throttled_requests_total{scope="checkout",'
+            'reason="rate"} 1',
+            list(THROTTLED_REQUESTS.expose()),
+        )
+
+    @override_settings(
+        THROTTLE_RATES={"checkout": "5/min", "checkout_ip": "3/min"}
+    )
+    def test_checkouts_are_limited_per_ip(self):
+        book = Book.objects.create(
+            title="Test", cover="hard", inventory=10, daily_fee=1
+        )
+        patrons = [
+            get_user_model().objects.create_user(f"user{i}@test.com", "pass")
+            for i in range(4)
+        ]
+
+        statuses = [
+            self.checkout(patron, book).status_code for patron in patrons
+        ]
+
+        self.assertEqual(statuses, [201, 201, 201, 429])
+        self.client.force_authenticate(patrons[3])
+        res = self.client.post(BORROWINGS_URL, {
+            "book": book.id,
+            "expected_return_date": datetime.date.today()
+            + datetime.timedelta(days=3),
+        }, REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_concurrent_requests_never_overspend_a_bucket(self):
+        with ThreadPoolExecutor(8) as pool:
+            waits = list(pool.map(
+                lambda _: take_token("throttle:test:shared", 10, 0.01, 0.0),
+                range(200),
+            ))
+
+        self.assertEqual(waits.count(0), 10)
+
+    @override_settings(
+        CACHES={
+            **settings.CACHES,
+            "lockstep": {
+                "BACKEND": "throttling.tests.LockstepCache",
+                "LOCATION": "lockstep",
+            },
+        },
+        THROTTLE_CACHE_ALIAS="lockstep",
+    )
+    def test_concurrent_requests_on_a_full_bucket_take_one_token_each(self):
+        key = "throttle:test:stale"
+        take_token(key, 2, 1.0, now=0.0)
+        take_token(key, 2, 1.0, now=0.0)
+
+        LockstepCache.barrier = threading.Barrier(2)
+        try:
+            with ThreadPoolExecutor(2) as pool:
+                waits = list(pool.map(
+                    lambda _: take_token(key, 2, 1.0, now=3600.0), range(2)
+                ))
+        finally:
+            LockstepCache.barrier = None
+
+        self.assertEqual(waits, [0, 0])
+        self.assertLessEqual(take_token(key, 2, 1.0, now=3600.0), 1.0)
+        self.assertEqual(take_token(key, 2, 1.0, now=3601.0), 0)
+
+    def test_checkouts_are_allowed_again_after_the_bucket_refills(self):
+        book = Book.objects.create(
+            title="Test", cover="hard", inventory=10, daily_fee=1
+        )
+        patron = get_user_model().objects.create_user("p@test.com", "pass")
+
+        with mock.patch.object(TokenBucketThrottle, "timer") as timer:
+            timer.return_value = 1000.0
+            statuses = [
+                self.checkout(patron, book).status_code for _ in range(3)
+            ]
+            timer.return_value = 4600.0
+            statuses += [
+                self.checkout(patron, book).status_code for _ in range(3)
+            ]
+
+        self.assertEqual(statuses, [201, 201, 429, 201, 201, 429])
+
+    def test_bucket_refills_at_the_rate(self):
+        key = "throttle:test:bucket"
+
+        self.assertEqual(take_token(key, 2, 1.0, now=0.0), 0)
+        self.assertEqual(take_token(key, 2, 1.0, now=0.0), 0)
+        self.assertEqual(take_token(key, 2, 1.0, now=0.0), 1.0)
+        self.assertEqual(take_token(key, 2, 1.0, now=0.5), 0.5)
+        self.assertEqual(take_token(key, 2, 1.0, now=1.0), 0)
+        # Idle time refills the bucket only up to its size.
+        self.assertEqual(take_token(key, 2, 1.0, now=60.0), 0)
+        self.assertEqual(take_token(key, 2, 1.0, now=60.0), 0)
+        self.assertEqual(take_token(key, 2, 1.0, now=60.0), 1.0)
+
+    @override_settings(THROTTLE_RATES={})
+    def test_scopes_without_a_rate_are_not_limited(self):
+        for _ in range(5):
+            res = self.client.post(TOKEN_URL, {})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(MAX_INFLIGHT_WRITES=1, LOAD_SHED_RETRY_AFTER=2)
+class LoadSheddingTests(SimpleTestCase):
+    def setUp(self):
+        THROTTLED_REQUESTS.clear()
+        self.factory = RequestFactory()
+
+    def nested(self, method):
+        """A middleware whose handler sends a second request meanwhile."""
+        inner = []
+
+        def get_response(request):
+            if request.method == "POST":
+                inner.append(middleware(getattr(self.factory, method)("/")))
+            return HttpResponse()
+
+        middleware = LoadSheddingMiddleware(get_response)
+        return middleware, inner
+
+    def test_writes_past_the_limit_are_shed(self):
+        middleware, inner = self.nested("post")
+
+        res = middleware(self.factory.post("/"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            inner[0].status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(inner[0]["Retry-After"], "2")
+        self.assertEqual(middleware.in_flight, 0)
+        self.assertIn(
+            'library_throttled_requests_total{scope="writes",'
+            'reason="overload"} 1',
+            list(THROTTLED_REQUESTS.expose()),
+        )
+
+    def test_reads_are_never_shed(self):
+        middleware, inner = self.nested("get")
+
+        middleware(self.factory.post("/"))
+
+        self.assertEqual(inner[0].status_code, status.HTTP_200_OK)
+
+    async def test_async_writes_past_the_limit_are_shed(self):
+        inner = []
+
+        async def get_response(request):
+            if request.method == "DELETE":
+                inner.append(await middleware(self.factory.put("/")))
+            return HttpResponse()
+
+        middleware = LoadSheddingMiddleware(get_response)
+        res = await middleware(self.factory.delete("/"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            inner[0].status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(middleware.in_flight, 0)
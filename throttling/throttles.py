@@ -0,0 +1,122 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+from metrics.registry import THROTTLED_REQUESTS
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+MICROSECONDS = 1_000_000
+
+
+def get_cache():
+    return caches[settings.THROTTLE_CACHE_ALIAS]
+
+
+def parse_rate(rate) -> tuple:
+    """``"30/min"`` as the bucket size and the tokens refilled per second."""
+    count, period = rate.split("/")
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def take_token(key, capacity, refill, now) -> float:
+    """Take a token from the bucket at ``key``.
+
+    Returns 0 when one was taken, else the seconds until one refills.
+    The bucket is stored as the microsecond it is full again: a token
+    moves it on by one refill step, and is free while that stays within
+    ``capacity`` steps of now. Only atomic add, incr and decr write it,
+    so requests in any process sharing the cache cannot overspend it.
+
+    A bucket found full again is not rebased in place, as concurrent
+    requests would each apply the rebase. The next generation of it is
+    started with add instead, which only one request can do; ``key``
+    points at the current generation. Entries expire once full.
+    """
+    cache = get_cache()
+    step = round(MICROSECONDS / refill)
+    now = round(now * MICROSECONDS)
+    generation = cache.get(key, 0)
+    while True:
+        bucket = f"{key}:{generation}"
+        try:
+            full_at = cache.incr(bucket, step)
+        except ValueError:
+            pass
+        else:
+            if full_at - step >= now:
+                break
+            generation += 1
+            bucket = f"{key}:{generation}"
+        timeout = math.ceil(step / MICROSECONDS)
+        if cache.add(bucket, now + step, timeout):
+            cache.set(key, generation, timeout)
+            return 0.0
+        # Another request started this generation first; take from it.
+
+    if full_at - now > capacity * step:
+        cache.decr(bucket, step)
+        return (full_at - now - capacity * step) / MICROSECONDS
+
+    timeout = math.ceil((full_at - now) / MICROSECONDS)
+    cache.touch(bucket, timeout)
+    cache.touch(key, timeout)
+    return 0.0
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """A token bucket per client, sized and refilled by the scope's rate.
+
+    Clients may burst up to the bucket size, then send one request per
+    refilled token. Scopes without a rate in THROTTLE_RATES are not
+    throttled.
+    """
+    scope = None
+    timer = time.time
+
+    def get_client_key(self, request) -> str:
+        raise NotImplementedError(".get_client_key() must be overridden")
+
+    def allow_request(self, request, view):
+        rate = settings.THROTTLE_RATES.get(self.scope)
+        if not rate:
+            return True
+
+        capacity, refill = parse_rate(rate)
+        key = f"throttle:{self.scope}:{self.get_client_key(request)}"
+        self.delay = take_token(key, capacity, refill, self.timer())
+        if self.delay:
+            THROTTLED_REQUESTS.inc(self.scope, "rate")
+        return not self.delay
+
+    def wait(self):
+        return self.delay
+
+
+class IPBucketThrottle(TokenBucketThrottle):
+    def get_client_key(self, request) -> str:
+        return f"ip:{self.get_ident(request)}"
+
+
+class UserBucketThrottle(TokenBucketThrottle):
+    """Buckets per user; anonymous requests share their IP's bucket."""
+
+    def get_client_key(self, request) -> str:
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+
+class AuthRateThrottle(IPBucketThrottle):
+    scope = "auth"
+
+
+class CheckoutRateThrottle(UserBucketThrottle):
+    scope = "checkout"
+
+
+class CheckoutIPRateThrottle(IPBucketThrottle):
+    scope = "checkout_ip"
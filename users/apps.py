@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class UsersServiceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
+
+    def ready(self):
+        import users.schema  # noqa: F401
+        import users.signals  # noqa: F401
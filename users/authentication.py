@@ -0,0 +1,126 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+# Privileges copied into tokens at issue time, see users.serializers.
+PRIVILEGE_CLAIMS = ("is_staff", "is_active")
+
+
+def get_cache():
+    return caches[settings.AUTH_CACHE_ALIAS]
+
+
+def version_key(user_id) -> str:
+    return f"auth:user:{user_id}:version"
+
+
+def user_version(user_id) -> int:
+    """Version of the user's cached entries; forget_user starts a new one."""
+    key = version_key(user_id)
+    version = get_cache().get(key)
+    if version is None:
+        # Seeded from the clock so a forgotten version is never reused.
+        get_cache().add(
+            key, time.time_ns() // 1000, settings.AUTH_USER_CACHE_TIMEOUT
+        )
+        version = get_cache().get(key)
+    return version
+
+
+def user_key(user_id, token_id) -> str:
+    return f"auth:user:{user_id}:{user_version(user_id)}:{token_id}"
+
+
+def cached_fields() -> list:
+    # The password hash stays out of the cache and loads on access.
+    return [
+        field for field in get_user_model()._meta.concrete_fields
+        if field.attname != "password"
+    ]
+
+
+def remember_user(user, token_id) -> None:
+    user_id = getattr(user, api_settings.USER_ID_FIELD)
+    get_cache().set(
+        user_key(user_id, token_id),
+        {field.attname: getattr(user, field.attname) for field in cached_fields()},
+        settings.AUTH_USER_CACHE_TIMEOUT,
+    )
+
+
+def recall_user(user_id, token_id):
+    """Rebuild the cached user with ``password`` deferred, or None."""
+    values = get_cache().get(user_key(user_id, token_id))
+    if values is None:
+        return None
+    names = [field.attname for field in cached_fields() if field.attname in values]
+    return get_user_model().from_db(
+        "default", names, [values[name] for name in names]
+    )
+
+
+def forget_user(user_id) -> None:
+    """Drop every cached entry of the user now and again after commit.
+
+    Dropped right away for the rest of this transaction and again after
+    commit, in case a concurrent request cached the old row meanwhile.
+    """
+    key = version_key(user_id)
+    get_cache().delete(key)
+    transaction.on_commit(lambda: get_cache().delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves users from a short-lived cache.
+
+    Entries are keyed by user and token id, so a cached user is only
+    reused for the token it was loaded for. Saving or deleting a user
+    drops all of its entries at once by starting a new version
+    (``QuerySet.update`` does not; those changes show after
+    AUTH_USER_CACHE_TIMEOUT). A token that claims staff rights the user
+    no longer has is rejected, so demoting a user revokes the tokens
+    issued while they were staff.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # The check needs the password hash, which is not cached.
+            return super().get_user(validated_token)
+
+        user_id = self.get_user_id(validated_token)
+        token_id = self.get_token_id(validated_token)
+        user = recall_user(user_id, token_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            remember_user(user, token_id)
+        return self.check_privileges(user, validated_token)
+
+    @staticmethod
+    def get_user_id(validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                "Token contained no recognizable user identification"
+            )
+
+    @staticmethod
+    def get_token_id(validated_token):
+        return validated_token.get(api_settings.JTI_CLAIM)
+
+    @staticmethod
+    def check_privileges(user, validated_token):
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        if validated_token.get("is_staff") and not user.is_staff:
+            raise AuthenticationFailed(
+                "Token privileges were revoked", code="token_revoked"
+            )
+        return user
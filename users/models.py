@@ -39,8 +39,44 @@ class User(AbstractUser):
         unique=True,
         error_messages={"unique": _("An user with that email already exists.")},
     )
+    # Denormalized loan counters behind the borrowing quota, written
+    # only by the conditional UPDATEs in borrowings.quota and
+    # Borrowing.flag_overdue.
+    active_loans = models.PositiveIntegerField(default=0, editable=False)
+    overdue_loans = models.PositiveIntegerField(default=0, editable=False)
 
+    LOAN_COUNTERS = ("active_loans", "overdue_loans")
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
     objects = UserManager()
+
+    def save(
+        self,
+        force_insert=False,
+        force_update=False,
+        using=None,
+        update_fields=None,
+    ):
+        # Users are cached between requests, so a full save could write
+        # back counters that checkouts moved in the meantime.
+        if update_fields is None and not self._state.adding:
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.LOAN_COUNTERS
+            ]
+        return super(User, self).save(
+            force_insert, force_update, using, update_fields
+        )
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Patrons with the most active loans first, see analytics.
+            models.Index(
+                fields=["-active_loans", "id"],
+                name="user_active_loans_idx",
+                condition=models.Q(active_loans__gt=0),
+            ),
+        ]
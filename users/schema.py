@@ -0,0 +1,7 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Document CachedJWTAuthentication as the JWT scheme it extends."""
+    target_class = "users.authentication.CachedJWTAuthentication"
+    match_subclasses = True
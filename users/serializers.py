@@ -1,5 +1,8 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+
+from users.authentication import PRIVILEGE_CLAIMS
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -29,3 +32,12 @@ class UserSerializer(serializers.ModelSerializer):
             user.save()
 
         return user
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for claim in PRIVILEGE_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
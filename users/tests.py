@@ -1,3 +1,129 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
-# Create your tests here.
+from users.authentication import get_cache, user_key
+
+ME_URL = reverse("users:user-detail")
+TOKEN_URL = reverse("users:token_obtain_pair")
+AUTHORS_URL = reverse("books:author-list")
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass", is_staff=True
+        )
+        self.login()
+
+    def login(self, password="testpass"):
+        res = self.client.post(
+            TOKEN_URL, {"email": "test@test.com", "password": password}
+        )
+        self.access = res.data["access"]
+        self.client.credentials(HTTP_AUTHORIZE=f"Bearer {self.access}")
+        return res
+
+    def test_user_lookup_is_cached(self):
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["email"], "test@test.com")
+
+    def test_password_hash_is_not_cached(self):
+        self.client.get(ME_URL)
+
+        token_id = AccessToken(self.access)["jti"]
+        self.assertNotIn(
+            "password", get_cache().get(user_key(self.user.id, token_id))
+        )
+
+    def test_each_token_has_its_own_entry(self):
+        first = self.access
+        self.client.get(ME_URL)
+        self.login()
+
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+        self.client.credentials(HTTP_AUTHORIZE=f"Bearer {first}")
+        with self.assertNumQueries(0):
+            self.client.get(ME_URL)
+
+    def test_profile_update_drops_the_entries_of_every_token(self):
+        first = self.access
+        self.client.get(ME_URL)
+        self.login()
+        self.client.get(ME_URL)
+
+        self.client.patch(ME_URL, {"first_name": "New"})
+
+        self.client.credentials(HTTP_AUTHORIZE=f"Bearer {first}")
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.data["first_name"], "New")
+
+    def test_profile_update_is_visible_on_next_request(self):
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {"first_name": "New"})
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["first_name"], "New")
+
+    def test_password_change_through_cached_user(self):
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {"password": "newpass"})
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("newpass"))
+        self.assertEqual(self.login("newpass").status_code, status.HTTP_200_OK)
+
+    def test_token_carries_privilege_claims(self):
+        res = self.client.post(
+            TOKEN_URL, {"email": "test@test.com", "password": "testpass"}
+        )
+        token = RefreshToken(res.data["refresh"])
+
+        self.assertIs(token["is_staff"], True)
+        self.assertIs(token["is_active"], True)
+
+    def test_demotion_revokes_staff_tokens(self):
+        self.assertEqual(
+            self.client.get(AUTHORS_URL).status_code, status.HTTP_200_OK
+        )
+
+        self.user.is_staff = False
+        self.user.save()
+
+        res = self.client.get(AUTHORS_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res.data["code"], "token_revoked")
+
+        self.login()
+        self.assertEqual(
+            self.client.get(AUTHORS_URL).status_code, status.HTTP_403_FORBIDDEN
+        )
+
+    def test_deactivation_is_immediate(self):
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_forgotten(self):
+        self.client.get(ME_URL)
+
+        self.user.delete()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
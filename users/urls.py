@@ -1,12 +1,10 @@
 from django.urls import path
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-    TokenVerifyView,
-)
 
 from users.views import (
     CreateUserView,
+    TokenObtainPairView,
+    TokenRefreshView,
+    TokenVerifyView,
     UserUpdateView,
 )
 
@@ -1,16 +1,32 @@
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt import views as jwt_views
 
+from metrics.timing import TimedViewMixin
+from throttling.throttles import AuthRateThrottle
 from users.serializers import UserSerializer
 
 
-class CreateUserView(generics.CreateAPIView):
+class CreateUserView(TimedViewMixin, generics.CreateAPIView):
     serializer_class = UserSerializer
+    throttle_classes = (AuthRateThrottle,)
 
 
-class UserUpdateView(generics.RetrieveUpdateAPIView):
+class UserUpdateView(TimedViewMixin, generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
         return self.request.user
+
+
+class TokenObtainPairView(jwt_views.TokenObtainPairView):
+    throttle_classes = (AuthRateThrottle,)
+
+
+class TokenRefreshView(jwt_views.TokenRefreshView):
+    throttle_classes = (AuthRateThrottle,)
+
+
+class TokenVerifyView(jwt_views.TokenVerifyView):
+    throttle_classes = (AuthRateThrottle,)